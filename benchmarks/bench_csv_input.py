@@ -0,0 +1,121 @@
+"""Benchmark jobseeker CSV ingestion in rows per second.
+
+Compares the csv.DictReader plus per row schema dict path that the CSV inputs
+used to take against the positional reader in CSVJobSeekerInput, then against
+ParallelCSVJobSeekerInput parsing chunks of the file in worker processes.
+
+Usage:
+    python benchmarks/bench_csv_input.py --rows 1000000 --workers 4
+"""
+
+import argparse
+import csv
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from recommender.chunked import ParallelCSVJobSeekerInput
+from recommender.constants import JOBSEEKER_CSV_SCHEMA
+from recommender.input import CSVJobSeekerInput
+from recommender.models import JobSeeker
+from recommender.vocabulary import SkillVocabulary
+
+
+def legacy_get_job_seekers(filename, vocabulary=None):
+    """csv.DictReader, a converted dict per row, then the dataclass."""
+    encountered_ids = set()
+    with open(filename, "r", encoding="utf-8") as data:
+        for row in csv.DictReader(data):
+            converted_row = {
+                key: JOBSEEKER_CSV_SCHEMA[key](value) for key, value in row.items()
+            }
+            if converted_row["id"] in encountered_ids:
+                raise ValueError("Duplicate row ID found")
+            encountered_ids.add(converted_row["id"])
+
+            skills = [
+                skill.strip().upper() for skill in converted_row["skills"].split(",")
+            ]
+            yield JobSeeker(
+                id=converted_row["id"],
+                name=converted_row["name"],
+                skills=(
+                    set(skills) if vocabulary is None else vocabulary.intern_all(skills)
+                ),
+            )
+
+
+def write_jobseekers(path: Path, rows: int, seed: int = 42):
+    rng = random.Random(seed)
+    skills = [f"Skill {i}" for i in range(500)]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("id,name,skills\n")
+        for i in range(1, rows + 1):
+            f.write(
+                f'{i},Seeker {i},"{", ".join(rng.sample(skills, rng.randint(2, 10)))}"\n'
+            )
+
+
+def measure(label, rows, func):
+    start = time.perf_counter()
+    count = sum(1 for _ in func())
+    elapsed = time.perf_counter() - start
+    assert count == rows
+    print(f"{label:<40} {rows / elapsed:>12,.0f} rows/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "jobseekers.csv"
+        write_jobseekers(path, args.rows)
+
+        before = measure(
+            "DictReader + schema dict", args.rows, lambda: legacy_get_job_seekers(path)
+        )
+        after = measure(
+            "positional reader",
+            args.rows,
+            lambda: CSVJobSeekerInput(path).get_job_seekers(),
+        )
+        print(f"Speedup: {before / after:.2f}x")
+        parallel = measure(
+            f"chunked, {args.workers} workers",
+            args.rows,
+            lambda: ParallelCSVJobSeekerInput(
+                path, workers=args.workers
+            ).get_job_seekers(),
+        )
+        print(f"Speedup over positional reader: {after / parallel:.2f}x")
+
+        before = measure(
+            "DictReader + schema dict (interned)",
+            args.rows,
+            lambda: legacy_get_job_seekers(path, SkillVocabulary()),
+        )
+        after = measure(
+            "positional reader (interned)",
+            args.rows,
+            lambda: CSVJobSeekerInput(
+                path, vocabulary=SkillVocabulary()
+            ).get_job_seekers(),
+        )
+        print(f"Speedup: {before / after:.2f}x")
+        parallel = measure(
+            f"chunked, {args.workers} workers (interned)",
+            args.rows,
+            lambda: ParallelCSVJobSeekerInput(
+                path, vocabulary=SkillVocabulary(), workers=args.workers
+            ).get_job_seekers(),
+        )
+        print(f"Speedup over positional reader: {after / parallel:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Benchmark per jobseeker matching on skewed skill distributions.
+
+Compares the set union plus re-intersection that _get_job_matches used to do
+against the count based accumulation over the posting lists.  Skill popularity
+follows a Zipf like distribution, so a few skills have very long posting lists.
+
+Usage:
+    python benchmarks/bench_job_matches.py --jobs 1000 --seekers 50000
+"""
+
+import argparse
+import random
+import time
+
+from recommender.models import Job, JobSeeker
+from recommender.services import InMemoryRecommenderService, get_matching_percentage
+
+
+class ListInput:
+    def __init__(self, items):
+        self.items = items
+
+    def get_jobs(self):
+        return iter(self.items)
+
+    def get_job_seekers(self):
+        return iter(self.items)
+
+
+def legacy_candidates(jobseeker, jobs_by_skills, jobs_by_id):
+    """Candidate building before count based accumulation."""
+    qualified_jobs = set()
+
+    for skill in jobseeker.skills:
+        qualified_jobs |= jobs_by_skills.get(skill, set())
+
+    candidates = []
+    for job_id in qualified_jobs:
+        job = jobs_by_id[job_id]
+
+        total_required_skills = len(job.required_skills)
+        qualifications = jobseeker.skills & job.required_skills
+
+        candidates.append(
+            (
+                job,
+                len(qualifications),
+                get_matching_percentage(len(qualifications), total_required_skills),
+            )
+        )
+
+    return candidates
+
+
+def sample_skills(rng, weights, skills, count):
+    chosen = set()
+    while len(chosen) < count:
+        chosen.add(rng.choices(skills, weights=weights)[0])
+    return chosen
+
+
+def make_data(job_count, seeker_count, skill_count, skew, seed=42):
+    rng = random.Random(seed)
+    skills = list(range(skill_count))
+    weights = [1 / (rank + 1) ** skew for rank in range(skill_count)]
+
+    jobs = [
+        Job(i, f"Job {i}", sample_skills(rng, weights, skills, rng.randint(2, 10)))
+        for i in range(job_count)
+    ]
+    seekers = [
+        JobSeeker(
+            i, f"Seeker {i}", sample_skills(rng, weights, skills, rng.randint(2, 10))
+        )
+        for i in range(seeker_count)
+    ]
+    return jobs, seekers
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<30} {elapsed:8.2f}s")
+    return elapsed, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--seekers", type=int, default=50_000)
+    parser.add_argument("--skills", type=int, default=500)
+    args = parser.parse_args()
+
+    for skew in (0.0, 1.0, 1.5):
+        print(f"Zipf skew {skew}:")
+        jobs, seekers = make_data(args.jobs, args.seekers, args.skills, skew)
+        service = InMemoryRecommenderService(ListInput(seekers), ListInput(jobs))
+        jobs_by_id, jobs_by_skills = service._get_job_indexes()
+
+        baseline, expected = timed(
+            "set union + intersection",
+            lambda: [legacy_candidates(s, jobs_by_skills, jobs_by_id) for s in seekers],
+        )
+        counted, result = timed(
+            "posting list counting",
+            lambda: [
+                service._get_candidates(
+                    service._count_job_overlaps(s, jobs_by_skills), jobs_by_id
+                )
+                for s in seekers
+            ],
+        )
+
+        assert [sorted((j.id, c, p) for j, c, p in r) for r in result] == [
+            sorted((j.id, c, p) for j, c, p in r) for r in expected
+        ]
+        print(f"  speedup {baseline / counted:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
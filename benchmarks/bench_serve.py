@@ -0,0 +1,116 @@
+"""Benchmark request latency against the serve command.
+
+Starts a RecommendationServer on a random local port in a background thread,
+then sends requests one at a time over a single kept alive connection and
+reports latency percentiles as seen by the client.  With --batch N, N
+jobseekers are sent per /recommend/batch request and the time per jobseeker
+is reported as well.
+
+Usage:
+    python benchmarks/bench_serve.py --jobs 1000 --requests 10000
+    python benchmarks/bench_serve.py --jobs 1000 --requests 200 --batch 100
+"""
+
+import argparse
+import asyncio
+import random
+import socket
+import statistics
+import threading
+import time
+
+import orjson
+
+from recommender.models import Job
+from recommender.server import RecommendationServer
+from recommender.services import InMemoryRecommenderService, Recommender
+from recommender.vocabulary import SkillVocabulary
+
+
+class ListInput:
+    def __init__(self, items):
+        self.items = items
+
+    def get_jobs(self):
+        return iter(self.items)
+
+
+def start_server(server):
+    loop = asyncio.new_event_loop()
+    listener = loop.run_until_complete(server.start(port=0))
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return listener.sockets[0].getsockname()[1]
+
+
+def send(sock, path, body):
+    sock.sendall(
+        b"POST %s HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s" % (path, len(body), body)
+    )
+    response = b""
+    while b"\r\n\r\n" not in response:
+        response += sock.recv(65536)
+    head, _, payload = response.partition(b"\r\n\r\n")
+    length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+    while len(payload) < length:
+        payload += sock.recv(65536)
+    return payload
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--skills", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--top-k", type=int, default=None)
+    parser.add_argument("--batch", type=int, default=None)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    vocabulary = SkillVocabulary()
+    skills = [f"SKILL {i}" for i in range(args.skills)]
+    jobs = [
+        Job(i, f"Job {i}", vocabulary.intern_all(rng.sample(skills, rng.randint(2, 8))))
+        for i in range(1, args.jobs + 1)
+    ]
+    server = RecommendationServer(
+        Recommender(
+            InMemoryRecommenderService(
+                jobseekers=None, jobs=ListInput(jobs), top_k=args.top_k
+            ),
+            vocabulary=vocabulary,
+        )
+    )
+    port = start_server(server)
+
+    def jobseeker(i):
+        return {"id": i, "skills": rng.sample(skills, rng.randint(2, 10))}
+
+    if args.batch:
+        path = b"/recommend/batch"
+        bodies = [
+            orjson.dumps({"jobseekers": [jobseeker(i) for i in range(args.batch)]})
+            for _ in range(args.requests)
+        ]
+    else:
+        path = b"/recommend"
+        bodies = [orjson.dumps(jobseeker(i)) for i in range(args.requests)]
+    latencies = []
+    with socket.create_connection(("127.0.0.1", port)) as sock:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        for body in bodies:
+            start = time.perf_counter()
+            send(sock, path, body)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    latencies.sort()
+    print(f"requests: {len(latencies)}")
+    print(f"p50:  {statistics.median(latencies):.3f} ms")
+    print(f"p99:  {latencies[int(len(latencies) * 0.99)]:.3f} ms")
+    print(f"mean: {statistics.fmean(latencies):.3f} ms")
+    if args.batch:
+        per_seeker = statistics.fmean(latencies) / args.batch
+        print(f"per jobseeker: {per_seeker:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
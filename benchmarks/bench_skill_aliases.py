@@ -0,0 +1,92 @@
+"""Benchmark jobseeker CSV ingestion with a skill alias table.
+
+Reads the same jobseekers file without aliases, then with alias tables of
+growing size.  Aliases are compiled into one dict, so throughput should stay
+close to the no alias baseline whatever the size of the table.
+
+Usage:
+    python benchmarks/bench_skill_aliases.py --rows 1000000
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from recommender.input import CSVJobSeekerInput, compile_skill_aliases
+from recommender.vocabulary import SkillVocabulary
+
+SKILLS = 500
+ALIASES_PER_SKILL = 3
+
+
+def write_jobseekers(path: Path, rows: int, seed: int = 42):
+    """Half of the skills are written with one of their alias spellings."""
+    rng = random.Random(seed)
+    spellings = [
+        [f"Skill {i}"] + [f"Sk{i}-{a}" for a in range(ALIASES_PER_SKILL)]
+        for i in range(SKILLS)
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("id,name,skills\n")
+        for i in range(1, rows + 1):
+            skills = [
+                rng.choice(names) if rng.random() < 0.5 else names[0]
+                for names in rng.sample(spellings, rng.randint(2, 10))
+            ]
+            f.write(f'{i},Seeker {i},"{", ".join(skills)}"\n')
+
+
+def get_aliases(extra: int) -> dict[str, str]:
+    """Aliases of the skills in the file, plus extra unused entries."""
+    rows = [
+        (f"Skill {i}", ", ".join(f"Sk{i}-{a}" for a in range(ALIASES_PER_SKILL)))
+        for i in range(SKILLS)
+    ]
+    rows += [(f"Unused {i}", f"Unused alias {i}") for i in range(extra)]
+    return compile_skill_aliases(rows)
+
+
+def measure(label, rows, func):
+    start = time.perf_counter()
+    skills = set()
+    for jobseeker in func():
+        skills.update(jobseeker.skills)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {rows / elapsed:>12,.0f} rows/s  {len(skills):>5} skills")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "jobseekers.csv"
+        write_jobseekers(path, args.rows)
+
+        for vocabulary in (None, SkillVocabulary):
+            suffix = " (interned)" if vocabulary else ""
+            baseline = measure(
+                "no aliases" + suffix,
+                args.rows,
+                lambda: CSVJobSeekerInput(
+                    path, vocabulary=vocabulary and vocabulary()
+                ).get_job_seekers(),
+            )
+            for extra in (0, 100_000):
+                aliases = get_aliases(extra)
+                elapsed = measure(
+                    f"{len(aliases):,} aliases" + suffix,
+                    args.rows,
+                    lambda: CSVJobSeekerInput(
+                        path, vocabulary=vocabulary and vocabulary(), aliases=aliases
+                    ).get_job_seekers(),
+                )
+                print(f"Overhead: {(elapsed / baseline - 1) * 100:+.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Benchmark ordering of JobMatch objects.
+
+Compares sorting with the JobMatch rich comparison methods against sorting
+with the precomputed JobMatch.sort_key.
+
+Usage:
+    python benchmarks/bench_sort_key.py --matches 10000000
+"""
+
+import argparse
+import random
+import time
+
+from recommender.models import Job, JobMatch, JobSeeker, match_sort_key
+
+
+def make_matches(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    seekers = [JobSeeker(id=i, name=f"Seeker {i}") for i in range(count // 20 + 1)]
+    jobs = [Job(id=i, title=f"Job {i}") for i in range(1000)]
+    percents = [10, 20, 25, 33, 50, 66, 75, 100]
+
+    params = [
+        (rng.choice(seekers), rng.choice(jobs), rng.choice(percents))
+        for _ in range(count)
+    ]
+    return [JobMatch(s, j, 1, p) for s, j, p in params]
+
+
+def timed(label: str, func) -> float:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed:8.2f}s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--matches", type=int, default=10_000_000)
+    args = parser.parse_args()
+
+    print(f"Generating {args.matches:,} matches...")
+    matches = make_matches(args.matches)
+
+    baseline = timed("sorted() with JobMatch.__lt__", lambda: sorted(matches))
+    keyed = timed(
+        "sorted(key=match_sort_key)", lambda: sorted(matches, key=match_sort_key)
+    )
+    print(f"Speedup of key based sort: {baseline / keyed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,8 @@
 
 Additional commands should be registered under the cli group.
 
-For now, only csv_input command is implemented.
+Commands implemented are csv_input, columnar_input, build_index, update_index,
+serve and rank_candidates.
 """
 
 import click
@@ -10,7 +11,6 @@ import structlog
 from . import commands
 from . import logging_config
 
-
 logging_config.configure_logging()
 
 
@@ -24,6 +24,11 @@ def cli():
 
 
 cli.add_command(commands.csv_input)
+cli.add_command(commands.columnar_input)
+cli.add_command(commands.build_index)
+cli.add_command(commands.update_index)
+cli.add_command(commands.serve)
+cli.add_command(commands.rank_candidates)
 
 
 if __name__ == "__main__":
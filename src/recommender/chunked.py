@@ -0,0 +1,253 @@
+"""chunked
+
+Parallel parsing of a single large jobseekers CSV file.
+
+The file is cut into chunks of about chunk_size bytes, each ending where a
+record ends, and the chunks are parsed in worker processes.  Jobseekers are
+yielded in file order, one batch per chunk.
+
+A record ends at a new line outside quotes, that is a new line with an even
+number of quotes before it, since an escaped quote is written as two quotes.
+This holds for files written by csv.writer or any RFC 4180 writer, which
+quote every field holding a quote.  New lines are single bytes in UTF-8, so
+a chunk never ends inside a character.
+
+Workers send back plain lists of ids and names, and the skills of a chunk
+dictionary encoded: each distinct name once, and a tuple of name positions
+per row.  These unpickle much faster than JobSeeker objects, and the parent
+only hashes or interns each distinct skill name of a chunk once.  Ids are
+checked for duplicates across chunks in the parent, and skills are interned
+there, since the vocabulary is shared by the jobs and jobseekers of a run.
+Names are encoded in the order they are first seen, so they are interned in
+the same order as CSVJobSeekerInput does, and get the same ids.
+"""
+
+import csv
+import io
+import multiprocessing
+import os
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import chain
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterable, Iterator
+import structlog
+from .compression import open_file
+from .constants import JOBSEEKER_CSV_SCHEMA
+from .input import SkillAliases, convert_csv_rows, get_column_indexes, normalize_skills
+from .models import JobSeeker, Skills
+from .vocabulary import SkillVocabulary
+
+
+logger: structlog.stdlib.BoundLogger = structlog.get_logger()
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+QUOTE = b'"'
+RECORD_END = b"\n"
+
+# Columns of the jobseekers of a chunk: ids, names, distinct skill names and
+# the positions of the skill names of each row
+JobSeekerColumns = tuple[list[int], list[str], list[str], list[tuple[int, ...]]]
+
+# Skill aliases used by worker processes.  Set in the parent before forking,
+# like the matching workers of services.
+_worker_aliases: SkillAliases | None = None
+
+
+def _init_worker(aliases: dict[str, str] | None) -> None:
+    global _worker_aliases
+    _worker_aliases = SkillAliases(aliases) if aliases else None
+
+
+def find_last_record_end(data: bytes) -> int:
+    """Position just after the last record of data, or 0 if data holds no
+    complete record.  data must start at the start of a record.
+
+    New lines are tried from the end of data, counting the quotes after each
+    one, until one has an even number of quotes before it.
+    """
+    quotes_before = data.count(QUOTE)
+    end = len(data)
+    while (position := data.rfind(RECORD_END, 0, end)) != -1:
+        quotes_before -= data.count(QUOTE, position, end)
+        if quotes_before % 2 == 0:
+            return position + 1
+        end = position
+
+    return 0
+
+
+def split_records(f: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Chunks of whole records of f, of about chunk_size bytes each.
+
+    A record longer than chunk_size makes a longer chunk.  The last chunk
+    holds whatever follows the last new line.
+    """
+    pending = b""
+    while block := f.read(chunk_size):
+        data = pending + block if pending else block
+        end = find_last_record_end(data)
+        if end:
+            yield data[:end]
+        pending = data[end:]
+
+    if pending:
+        yield pending
+
+
+class SkillCodes(dict[str, int]):
+    """Position of each skill name, in the order names are first seen."""
+
+    __slots__ = ()
+
+    def __missing__(self, skill: str) -> int:
+        code = self[skill] = len(self)
+        return code
+
+
+def parse_job_seekers_chunk(chunk: bytes, header: list[str]) -> JobSeekerColumns:
+    """Ids, names and dictionary encoded skills of the records of a chunk.
+
+    Raises:
+        ValueError: If a value cannot be converted.
+    """
+    reader = csv.reader(io.StringIO(chunk.decode("utf-8"), newline=""))
+    # ids are checked for duplicates across every chunk by the parent
+    rows = convert_csv_rows(
+        reader, header, JOBSEEKER_CSV_SCHEMA, set(), None, JobSeeker.__name__
+    )
+    codes = SkillCodes()
+    get_code = codes.__getitem__
+
+    ids: list[int] = []
+    names: list[str] = []
+    skill_rows: list[tuple[int, ...]] = []
+    for jobseeker_id, name, skills in rows:
+        ids.append(jobseeker_id)
+        names.append(name)
+        skill_rows.append(
+            tuple(map(get_code, normalize_skills(skills, _worker_aliases)))
+        )
+
+    return ids, names, list(codes), skill_rows
+
+
+@dataclass
+class ParallelCSVJobSeekerInput:
+    """Jobseekers of a CSV file parsed in chunks by worker processes.
+
+    Yields the same jobseekers, in the same order, as CSVJobSeekerInput, and
+    raises the same errors.  A chunk is only yielded once it is parsed and
+    its ids are checked, so the jobseekers of a chunk holding a bad row are
+    not yielded.  With a single worker, chunks are parsed in this process.
+    """
+
+    filename: Path
+    ids_encountered: set[int] = field(default_factory=set)
+    vocabulary: SkillVocabulary | None = None
+    aliases: dict[str, str] | None = None
+    workers: int = DEFAULT_WORKERS
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+
+    def get_job_seekers(self) -> Iterator[JobSeeker]:
+        for columns in self._read_chunks():
+            yield from self._get_job_seekers(columns)
+
+    def get_job_seeker_batches(self) -> Iterator[list[JobSeeker]]:
+        """Jobseekers of each chunk, in file order.
+
+        Raises:
+            KeyError: If the header does not match the schema.
+            ValueError: If a value cannot be converted or a row id is
+                        duplicated.
+        """
+        for columns in self._read_chunks():
+            yield list(self._get_job_seekers(columns))
+
+    def _read_chunks(self) -> Iterator[JobSeekerColumns]:
+        # ids are unique per pass, the file may be read more than once
+        self.ids_encountered = set()
+
+        with open_file(self.filename, "rb") as f:
+            chunks = split_records(f, self.chunk_size)
+            header_line, _, first_chunk = next(chunks, b"").partition(RECORD_END)
+            if not header_line:
+                return
+
+            header = next(csv.reader([header_line.decode("utf-8")]))
+            get_column_indexes(header, JOBSEEKER_CSV_SCHEMA)
+            chunks = filter(None, chain([first_chunk], chunks))
+            yield from self._parse_chunks(chunks, header)
+
+    def _get_job_seekers(self, columns: JobSeekerColumns) -> Iterator[JobSeeker]:
+        """Jobseekers of a parsed chunk, built as they are consumed.
+
+        Built lazily, a jobseeker dropped by the consumer is freed right away
+        instead of surviving garbage collections with the rest of its chunk.
+        """
+        ids, names, skill_names, skill_rows = columns
+        self._check_ids(ids)
+
+        make_skills: Callable[[Iterable[Any]], Skills]
+        if self.vocabulary is None:
+            skills: list[Any] = skill_names
+            make_skills = set
+        else:
+            skills = [self.vocabulary.intern(name) for name in skill_names]
+            make_skills = frozenset
+        get_skill = skills.__getitem__
+
+        return map(
+            JobSeeker,
+            ids,
+            names,
+            (make_skills(map(get_skill, row)) for row in skill_rows),
+        )
+
+    def _check_ids(self, ids: list[int]) -> None:
+        seen_count = len(self.ids_encountered)
+        self.ids_encountered.update(ids)
+        if len(self.ids_encountered) - seen_count != len(ids):
+            logger.error(
+                f"Error converting row for {JobSeeker.__name__}",
+                error="Duplicate row ID found",
+            )
+            raise ValueError("Duplicate row ID found")
+
+    def _parse_chunks(
+        self, chunks: Iterable[bytes], header: list[str]
+    ) -> Iterator[JobSeekerColumns]:
+        if self.workers == 1:
+            _init_worker(self.aliases)
+            for chunk in chunks:
+                yield parse_job_seekers_chunk(chunk, header)
+            return
+
+        logger.info(
+            "Parsing jobseekers in parallel",
+            workers=self.workers,
+            chunk_size=self.chunk_size,
+        )
+        if "fork" in multiprocessing.get_all_start_methods():
+            _init_worker(self.aliases)
+            pool = multiprocessing.get_context("fork").Pool(self.workers)
+        else:
+            pool = multiprocessing.Pool(
+                self.workers, initializer=_init_worker, initargs=(self.aliases,)
+            )
+
+        # keep a bounded number of chunks in flight, in file order
+        max_pending = self.workers * 2
+        pending: deque = deque()
+        with pool:
+            for chunk in chunks:
+                pending.append(
+                    pool.apply_async(parse_job_seekers_chunk, (chunk, header))
+                )
+                if len(pending) >= max_pending:
+                    yield pending.popleft().get()
+
+            while pending:
+                yield pending.popleft().get()
@@ -0,0 +1,260 @@
+"""columnar
+
+Job and jobseeker inputs reading Parquet or Arrow IPC files.
+
+Requires the optional arrow dependencies: pip install recommender[arrow]
+
+Files are read one record batch at a time, and only the columns of the schema
+are read.  Skill columns are lists of strings, so no comma splitting is done.
+Each batch of skill names is dictionary encoded, so every distinct name of a
+batch is normalized, resolved through the aliases and interned once, however
+many rows hold it.
+
+Matches are written the other way around, from batches of columns to record
+batches, in Parquet or Arrow IPC files.
+"""
+
+from dataclasses import dataclass, field
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import structlog
+from .constants import CSV_HEADERS, JOB_CSV_SCHEMA, JOBSEEKER_CSV_SCHEMA
+from .models import Job, JobMatch, JobSeeker, Skills
+from .services import get_job_match_columns
+from .vocabulary import SkillVocabulary
+
+
+logger: structlog.stdlib.BoundLogger = structlog.get_logger()
+
+PARQUET_SUFFIX = ".parquet"
+ARROW_SUFFIXES = (".arrow", ".feather")
+COLUMNAR_SUFFIXES = (PARQUET_SUFFIX, *ARROW_SUFFIXES)
+
+DEFAULT_BATCH_SIZE = 65_536
+
+JOB_MATCH_SCHEMA = pa.schema(
+    zip(
+        CSV_HEADERS,
+        (pa.int64(), pa.string(), pa.int64(), pa.string(), pa.int32(), pa.int32()),
+    )
+)
+
+
+def read_record_batches(
+    filename: Path, columns: list[str], batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[pa.RecordBatch]:
+    """Yield the record batches of a Parquet or Arrow IPC file.
+
+    Parquet files are read batch_size rows at a time.  Arrow IPC files are
+    memory mapped and keep the batches they were written with.
+
+    Raises:
+        KeyError: If the file is missing one of columns.
+        ValueError: If the file suffix is not one of COLUMNAR_SUFFIXES.
+    """
+    suffix = Path(filename).suffix
+    if suffix == PARQUET_SUFFIX:
+        parquet_file = pq.ParquetFile(filename)
+        check_columns(parquet_file.schema_arrow, columns)
+        yield from parquet_file.iter_batches(batch_size=batch_size, columns=columns)
+
+    elif suffix in ARROW_SUFFIXES:
+        with pa.memory_map(str(filename)) as source:
+            reader = pa.ipc.open_file(source)
+            check_columns(reader.schema, columns)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i).select(columns)
+
+    else:
+        raise ValueError(f"Unsupported columnar file: {filename}")
+
+
+def check_columns(schema: pa.Schema, columns: list[str]) -> None:
+    for column in columns:
+        if column not in schema.names:
+            raise KeyError(column)
+
+
+def get_ids(batch: pa.RecordBatch, column: str, encountered_ids: set[int]) -> list[int]:
+    """Ids of a batch, checked for nulls and for duplicates across batches.
+
+    Raises:
+        TypeError: If the column is not of an integer type.
+        ValueError: If an id is null or was already encountered.
+    """
+    ids = batch.column(column)
+    if not pa.types.is_integer(ids.type):
+        raise TypeError(f"{column} must be integers, got {ids.type}")
+    if ids.null_count:
+        raise ValueError(f"Null {column} found")
+
+    ids = ids.to_pylist()
+    seen_count = len(encountered_ids)
+    encountered_ids.update(ids)
+    if len(encountered_ids) - seen_count != len(ids):
+        raise ValueError("Duplicate row ID found")
+
+    return ids
+
+
+def get_skills(
+    batch: pa.RecordBatch,
+    column: str,
+    vocabulary: SkillVocabulary | None = None,
+    aliases: dict[str, str] | None = None,
+) -> list[Skills]:
+    """Normalized skills of each row of a list of strings column.
+
+    Names are normalized like parse_skills.  A null list has no skills, and
+    a null name counts as an empty one, like an empty CSV skill does.
+
+    Raises:
+        TypeError: If the column is not a list of strings.
+    """
+    skill_lists = batch.column(column)
+    list_type = skill_lists.type
+    if not (
+        (pa.types.is_list(list_type) or pa.types.is_large_list(list_type))
+        and (
+            pa.types.is_string(list_type.value_type)
+            or pa.types.is_large_string(list_type.value_type)
+        )
+    ):
+        raise TypeError(f"{column} must be a list of strings, got {skill_lists.type}")
+
+    encoded = pc.list_flatten(skill_lists).fill_null("").dictionary_encode()
+    names = (name.upper().strip() for name in encoded.dictionary.to_pylist())
+    if aliases:
+        names = (aliases.get(name, name) for name in names)
+    if vocabulary is None:
+        skills = list(names)
+        make_skills: Callable[[Any], Skills] = set
+    else:
+        skills = [vocabulary.intern(name) for name in names]
+        make_skills = frozenset
+
+    values = list(map(skills.__getitem__, encoded.indices.to_pylist()))
+    ends = list(accumulate(pc.list_value_length(skill_lists).fill_null(0).to_pylist()))
+    rows = map(values.__getitem__, map(slice, [0, *ends], ends))
+    return list(map(make_skills, rows))
+
+
+def get_strings(batch: pa.RecordBatch, column: str) -> list[str]:
+    return batch.column(column).fill_null("").to_pylist()
+
+
+@dataclass
+class ArrowJobInput:
+    """Jobs from a Parquet or Arrow IPC file.
+
+    Columns are id, title and required_skills, a list of strings.  Other
+    columns are not read.
+    """
+
+    filename: Path
+    ids_encountered: set[int] = field(default_factory=set)
+    vocabulary: SkillVocabulary | None = None
+    aliases: dict[str, str] | None = None
+    batch_size: int = DEFAULT_BATCH_SIZE
+
+    def get_jobs(self) -> Iterator[Job]:
+        # ids are unique per pass, the file may be read more than once
+        self.ids_encountered = set()
+        id_column, title_column, skills_column = JOB_CSV_SCHEMA
+        batches = read_record_batches(
+            self.filename, list(JOB_CSV_SCHEMA), self.batch_size
+        )
+
+        for batch in batches:
+            try:
+                rows = zip(
+                    get_ids(batch, id_column, self.ids_encountered),
+                    get_strings(batch, title_column),
+                    get_skills(batch, skills_column, self.vocabulary, self.aliases),
+                )
+            except (ValueError, TypeError) as e:
+                logger.error(f"Error converting batch for {Job.__name__}", error=str(e))
+                raise
+
+            for job_id, title, required_skills in rows:
+                yield Job(id=job_id, title=title, required_skills=required_skills)
+
+
+@dataclass
+class ArrowJobSeekerInput:
+    """Jobseekers from a Parquet or Arrow IPC file.
+
+    Columns are id, name and skills, a list of strings.  Other columns are
+    not read.
+    """
+
+    filename: Path
+    ids_encountered: set[int] = field(default_factory=set)
+    vocabulary: SkillVocabulary | None = None
+    aliases: dict[str, str] | None = None
+    batch_size: int = DEFAULT_BATCH_SIZE
+
+    def get_job_seekers(self) -> Iterator[JobSeeker]:
+        # ids are unique per pass, the file may be read more than once
+        self.ids_encountered = set()
+        id_column, name_column, skills_column = JOBSEEKER_CSV_SCHEMA
+        batches = read_record_batches(
+            self.filename, list(JOBSEEKER_CSV_SCHEMA), self.batch_size
+        )
+
+        for batch in batches:
+            try:
+                rows = zip(
+                    get_ids(batch, id_column, self.ids_encountered),
+                    get_strings(batch, name_column),
+                    get_skills(batch, skills_column, self.vocabulary, self.aliases),
+                )
+            except (ValueError, TypeError) as e:
+                logger.error(
+                    f"Error converting batch for {JobSeeker.__name__}", error=str(e)
+                )
+                raise
+
+            for jobseeker_id, name, skills in rows:
+                yield JobSeeker(id=jobseeker_id, name=name, skills=skills)
+
+
+def format_job_matches_as_record_batches(
+    job_matches: Iterable[JobMatch],
+) -> Iterator[pa.RecordBatch]:
+    """Record batches of matches with the JOB_MATCH_SCHEMA columns."""
+    return get_job_match_record_batches(get_job_match_columns(job_matches))
+
+
+def get_job_match_record_batches(
+    batches: Iterable[dict[str, tuple]],
+) -> Iterator[pa.RecordBatch]:
+    """Record batches of the column batches of get_job_match_columns."""
+    for columns in batches:
+        yield pa.RecordBatch.from_pydict(columns, schema=JOB_MATCH_SCHEMA)
+
+
+def write_record_batches(
+    batches: Iterable[pa.RecordBatch], filename: Path, file_format: str = "parquet"
+) -> None:
+    """Write record batches to a Parquet or an Arrow IPC file.
+
+    Batches are written as they come, so they are never all held in memory.
+
+    Raises:
+        ValueError: If file_format is not parquet or arrow.
+    """
+    if file_format == "parquet":
+        writer = pq.ParquetWriter(filename, JOB_MATCH_SCHEMA)
+    elif file_format == "arrow":
+        writer = pa.ipc.new_file(str(filename), JOB_MATCH_SCHEMA)
+    else:
+        raise ValueError(f"Unsupported columnar format: {file_format}")
+
+    with writer:
+        for batch in batches:
+            writer.write_batch(batch)
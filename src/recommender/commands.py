@@ -11,16 +11,270 @@ e.g.
 
 """
 
+import asyncio
+import hashlib
+import importlib.util
+import sys
+from contextlib import nullcontext
+from itertools import chain
 import click
+import orjson
 from pathlib import Path
 import structlog
-from .services import InMemoryRecommenderService
-from .input import CSVJobInput, CSVJobSeekerInput
-from .constants import NEW_LINE, LIMIT, WARNING_LIMIT_REACHED
+from typing import Any, Iterator, TextIO
+from .services import (
+    BitsetRecommenderService,
+    InMemoryRecommenderService,
+    JobInput,
+    JobSeekerInput,
+    Recommender,
+    ResultFormatter,
+    format_job_matches_as_csv,
+    format_job_matches_as_ndjson,
+    get_job_match_columns,
+)
+from .input import (
+    CSVJobDeltaInput,
+    CSVJobInput,
+    CSVJobMatchInput,
+    CSVJobSeekerDeltaInput,
+    CSVJobSeekerInput,
+    read_skill_aliases,
+)
+from .index import (
+    INDEX_SUFFIX,
+    JobIndex,
+    JobIndexCache,
+    MappedJobIndex,
+    write_job_index,
+)
+from .reverse import ReverseRecommenderService
+from .server import RecommendationServer
+from .vocabulary import SkillVocabulary
+from .chunked import ParallelCSVJobSeekerInput
+from .compression import get_compression, open_file
+from .constants import LIMIT, WARNING_LIMIT_REACHED
+from .output import DEFAULT_FLUSH_SIZE, write_lines
 
 
 logger: structlog.stdlib.BoundLogger = structlog.get_logger()
 
+ENGINES: dict[str, type[InMemoryRecommenderService]] = {
+    "set": InMemoryRecommenderService,
+    "bitset": BitsetRecommenderService,
+}
+
+try:
+    from .sparse import SparseRecommenderService
+
+    ENGINES["sparse"] = SparseRecommenderService
+except ImportError:
+    logger.debug("Sparse engine unavailable, install recommender[sparse]")
+
+# parquet and arrow need recommender[arrow].  pyarrow starts a thread when it
+# is imported and --workers forks, so it is only imported once matching has
+# started, see write_formatted_results.
+OUTPUT_FORMATS = ("csv", "ndjson", "parquet", "arrow")
+
+# name of the stream click.File opens for -
+STDOUT_NAME = "<stdout>"
+
+
+def get_job_input(
+    jobs_path: Path,
+    vocabulary: SkillVocabulary,
+    index_cache: Path | None = None,
+    index_cache_size: int = 1024,
+    aliases: dict[str, str] | None = None,
+) -> JobInput:
+    """Job input for a jobs CSV, or for a job index (.idx) built from one.
+
+    With index_cache set, the index of a jobs CSV is built once and reused
+    from the cache until the CSV or the skill aliases change.  A job index
+    passed directly already holds the skills it was built with, aliases are
+    applied by build-index.
+    """
+    if jobs_path.suffix == INDEX_SUFFIX:
+        logger.info("Loading job index", jobs_path=str(jobs_path))
+        return MappedJobIndex(jobs_path, vocabulary=vocabulary)
+
+    if index_cache is not None:
+        cache = JobIndexCache(index_cache, max_bytes=index_cache_size * 1024 * 1024)
+        variant = ""
+        if aliases:
+            table = orjson.dumps(aliases, option=orjson.OPT_SORT_KEYS)
+            variant = hashlib.sha256(table).hexdigest()[:16]
+        index_path = cache.get_index_path(
+            jobs_path, CSVJobInput(jobs_path, aliases=aliases).get_jobs, variant
+        )
+        return MappedJobIndex(index_path, vocabulary=vocabulary)
+
+    return CSVJobInput(jobs_path, vocabulary=vocabulary, aliases=aliases)
+
+
+def get_job_seeker_input(
+    jobseekers_path: Path,
+    vocabulary: SkillVocabulary,
+    aliases: dict[str, str] | None = None,
+    parse_workers: int = 1,
+) -> JobSeekerInput:
+    """Jobseekers of a CSV, parsed in chunks by parse_workers processes when
+    there is more than one."""
+    if parse_workers > 1:
+        return ParallelCSVJobSeekerInput(
+            jobseekers_path,
+            vocabulary=vocabulary,
+            aliases=aliases,
+            workers=parse_workers,
+        )
+
+    return CSVJobSeekerInput(jobseekers_path, vocabulary=vocabulary, aliases=aliases)
+
+
+def get_skill_aliases(skill_aliases: Path | None) -> dict[str, str] | None:
+    """Alias table of the --skill-aliases file, if one was given."""
+    return read_skill_aliases(skill_aliases) if skill_aliases is not None else None
+
+
+def is_stdout(output: TextIO | None) -> bool:
+    """Whether output is the stdout stream click opens for --output -."""
+    return getattr(output, "name", None) == STDOUT_NAME
+
+
+def open_output(output: TextIO) -> TextIO:
+    """output, or a compressing stream to its path when the path ends with a
+    compression suffix.
+
+    click.File opens output lazily, so a compressed path is never created as
+    a plain file first.
+    """
+    name = getattr(output, "name", None)
+    compression = get_compression(name) if isinstance(name, str) else None
+    if compression:
+        logger.info("Compressed output selected.", compression=compression)
+        return open_file(name, "w")
+
+    return output
+
+
+def write_results(
+    results: Iterator[str],
+    output: TextIO | None,
+    output_limit: int,
+    flush_size: int = DEFAULT_FLUSH_SIZE,
+) -> None:
+    """Write formatted result lines to output, or up to output_limit of them
+    to the terminal when output is not given.
+
+    Lines are written to output in writes of about flush_size characters, and
+    compressed when its path ends with .gz or .zst.
+    """
+    logger.info("Start Writing results")
+    if output:
+        logger.info("Output to file selected.")
+        with open_output(output) as f:
+            write_lines(results, f, flush_size)
+    else:
+        logger.info("Output to terminal selected.")
+        click.clear()
+
+        header = next(results)
+        click.secho(header, fg="cyan", bold=True)
+        row_count = 1
+        for line in results:
+            if row_count > output_limit:
+                logger.warning("Max number of results reached.  Stoping write.")
+                click.secho(
+                    WARNING_LIMIT_REACHED,
+                    fg="red",
+                    bold=True,
+                )
+                break
+
+            click.secho(line, fg="green")
+            row_count += 1
+
+    logger.info("Done writing results")
+
+
+def get_formatter(output_format: str, output: TextIO | None) -> ResultFormatter:
+    """Formatter of one of OUTPUT_FORMATS.
+
+    parquet and arrow are formatted as batches of columns, turned into record
+    batches by write_formatted_results, so pyarrow is not imported here.
+
+    Raises:
+        click.UsageError: If a format other than csv has no --output, or if
+                          parquet or arrow --output is stdout or ends with
+                          .gz or .zst.
+        click.ClickException: If the format needs pyarrow and it is missing.
+    """
+    if output_format == "csv":
+        return format_job_matches_as_csv
+    if not output:
+        raise click.UsageError(f"--format {output_format} requires --output")
+    if output_format == "ndjson":
+        return format_job_matches_as_ndjson
+    if is_stdout(output):
+        raise click.UsageError(
+            f"--format {output_format} cannot be written to stdout, "
+            "--output must be a path"
+        )
+    if get_compression(output.name):
+        raise click.UsageError(
+            f"--format {output_format} is compressed by its own codec, "
+            "--output cannot end with .gz or .zst"
+        )
+
+    if importlib.util.find_spec("pyarrow") is None:
+        raise click.ClickException(
+            f"--format {output_format} requires pyarrow, install recommender[arrow]"
+        )
+    return get_job_match_columns
+
+
+def write_formatted_results(
+    results: Iterator[Any],
+    output_format: str,
+    output: TextIO | None,
+    output_limit: int,
+    flush_size: int = DEFAULT_FLUSH_SIZE,
+) -> None:
+    """Write results of the formatter of output_format.
+
+    csv goes through write_results.  The other formats are binary, and are
+    written to the --output path as the formatter yields them.  ndjson is
+    compressed like csv when the path ends with .gz or .zst, and may be
+    written to stdout with --output -.
+    """
+    if output_format == "csv":
+        write_results(results, output, output_limit, flush_size)
+        return
+
+    logger.info("Start Writing results", format=output_format)
+    if output_format == "ndjson":
+        # reopened by name to write bytes, stdout is only written to
+        if is_stdout(output):
+            stream = nullcontext(sys.stdout.buffer)
+        else:
+            stream = open_file(output.name, "wb")
+        with stream as f:
+            for chunk in results:
+                f.write(chunk)
+    else:
+        # the first batch starts matching, which forks the --workers
+        # processes, so pyarrow and its threads only start after
+        batches = iter(results)
+        first = next(batches, None)
+        from .columnar import get_job_match_record_batches, write_record_batches
+
+        if first is not None:
+            batches = chain([first], batches)
+        write_record_batches(
+            get_job_match_record_batches(batches), Path(output.name), output_format
+        )
+    logger.info("Done writing results")
+
 
 @click.command(help="Use CSV inputs for Recommender")
 @click.argument(
@@ -36,7 +290,8 @@ logger: structlog.stdlib.BoundLogger = structlog.get_logger()
 @click.option(
     "--output",
     type=click.File("w"),
-    help="Output the results to a specified file instead of the terminal.",
+    help="Output the results to a specified file instead of the terminal.  "
+    "Files ending with .gz or .zst are compressed.",
 )
 @click.option(
     "--output_limit",
@@ -44,56 +299,714 @@ logger: structlog.stdlib.BoundLogger = structlog.get_logger()
     default=LIMIT,
     help="Max number of records to be displayed on terminal.",
 )
+@click.option(
+    "--engine",
+    type=click.Choice(list(ENGINES)),
+    default="set",
+    show_default=True,
+    help="Matching engine used to count the skills shared by jobseekers and jobs.",
+)
+@click.option(
+    "--top-k",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Only keep the best N matches of each jobseeker.",
+)
+@click.option(
+    "--min-percent",
+    type=click.IntRange(min=0, max=100),
+    default=None,
+    help="Drop matches below this matching skill percent.",
+)
+@click.option(
+    "--min-count",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Drop matches with fewer matching skills than this.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of processes used for matching jobseekers.",
+)
+@click.option(
+    "--parse-workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of processes parsing the jobseekers CSV, in chunks of records.  "
+    "Cannot be combined with --workers.",
+)
+@click.option(
+    "--job-chunk-size",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Index jobs this many at a time, reading the jobseekers once per chunk.",
+)
+@click.option(
+    "--streaming",
+    is_flag=True,
+    help="Sort matches per jobseeker instead of holding every match in memory.",
+)
+@click.option(
+    "--presorted",
+    is_flag=True,
+    help="Jobseekers file is sorted by id.  Streaming output starts right away.",
+)
+@click.option(
+    "--max-matches-in-memory",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Spill sorted runs of matches to disk once this many are held in memory.",
+)
+@click.option(
+    "--tmp-dir",
+    type=click.Path(exists=True, file_okay=False, writable=True, path_type=Path),
+    default=None,
+    help="Directory for intermediate sorted runs.  Defaults to the system temp dir.",
+)
+@click.option(
+    "--index-cache",
+    type=click.Path(file_okay=False, writable=True, path_type=Path),
+    default=None,
+    help="Cache the job index in this directory, rebuilt when the jobs file changes.",
+)
+@click.option(
+    "--index-cache-size",
+    type=click.IntRange(min=1),
+    default=1024,
+    show_default=True,
+    help="Size cap of the job index cache in MB.  Least recently used go first.",
+)
+@click.option(
+    "--previous-output",
+    type=click.Path(exists=True, dir_okay=False, readable=True, path_type=Path),
+    default=None,
+    help="Output of an earlier run.  Only jobseekers affected by deltas are matched.",
+)
+@click.option(
+    "--jobseeker-deltas",
+    type=click.Path(exists=True, dir_okay=False, readable=True, path_type=Path),
+    default=None,
+    help="CSV of jobseekers added, updated or deleted since --previous-output.",
+)
+@click.option(
+    "--job-deltas",
+    type=click.Path(exists=True, dir_okay=False, readable=True, path_type=Path),
+    default=None,
+    help="CSV of jobs added, updated or deleted since --previous-output.",
+)
+@click.option(
+    "--skill-aliases",
+    type=click.Path(exists=True, dir_okay=False, readable=True, path_type=Path),
+    default=None,
+    help="CSV of skill,aliases rows.  Aliases are replaced by their skill when read.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(OUTPUT_FORMATS),
+    default="csv",
+    show_default=True,
+    help="Output format.  Formats other than csv are binary and need --output.",
+)
+@click.option(
+    "--flush-size",
+    type=click.IntRange(min=1),
+    default=DEFAULT_FLUSH_SIZE,
+    show_default=True,
+    help="Characters of output rows gathered per write to --output.",
+)
 def csv_input(
-    jobseekers_path: Path, jobs_path: Path, output: Path, output_limit: int
+    jobseekers_path: Path,
+    jobs_path: Path,
+    output: Path,
+    output_limit: int,
+    engine: str,
+    top_k: int | None,
+    min_percent: int | None,
+    min_count: int | None,
+    workers: int,
+    parse_workers: int,
+    job_chunk_size: int | None,
+    streaming: bool,
+    presorted: bool,
+    max_matches_in_memory: int | None,
+    tmp_dir: Path | None,
+    index_cache: Path | None,
+    index_cache_size: int,
+    previous_output: Path | None,
+    jobseeker_deltas: Path | None,
+    job_deltas: Path | None,
+    skill_aliases: Path | None,
+    output_format: str,
+    flush_size: int,
 ) -> None:
     """Match jobs with jobseekers.
 
     Args:
         jobseekers (Path): The path to the CSV file containing job seeker data.
                            Must exist and be readable.
-        jobs (Path): The path to the CSV file containing job listings.
+        jobs (Path): The path to the CSV file containing job listings, or to
+                     a job index (.idx) written by build-index.
                      Must also exist and be readable.
+        engine (str): Name of the matching engine, see ENGINES.
+        top_k (int | None): Max number of matches kept per jobseeker.
+        min_percent (int | None): Minimum matching skill percent kept.
+        min_count (int | None): Minimum matching skill count kept.
+        workers (int): Number of processes used for matching.
+        parse_workers (int): Number of processes parsing the jobseekers CSV.
+        job_chunk_size (int | None): Max number of jobs indexed at a time.
+        streaming (bool): Sort matches per jobseeker and stream them out.
+        presorted (bool): Jobseekers are sorted by id, no external merge needed.
+        max_matches_in_memory (int | None): Memory budget, in matches, before
+                                            sorted runs are spilled to disk.
+        tmp_dir (Path | None): Directory for the spilled runs.
+        index_cache (Path | None): Directory caching job indexes built from
+                                   jobs CSV files.
+        index_cache_size (int): Size cap of the index cache, in MB.
+        previous_output (Path | None): Output of an earlier run to update.
+                                       jobseekers and jobs must be the current
+                                       inputs, with the deltas applied.
+        jobseeker_deltas (Path | None): Jobseekers changed since that run.
+        job_deltas (Path | None): Jobs changed since that run.
+        skill_aliases (Path | None): CSV mapping skills to their aliases.
+        output_format (str): One of OUTPUT_FORMATS.
+        flush_size (int): Characters of CSV rows gathered per write.
 
     Raises:
         FileNotFoundError: If either of the provided file paths do not exist.
         PermissionError: If either of the provided files are not readable.
+        click.UsageError: If both workers and parse_workers are above 1.
 
     """
     logger.info("Click command csv_input started")
-    jobs = CSVJobInput(jobs_path)
-    jobseekers = CSVJobSeekerInput(jobseekers_path)
+    if workers > 1 and parse_workers > 1:
+        # each pool would fork while the handler threads of the other one run
+        raise click.UsageError("--parse-workers cannot be combined with --workers")
+    formatter = get_formatter(output_format, output)
+    previous_matches = None
+    changed_jobseeker_ids = []
+    changed_job_ids = []
+    if previous_output is not None:
+        if output and Path(output.name).resolve() == previous_output.resolve():
+            raise click.UsageError("--output must differ from --previous-output")
 
-    recommender = InMemoryRecommenderService(jobseekers=jobseekers, jobs=jobs)
+        previous_matches = CSVJobMatchInput(previous_output)
+        if jobseeker_deltas:
+            deltas = CSVJobSeekerDeltaInput(jobseeker_deltas).get_job_seeker_deltas()
+            changed_jobseeker_ids = [delta.jobseeker.id for delta in deltas]
+        if job_deltas:
+            deltas = CSVJobDeltaInput(job_deltas).get_job_deltas()
+            changed_job_ids = [delta.job.id for delta in deltas]
+    elif jobseeker_deltas or job_deltas:
+        raise click.UsageError("Deltas can only be used with --previous-output")
+
+    aliases = get_skill_aliases(skill_aliases)
+    vocabulary = SkillVocabulary()
+    jobs = get_job_input(jobs_path, vocabulary, index_cache, index_cache_size, aliases)
+    jobseekers = get_job_seeker_input(
+        jobseekers_path, vocabulary, aliases, parse_workers
+    )
+
+    recommender = ENGINES[engine](
+        jobseekers=jobseekers,
+        jobs=jobs,
+        streaming=streaming,
+        presorted=presorted,
+        max_matches_in_memory=max_matches_in_memory,
+        tmp_dir=tmp_dir,
+        workers=workers,
+        job_chunk_size=job_chunk_size,
+        top_k=top_k,
+        min_percent=min_percent,
+        min_count=min_count,
+        previous_matches=previous_matches,
+        changed_jobseeker_ids=changed_jobseeker_ids,
+        changed_job_ids=changed_job_ids,
+        formatter=formatter,
+    )
 
     results = recommender.execute()
     logger.info("Done executing recommender service")
 
-    logger.info("Start Writing results")
-    if output:
-        logger.info("Output to file selected.")
-        with output as f:
-            for line in results:
-                f.write(line + NEW_LINE)
-    else:
-        logger.info("Output to terminal selected.")
-        click.clear()
+    write_formatted_results(results, output_format, output, output_limit, flush_size)
+    logger.info("Click command csv_input end")
 
-        header = next(results)
-        click.secho(header, fg="cyan", bold=True)
-        row_count = 1
-        for line in results:
-            if row_count > output_limit:
-                logger.warning("Max number of results reached.  Stoping write.")
-                click.secho(
-                    WARNING_LIMIT_REACHED,
-                    fg="red",
-                    bold=True,
-                )
-                break
 
-            click.secho(line, fg="green")
-            row_count += 1
+@click.command(help="Build a binary job index to use in place of the jobs CSV")
+@click.argument(
+    "jobs_path",
+    required=True,
+    type=click.Path(exists=True, readable=True, path_type=Path),
+)
+@click.argument(
+    "index_path",
+    required=True,
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+)
+@click.option(
+    "--skill-aliases",
+    type=click.Path(exists=True, dir_okay=False, readable=True, path_type=Path),
+    default=None,
+    help="CSV of skill,aliases rows.  Aliases are replaced by their skill when read.",
+)
+def build_index(jobs_path: Path, index_path: Path, skill_aliases: Path | None) -> None:
+    """Serialize the job catalog and its skill inverted index.
 
-    logger.info("Done writing results")
-    logger.info("Click command csv_input end")
+    Args:
+        jobs_path (Path): The path to the CSV file containing job listings.
+        index_path (Path): Where the index is written.  Pass it, with an .idx
+                           suffix, as the jobs argument of csv-input to skip
+                           parsing the jobs CSV.
+        skill_aliases (Path | None): CSV mapping skills to their aliases.  The
+                                     index holds the canonical skills.
+
+    Raises:
+        ValueError: If a job id does not fit in an int32.
+    """
+    logger.info("Click command build_index started")
+    aliases = get_skill_aliases(skill_aliases)
+    write_job_index(CSVJobInput(jobs_path, aliases=aliases).get_jobs(), index_path)
+    logger.info("Click command build_index end")
+
+
+@click.command(help="Apply add, update and delete deltas to a job index")
+@click.argument(
+    "index_path",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False, readable=True, path_type=Path),
+)
+@click.argument(
+    "deltas_path",
+    required=True,
+    type=click.Path(exists=True, readable=True, path_type=Path),
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    default=None,
+    help="Write the updated index here instead of replacing INDEX_PATH.",
+)
+@click.option(
+    "--skill-aliases",
+    type=click.Path(exists=True, dir_okay=False, readable=True, path_type=Path),
+    default=None,
+    help="CSV of skill,aliases rows.  Aliases are replaced by their skill when read.",
+)
+def update_index(
+    index_path: Path,
+    deltas_path: Path,
+    output: Path | None,
+    skill_aliases: Path | None,
+) -> None:
+    """Update a job index built by build-index without re-reading the jobs CSV.
+
+    Args:
+        index_path (Path): Job index to update.
+        deltas_path (Path): CSV file with op,id,title,required_skills columns,
+                            op being one of add, update or delete.
+        output (Path | None): Where the updated index is written.  Defaults to
+                              index_path, which is replaced atomically.
+        skill_aliases (Path | None): CSV mapping skills to their aliases,
+                                     applied to the skills of the deltas.
+
+    Raises:
+        ValueError: If a job is added twice or a delta row is invalid.
+        KeyError: If a job that is not in the index is updated or deleted.
+    """
+    logger.info("Click command update_index started")
+    mapped = MappedJobIndex(index_path)
+    job_index = JobIndex(mapped.get_jobs())
+    mapped.close()
+
+    deltas = CSVJobDeltaInput(deltas_path, aliases=get_skill_aliases(skill_aliases))
+    job_index.apply_deltas(deltas.get_job_deltas())
+    job_index.write(output or index_path)
+    logger.info("Click command update_index end")
+
+
+@click.command(help="Serve recommendations for single jobseekers over HTTP")
+@click.argument(
+    "jobs_path",
+    required=True,
+    type=click.Path(exists=True, readable=True, path_type=Path),
+)
+@click.option("--host", default="127.0.0.1", show_default=True, help="Address to bind.")
+@click.option(
+    "--port",
+    type=click.IntRange(min=0, max=65535),
+    default=8000,
+    show_default=True,
+    help="Port to bind.",
+)
+@click.option(
+    "--unix-socket",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Listen on this Unix socket instead of --host/--port.",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(list(ENGINES)),
+    default="set",
+    show_default=True,
+    help="Matching engine used to count the skills shared by jobseekers and jobs.",
+)
+@click.option(
+    "--top-k",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Only return the best N matches of each jobseeker.",
+)
+@click.option(
+    "--min-percent",
+    type=click.IntRange(min=0, max=100),
+    default=None,
+    help="Drop matches below this matching skill percent.",
+)
+@click.option(
+    "--min-count",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Drop matches with fewer matching skills than this.",
+)
+@click.option(
+    "--index-cache",
+    type=click.Path(file_okay=False, writable=True, path_type=Path),
+    default=None,
+    help="Cache the job index in this directory, rebuilt when the jobs file changes.",
+)
+@click.option(
+    "--skill-aliases",
+    type=click.Path(exists=True, dir_okay=False, readable=True, path_type=Path),
+    default=None,
+    help="CSV of skill,aliases rows.  Aliases are replaced by their skill when read.",
+)
+def serve(
+    jobs_path: Path,
+    host: str,
+    port: int,
+    unix_socket: Path | None,
+    engine: str,
+    top_k: int | None,
+    min_percent: int | None,
+    min_count: int | None,
+    index_cache: Path | None,
+    skill_aliases: Path | None,
+) -> None:
+    """Load the job index once and answer recommendation requests.
+
+    POST /recommend with {"id": 1, "name": "Alice", "skills": ["Ruby", "SQL"]}
+    returns the matches of that jobseeker, ranked like csv-input.
+
+    Args:
+        jobs_path (Path): Jobs CSV, or a job index (.idx) built by build-index.
+        host (str): Address to bind when not using a Unix socket.
+        port (int): Port to bind when not using a Unix socket.
+        unix_socket (Path | None): Unix socket path to listen on instead.
+        engine (str): Name of the matching engine, see ENGINES.
+        top_k (int | None): Max number of matches returned per jobseeker.
+        min_percent (int | None): Minimum matching skill percent returned.
+        min_count (int | None): Minimum matching skill count returned.
+        index_cache (Path | None): Directory caching job indexes built from
+                                   jobs CSV files.
+        skill_aliases (Path | None): CSV mapping skills to their aliases,
+                                     applied to jobs and to requests.
+    """
+    logger.info("Click command serve started")
+    aliases = get_skill_aliases(skill_aliases)
+    vocabulary = SkillVocabulary()
+    service = ENGINES[engine](
+        # requests provide the jobseekers
+        jobseekers=None,
+        jobs=get_job_input(jobs_path, vocabulary, index_cache, aliases=aliases),
+        top_k=top_k,
+        min_percent=min_percent,
+        min_count=min_count,
+    )
+    server = RecommendationServer(
+        Recommender(service, vocabulary=vocabulary, aliases=aliases)
+    )
+
+    try:
+        asyncio.run(server.serve_forever(host, port, unix_socket))
+    except KeyboardInterrupt:
+        logger.info("Recommendation server stopped")
+    logger.info("Click command serve end")
+
+
+@click.command(help="Rank the best jobseekers of each job")
+@click.argument(
+    "jobseekers_path",
+    required=True,
+    type=click.Path(exists=True, readable=True, path_type=Path),
+)
+@click.argument(
+    "jobs_path",
+    required=True,
+    type=click.Path(exists=True, readable=True, path_type=Path),
+)
+@click.option(
+    "--output",
+    type=click.File("w"),
+    help="Output the results to a specified file instead of the terminal.  "
+    "Files ending with .gz or .zst are compressed.",
+)
+@click.option(
+    "--output_limit",
+    type=click.INT,
+    default=LIMIT,
+    help="Max number of records to be displayed on terminal.",
+)
+@click.option(
+    "--top-k",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Only keep the best N jobseekers of each job.",
+)
+@click.option(
+    "--min-percent",
+    type=click.IntRange(min=0, max=100),
+    default=None,
+    help="Drop candidates below this matching skill percent.",
+)
+@click.option(
+    "--min-count",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Drop candidates with fewer matching skills than this.",
+)
+@click.option(
+    "--skill-aliases",
+    type=click.Path(exists=True, dir_okay=False, readable=True, path_type=Path),
+    default=None,
+    help="CSV of skill,aliases rows.  Aliases are replaced by their skill when read.",
+)
+@click.option(
+    "--parse-workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of processes parsing the jobseekers CSV, in chunks of records.",
+)
+@click.option(
+    "--flush-size",
+    type=click.IntRange(min=1),
+    default=DEFAULT_FLUSH_SIZE,
+    show_default=True,
+    help="Characters of output rows gathered per write to --output.",
+)
+def rank_candidates(
+    jobseekers_path: Path,
+    jobs_path: Path,
+    output: Path,
+    output_limit: int,
+    top_k: int | None,
+    min_percent: int | None,
+    min_count: int | None,
+    skill_aliases: Path | None,
+    parse_workers: int,
+    flush_size: int,
+) -> None:
+    """Rank jobseekers for each job, the reverse of csv-input.
+
+    Rows are ordered by job id asc, matching_skill_percent desc and jobseeker
+    id asc.
+
+    Args:
+        jobseekers (Path): The path to the CSV file containing job seeker data.
+        jobs (Path): The path to the CSV file containing job listings, or to
+                     a job index (.idx) written by build-index.
+        top_k (int | None): Max number of jobseekers kept per job.
+        min_percent (int | None): Minimum matching skill percent kept.
+        min_count (int | None): Minimum matching skill count kept.
+        skill_aliases (Path | None): CSV mapping skills to their aliases.
+        parse_workers (int): Number of processes parsing the jobseekers CSV.
+        flush_size (int): Characters of CSV rows gathered per write.
+    """
+    logger.info("Click command rank_candidates started")
+    aliases = get_skill_aliases(skill_aliases)
+    vocabulary = SkillVocabulary()
+    recommender = ReverseRecommenderService(
+        jobseekers=get_job_seeker_input(
+            jobseekers_path, vocabulary, aliases, parse_workers
+        ),
+        jobs=get_job_input(jobs_path, vocabulary, aliases=aliases),
+        top_k=top_k,
+        min_percent=min_percent,
+        min_count=min_count,
+    )
+
+    write_results(recommender.execute(), output, output_limit, flush_size)
+    logger.info("Click command rank_candidates end")
+
+
+@click.command(help="Use Parquet or Arrow IPC inputs for Recommender")
+@click.argument(
+    "jobseekers_path",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False, readable=True, path_type=Path),
+)
+@click.argument(
+    "jobs_path",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False, readable=True, path_type=Path),
+)
+@click.option(
+    "--output",
+    type=click.File("w"),
+    help="Output the results to a specified file instead of the terminal.  "
+    "Files ending with .gz or .zst are compressed.",
+)
+@click.option(
+    "--output_limit",
+    type=click.INT,
+    default=LIMIT,
+    help="Max number of records to be displayed on terminal.",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(list(ENGINES)),
+    default="set",
+    show_default=True,
+    help="Matching engine used to count the skills shared by jobseekers and jobs.",
+)
+@click.option(
+    "--top-k",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Only keep the best N matches of each jobseeker.",
+)
+@click.option(
+    "--min-percent",
+    type=click.IntRange(min=0, max=100),
+    default=None,
+    help="Drop matches below this matching skill percent.",
+)
+@click.option(
+    "--min-count",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Drop matches with fewer matching skills than this.",
+)
+@click.option(
+    "--streaming",
+    is_flag=True,
+    help="Sort matches per jobseeker instead of holding every match in memory.",
+)
+@click.option(
+    "--presorted",
+    is_flag=True,
+    help="Jobseekers file is sorted by id.  Streaming output starts right away.",
+)
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=65_536,
+    show_default=True,
+    help="Rows read per record batch from Parquet files.",
+)
+@click.option(
+    "--skill-aliases",
+    type=click.Path(exists=True, dir_okay=False, readable=True, path_type=Path),
+    default=None,
+    help="CSV of skill,aliases rows.  Aliases are replaced by their skill when read.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(OUTPUT_FORMATS),
+    default="csv",
+    show_default=True,
+    help="Output format.  Formats other than csv are binary and need --output.",
+)
+@click.option(
+    "--flush-size",
+    type=click.IntRange(min=1),
+    default=DEFAULT_FLUSH_SIZE,
+    show_default=True,
+    help="Characters of output rows gathered per write to --output.",
+)
+def columnar_input(
+    jobseekers_path: Path,
+    jobs_path: Path,
+    output: Path,
+    output_limit: int,
+    engine: str,
+    top_k: int | None,
+    min_percent: int | None,
+    min_count: int | None,
+    streaming: bool,
+    presorted: bool,
+    batch_size: int,
+    skill_aliases: Path | None,
+    output_format: str,
+    flush_size: int,
+) -> None:
+    """Match jobs with jobseekers read from Parquet or Arrow IPC files.
+
+    Skills columns are lists of strings.  Output is the same as csv-input.
+    Matching runs in a single process, pyarrow starts threads and forking
+    worker processes after that is not safe.
+
+    Args:
+        jobseekers (Path): Parquet (.parquet) or Arrow IPC (.arrow, .feather)
+                           file with id, name and skills columns.
+        jobs (Path): Parquet or Arrow IPC file with id, title and
+                     required_skills columns.  A jobs CSV or a job index
+                     (.idx) is accepted too.
+        engine (str): Name of the matching engine, see ENGINES.
+        top_k (int | None): Max number of matches kept per jobseeker.
+        min_percent (int | None): Minimum matching skill percent kept.
+        min_count (int | None): Minimum matching skill count kept.
+        streaming (bool): Sort matches per jobseeker and stream them out.
+        presorted (bool): Jobseekers are sorted by id, no external merge needed.
+        batch_size (int): Rows per record batch read from Parquet files.
+        skill_aliases (Path | None): CSV mapping skills to their aliases.
+        output_format (str): One of OUTPUT_FORMATS.
+        flush_size (int): Characters of CSV rows gathered per write.
+
+    Raises:
+        click.ClickException: If pyarrow is not installed.
+    """
+    logger.info("Click command columnar_input started")
+    formatter = get_formatter(output_format, output)
+    try:
+        from .columnar import COLUMNAR_SUFFIXES, ArrowJobInput, ArrowJobSeekerInput
+    except ImportError:
+        raise click.ClickException(
+            "Columnar inputs require pyarrow, install recommender[arrow]"
+        )
+
+    aliases = get_skill_aliases(skill_aliases)
+    vocabulary = SkillVocabulary()
+    if jobs_path.suffix in COLUMNAR_SUFFIXES:
+        jobs = ArrowJobInput(
+            jobs_path, vocabulary=vocabulary, aliases=aliases, batch_size=batch_size
+        )
+    else:
+        jobs = get_job_input(jobs_path, vocabulary, aliases=aliases)
+
+    recommender = ENGINES[engine](
+        jobseekers=ArrowJobSeekerInput(
+            jobseekers_path,
+            vocabulary=vocabulary,
+            aliases=aliases,
+            batch_size=batch_size,
+        ),
+        jobs=jobs,
+        streaming=streaming,
+        presorted=presorted,
+        top_k=top_k,
+        min_percent=min_percent,
+        min_count=min_count,
+        formatter=formatter,
+    )
+
+    write_formatted_results(
+        recommender.execute(), output_format, output, output_limit, flush_size
+    )
+    logger.info("Click command columnar_input end")
@@ -0,0 +1,152 @@
+"""compression
+
+Transparent gzip and zstd streams, chosen from the file suffix.
+
+Compressed files are read and written as streams, never decompressed to disk
+first.  Output is compressed away from the thread formatting the results: zstd
+compresses in its own worker threads, and gzip, which the standard library
+compresses in the calling thread, is handed to a writer thread.  zlib releases
+the GIL while it compresses, so a chunk is compressed while the next one is
+formatted.
+
+zstd requires the optional zstd dependencies: pip install recommender[zstd]
+"""
+
+import gzip
+import io
+import queue
+import threading
+from pathlib import Path
+from typing import IO, BinaryIO
+import structlog
+
+
+logger: structlog.stdlib.BoundLogger = structlog.get_logger()
+
+GZIP_SUFFIX = ".gz"
+ZSTD_SUFFIX = ".zst"
+COMPRESSIONS = {GZIP_SUFFIX: "gzip", ZSTD_SUFFIX: "zstd"}
+
+# gzip defaults to 9, which compresses CSV output about 20 times slower than 1
+# for a 20% smaller file
+GZIP_LEVEL = 1
+ZSTD_LEVEL = 3
+# one zstd worker thread per CPU
+ZSTD_THREADS = -1
+
+# compressed chunks waiting for the gzip writer thread
+MAX_PENDING_WRITES = 16
+
+
+def get_compression(filename: str | Path) -> str | None:
+    """Compression of filename from its suffix, gzip or zstd, or None."""
+    return COMPRESSIONS.get(Path(filename).suffix.lower())
+
+
+class ThreadedWriter(io.RawIOBase):
+    """Binary stream handing each write to a thread that writes it to raw.
+
+    The thread is started by the first write, so a process can still fork
+    safely until output starts.  An error raised by raw is raised again by the
+    next write or by close.
+    """
+
+    def __init__(self, raw: BinaryIO, max_pending: int = MAX_PENDING_WRITES):
+        self._raw = raw
+        self._pending: queue.Queue[bytes | None] = queue.Queue(max_pending)
+        self._thread: threading.Thread | None = None
+        self._error: BaseException | None = None
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        if self._error is not None:
+            raise self._error
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._write_pending, daemon=True)
+            self._thread.start()
+
+        self._pending.put(bytes(data))
+        return len(data)
+
+    def _write_pending(self) -> None:
+        # keeps draining after an error, so write never blocks on a full queue
+        while (data := self._pending.get()) is not None:
+            if self._error is None:
+                try:
+                    self._raw.write(data)
+                except BaseException as e:
+                    self._error = e
+
+    def close(self) -> None:
+        if self.closed:
+            return
+
+        if self._thread is not None:
+            self._pending.put(None)
+            self._thread.join()
+        super().close()
+        self._raw.close()
+        if self._error is not None:
+            raise self._error
+
+
+def open_gzip(filename: str | Path, mode: str) -> BinaryIO:
+    if mode == "rb":
+        return gzip.open(filename, "rb")
+
+    return io.BufferedWriter(
+        ThreadedWriter(gzip.open(filename, "wb", compresslevel=GZIP_LEVEL))
+    )
+
+
+def open_zstd(filename: str | Path, mode: str) -> BinaryIO:
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(
+            f"{filename} requires zstandard, install recommender[zstd]"
+        ) from None
+
+    f = open(filename, mode)
+    if mode == "rb":
+        # files compressed in parallel may hold several frames
+        return zstandard.ZstdDecompressor().stream_reader(
+            f, read_across_frames=True, closefd=True
+        )
+
+    compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, threads=ZSTD_THREADS)
+    return compressor.stream_writer(f, closefd=True)
+
+
+def open_file(
+    filename: str | Path,
+    mode: str = "r",
+    encoding: str = "utf-8",
+    newline: str | None = None,
+) -> IO:
+    """Open filename like open, through gzip or zstd when its suffix says so.
+
+    mode is one of r, w, rb and wb.  Text modes decode and encode with
+    encoding and newline, like open does.
+
+    Raises:
+        ImportError: If the file is zstd compressed and zstandard is missing.
+    """
+    compression = get_compression(filename)
+    if compression is None:
+        if "b" in mode:
+            return open(filename, mode)
+        return open(filename, mode, encoding=encoding, newline=newline)
+
+    logger.debug("Opening compressed file", filename=str(filename), mode=mode)
+    binary_mode = mode[0] + "b"
+    if compression == "gzip":
+        stream = open_gzip(filename, binary_mode)
+    else:
+        stream = open_zstd(filename, binary_mode)
+
+    if "b" in mode:
+        return stream
+    return io.TextIOWrapper(stream, encoding=encoding, newline=newline)
@@ -9,6 +9,16 @@ CSV_HEADERS = [
     "matching_skill_percent",
 ]
 
+# output of rank-candidates, jobs first
+REVERSE_CSV_HEADERS = [
+    "job_id",
+    "job_title",
+    "jobseeker_id",
+    "jobseeker_name",
+    "matching_skill_count",
+    "matching_skill_percent",
+]
+
 NEW_LINE = "\n"
 
 LIMIT = 100
@@ -37,3 +47,34 @@ JOBSEEKER_CSV_SCHEMA = {
     JOBSEEKER_NAME: str,
     JOBSEEKER_SKILLS: str,
 }
+
+SKILL_ALIAS_SKILL = "skill"
+SKILL_ALIAS_ALIASES = "aliases"
+
+# canonical skill, then a comma separated list of its other spellings
+SKILL_ALIAS_CSV_SCHEMA = {
+    SKILL_ALIAS_SKILL: str,
+    SKILL_ALIAS_ALIASES: str,
+}
+
+JOB_DELTA_OP = "op"
+JOB_DELTA_ADD = "add"
+JOB_DELTA_UPDATE = "update"
+JOB_DELTA_DELETE = "delete"
+
+JOB_DELTA_CSV_SCHEMA = {
+    JOB_DELTA_OP: str,
+    JOB_ID: int,
+    JOB_TITLE: str,
+    JOB_REQUIRED_SKILLS: str,
+}
+
+JOBSEEKER_DELTA_CSV_SCHEMA = {
+    JOB_DELTA_OP: str,
+    JOBSEEKER_ID: int,
+    JOBSEEKER_NAME: str,
+    JOBSEEKER_SKILLS: str,
+}
+
+# previous output of csv_input, read back for incremental matching
+JOB_MATCH_CSV_SCHEMA = dict(zip(CSV_HEADERS, (int, str, int, str, int, int)))
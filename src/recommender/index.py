@@ -0,0 +1,521 @@
+"""index
+
+Binary job index that is built once from a job catalog and memory mapped on
+later runs, so matching can start without parsing jobs.csv again.  JobIndex
+is the mutable in memory counterpart, used to apply job deltas to a catalog
+and write the result back out.
+
+File layout, all integers little-endian:
+
+    header          magic, version and the size of every section
+    job_ids         int32[job_count]            sorted ascending
+    title_offsets   int64[job_count + 1]        into the string pool
+    skill_offsets   int64[job_count + 1]        into job_skills
+    job_skills      int32[job_skill_count]      skill rows of each job
+    name_offsets    int64[skill_count + 1]      into the string pool
+    posting_offsets int64[skill_count + 1]      into postings
+    postings        int32[posting_count]        sorted job ids of each skill
+    string pool     utf-8 job titles followed by skill names
+
+Sections are padded to 8 bytes.  Loading only maps the file and casts the
+sections to memoryviews, the arrays are never copied.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from operator import attrgetter
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Tuple
+import orjson
+import structlog
+from .constants import JOB_DELTA_ADD, JOB_DELTA_DELETE, JOB_DELTA_UPDATE
+from .models import Job, JobDelta, Skill
+from .vocabulary import SkillVocabulary
+
+
+logger: structlog.stdlib.BoundLogger = structlog.get_logger()
+
+MAGIC = b"RJIX"
+VERSION = 1
+INDEX_SUFFIX = ".idx"
+DEFAULT_CACHE_SIZE = 1024 * 1024 * 1024
+MANIFEST_FILE = "manifest.json"
+
+# magic, version, job_count, skill_count, job_skill_count, posting_count,
+# pool_size
+HEADER = struct.Struct("<4sIIIQQQ")
+INT32_MAX = 2**31 - 1
+
+
+def _padding(size: int) -> bytes:
+    return b"\0" * (-size % 8)
+
+
+def write_atomic(target: Path, write: Callable[[Path], None]) -> None:
+    """Call write on a temporary file next to target, then rename it over."""
+    target = Path(target)
+    mode = target.stat().st_mode if target.exists() else 0o644
+    fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix="tmp-")
+    os.close(fd)
+    try:
+        write(Path(tmp_name))
+        # mkstemp files are private, keep the permissions of a normal file
+        os.chmod(tmp_name, mode)
+        os.replace(tmp_name, target)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def write_job_index(jobs: Iterable[Job], filename: Path) -> None:
+    """Serialize jobs and their skill inverted index to filename.
+
+    Jobs must hold skill names, not interned skill ids, and have ids that fit
+    in an int32.
+
+    Raises:
+        ValueError: If a job id does not fit in an int32.
+        TypeError: If a job holds interned skill ids.
+    """
+    if sys.byteorder != "little":
+        raise NotImplementedError("Job index files require a little-endian host")
+
+    pool = bytearray()
+    job_ids = array("i")
+    title_offsets = array("q", [0])
+    skill_offsets = array("q", [0])
+    job_skills = array("i")
+    skill_rows: dict[str, int] = {}
+    postings_by_skill: list[array] = []
+
+    for job in sorted(jobs, key=attrgetter("id")):
+        if not 0 <= job.id <= INT32_MAX:
+            raise ValueError(f"Job id {job.id} does not fit in a job index")
+
+        job_ids.append(job.id)
+        pool.extend(job.title.encode("utf-8"))
+        title_offsets.append(len(pool))
+
+        for skill in sorted(job.required_skills):
+            if not isinstance(skill, str):
+                raise TypeError("Job index files need skill names, not skill ids")
+
+            row = skill_rows.get(skill)
+            if row is None:
+                row = skill_rows[skill] = len(postings_by_skill)
+                postings_by_skill.append(array("i"))
+
+            job_skills.append(row)
+            # jobs are visited by ascending id, so postings stay sorted
+            postings_by_skill[row].append(job.id)
+
+        skill_offsets.append(len(job_skills))
+
+    name_offsets = array("q", [len(pool)])
+    for skill in skill_rows:
+        pool.extend(skill.encode("utf-8"))
+        name_offsets.append(len(pool))
+
+    posting_offsets = array("q", [0])
+    postings = array("i")
+    for job_ids_of_skill in postings_by_skill:
+        postings.extend(job_ids_of_skill)
+        posting_offsets.append(len(postings))
+
+    with open(filename, "wb") as f:
+        f.write(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                len(job_ids),
+                len(skill_rows),
+                len(job_skills),
+                len(postings),
+                len(pool),
+            )
+        )
+        f.write(_padding(HEADER.size))
+        for section in (
+            job_ids,
+            title_offsets,
+            skill_offsets,
+            job_skills,
+            name_offsets,
+            posting_offsets,
+            postings,
+        ):
+            data = section.tobytes()
+            f.write(data)
+            f.write(_padding(len(data)))
+        f.write(pool)
+
+    logger.info(
+        "Job index written",
+        filename=str(filename),
+        jobs=len(job_ids),
+        skills=len(skill_rows),
+    )
+
+
+class MappedJobs(Mapping):
+    """Read only job_by_id view over a mapped index.
+
+    Jobs are decoded on first access and cached.
+    """
+
+    def __init__(self, index: "MappedJobIndex"):
+        self._index = index
+        self._cache: dict[int, Job] = {}
+
+    def __getitem__(self, job_id: int) -> Job:
+        job = self._cache.get(job_id)
+        if job is None:
+            job = self._cache[job_id] = self._index.get_job(job_id)
+
+        return job
+
+    def __contains__(self, job_id: object) -> bool:
+        return self._index.find_row(job_id) is not None
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._index.job_ids)
+
+    def __len__(self) -> int:
+        return len(self._index.job_ids)
+
+
+class MappedPostings(Mapping):
+    """Read only jobs_by_skills view over a mapped index.
+
+    Values are memoryviews of sorted int32 job ids, sliced from the file.
+    """
+
+    def __init__(self, index: "MappedJobIndex"):
+        self._index = index
+
+    def __getitem__(self, skill: Skill) -> memoryview:
+        return self._index.get_postings(self._index.skill_rows[skill])
+
+    def __contains__(self, skill: object) -> bool:
+        return skill in self._index.skill_rows
+
+    def __iter__(self) -> Iterator[Skill]:
+        return iter(self._index.skill_rows)
+
+    def __len__(self) -> int:
+        return len(self._index.skill_rows)
+
+
+class MappedJobIndex:
+    """Job input backed by a memory mapped job index file.
+
+    Implements both the JobInput and JobIndexInput protocols, so it can be
+    passed to a recommender service in place of CSVJobInput.
+
+    Args:
+        filename (Path): Index file written by write_job_index.
+        vocabulary (SkillVocabulary | None): When given, skill names are
+                                             interned and jobs hold skill ids.
+    """
+
+    def __init__(self, filename: Path, vocabulary: SkillVocabulary | None = None):
+        if sys.byteorder != "little":
+            raise NotImplementedError("Job index files require a little-endian host")
+
+        self.filename = filename
+        self.vocabulary = vocabulary
+
+        with open(filename, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(self._mmap)
+        self._views = [view]
+        (
+            magic,
+            version,
+            job_count,
+            skill_count,
+            job_skill_count,
+            posting_count,
+            pool_size,
+        ) = HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{filename} is not a version {VERSION} job index")
+
+        offset = HEADER.size + len(_padding(HEADER.size))
+
+        def section(fmt: str, count: int) -> memoryview:
+            nonlocal offset
+            size = count * struct.calcsize(fmt)
+            data = view[offset : offset + size].cast(fmt)
+            offset += size + len(_padding(size))
+            self._views.append(data)
+            return data
+
+        self.job_ids = section("i", job_count)
+        self._title_offsets = section("q", job_count + 1)
+        self._skill_offsets = section("q", job_count + 1)
+        self._job_skills = section("i", job_skill_count)
+        self._name_offsets = section("q", skill_count + 1)
+        self._posting_offsets = section("q", skill_count + 1)
+        self._postings = section("i", posting_count)
+        self._pool = view[offset : offset + pool_size]
+        self._views.append(self._pool)
+
+        # skill names are few, decode them once so lookups are a dict hit
+        self._skills: list[Skill] = [
+            self._get_string(self._name_offsets[row], self._name_offsets[row + 1])
+            for row in range(skill_count)
+        ]
+        if vocabulary is not None:
+            self._skills = [vocabulary.intern(skill) for skill in self._skills]
+        self.skill_rows: dict[Skill, int] = {
+            skill: row for row, skill in enumerate(self._skills)
+        }
+
+        self.jobs_by_id = MappedJobs(self)
+        self.jobs_by_skills = MappedPostings(self)
+
+    def _get_string(self, start: int, end: int) -> str:
+        return str(self._pool[start:end], "utf-8")
+
+    def find_row(self, job_id: object) -> int | None:
+        row = bisect_left(self.job_ids, job_id)
+        if row < len(self.job_ids) and self.job_ids[row] == job_id:
+            return row
+
+        return None
+
+    def get_postings(self, skill_row: int) -> memoryview:
+        offsets = self._posting_offsets
+        return self._postings[offsets[skill_row] : offsets[skill_row + 1]]
+
+    def _get_job_at(self, row: int) -> Job:
+        skills = self._skills
+        job_skills = self._job_skills[
+            self._skill_offsets[row] : self._skill_offsets[row + 1]
+        ]
+        required_skills = {skills[skill_row] for skill_row in job_skills}
+
+        return Job(
+            id=self.job_ids[row],
+            title=self._get_string(
+                self._title_offsets[row], self._title_offsets[row + 1]
+            ),
+            required_skills=(
+                required_skills
+                if self.vocabulary is None
+                else frozenset(required_skills)
+            ),
+        )
+
+    def get_job(self, job_id: int) -> Job:
+        row = self.find_row(job_id)
+        if row is None:
+            raise KeyError(job_id)
+
+        return self._get_job_at(row)
+
+    def get_jobs(self) -> Iterator[Job]:
+        for row in range(len(self.job_ids)):
+            yield self._get_job_at(row)
+
+    def get_job_indexes(self) -> Tuple[MappedJobs, MappedPostings]:
+        return self.jobs_by_id, self.jobs_by_skills
+
+    def close(self) -> None:
+        """Unmap the file.
+
+        Postings and job ids handed out earlier must not be used afterwards.
+        """
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+
+class JobIndex:
+    """Mutable job index that jobs can be added to, updated in or deleted from.
+
+    Keeps jobs_by_id and the jobs_by_skills postings consistent, so applying a
+    delta only touches the postings of the skills of the changed jobs.
+    Implements the JobInput and JobIndexInput protocols.
+
+    Args:
+        jobs (Iterable[Job]): Initial catalog, e.g. MappedJobIndex.get_jobs().
+    """
+
+    def __init__(self, jobs: Iterable[Job] = ()):
+        self.jobs_by_id: dict[int, Job] = {}
+        self.jobs_by_skills: dict[Skill, set[int]] = {}
+        for job in jobs:
+            self.add(job)
+
+    def _index_skills(self, job: Job) -> None:
+        for skill in job.required_skills:
+            self.jobs_by_skills.setdefault(skill, set()).add(job.id)
+
+    def _unindex_skills(self, job: Job) -> None:
+        for skill in job.required_skills:
+            job_ids = self.jobs_by_skills[skill]
+            job_ids.discard(job.id)
+            if not job_ids:
+                del self.jobs_by_skills[skill]
+
+    def add(self, job: Job) -> None:
+        """Raises ValueError if the job id is already indexed."""
+        if job.id in self.jobs_by_id:
+            raise ValueError(f"Job {job.id} is already in the index")
+
+        self.jobs_by_id[job.id] = job
+        self._index_skills(job)
+
+    def update(self, job: Job) -> None:
+        """Raises KeyError if the job id is not indexed."""
+        self._unindex_skills(self.jobs_by_id[job.id])
+        self.jobs_by_id[job.id] = job
+        self._index_skills(job)
+
+    def delete(self, job_id: int) -> None:
+        """Raises KeyError if the job id is not indexed."""
+        self._unindex_skills(self.jobs_by_id.pop(job_id))
+
+    def apply_deltas(self, deltas: Iterable[JobDelta]) -> dict[str, int]:
+        """Apply deltas in order and return the number applied per op.
+
+        Raises on the first invalid delta, the ones before it stay applied.
+        """
+        counts = {JOB_DELTA_ADD: 0, JOB_DELTA_UPDATE: 0, JOB_DELTA_DELETE: 0}
+
+        for delta in deltas:
+            if delta.op == JOB_DELTA_ADD:
+                self.add(delta.job)
+            elif delta.op == JOB_DELTA_UPDATE:
+                self.update(delta.job)
+            elif delta.op == JOB_DELTA_DELETE:
+                self.delete(delta.job.id)
+            else:
+                raise ValueError(f"Unknown job delta operation: {delta.op}")
+            counts[delta.op] += 1
+
+        logger.info("Applied job deltas", **counts)
+        return counts
+
+    def get_jobs(self) -> Iterator[Job]:
+        return iter(self.jobs_by_id.values())
+
+    def get_job_indexes(self) -> Tuple[dict[int, Job], dict[Skill, set[int]]]:
+        return self.jobs_by_id, self.jobs_by_skills
+
+    def write(self, filename: Path) -> None:
+        """Persist the index, replacing filename atomically."""
+        write_atomic(filename, lambda path: write_job_index(self.get_jobs(), path))
+
+
+class JobIndexCache:
+    """Directory of job indexes built from job CSV files.
+
+    Entries are named after the SHA-256 of the jobs file, so an index is only
+    rebuilt when the file content changes.  A manifest remembers the size,
+    mtime and hash of every jobs file seen, and the hash is only recomputed
+    when the size or mtime changed.
+
+    Entries are touched on every hit.  After an entry is added, the least
+    recently used ones are deleted until the cache fits in max_bytes.
+
+    Args:
+        directory (Path): Cache directory, created if missing.
+        max_bytes (int): Size cap of all cached indexes together.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_CACHE_SIZE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _read_manifest(self) -> dict:
+        try:
+            return orjson.loads((self.directory / MANIFEST_FILE).read_bytes())
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            return {}
+
+    def _write_manifest(self, manifest: dict) -> None:
+        write_atomic(
+            self.directory / MANIFEST_FILE,
+            lambda path: path.write_bytes(orjson.dumps(manifest)),
+        )
+
+    def get_digest(self, jobs_path: Path) -> str:
+        """SHA-256 of jobs_path, reused from the manifest while unchanged."""
+        stat = jobs_path.stat()
+        key = str(jobs_path.resolve())
+        manifest = self._read_manifest()
+
+        entry = manifest.get(key)
+        if (
+            entry is not None
+            and entry["size"] == stat.st_size
+            and entry["mtime_ns"] == stat.st_mtime_ns
+        ):
+            return entry["digest"]
+
+        with open(jobs_path, "rb") as f:
+            digest = hashlib.file_digest(f, "sha256").hexdigest()
+
+        manifest[key] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "digest": digest,
+        }
+        self._write_manifest(manifest)
+        return digest
+
+    def get_index_path(
+        self,
+        jobs_path: Path,
+        get_jobs: Callable[[], Iterable[Job]],
+        variant: str = "",
+    ) -> Path:
+        """Path of the cached index of jobs_path, built with get_jobs on a miss.
+
+        Indexes of the same jobs file built differently, e.g. with a skill
+        alias table, are told apart by variant.
+        """
+        name = self.get_digest(jobs_path) + (f"-{variant}" if variant else "")
+        index_path = self.directory / (name + INDEX_SUFFIX)
+
+        if index_path.exists():
+            logger.info("Job index cache hit", index_path=str(index_path))
+            os.utime(index_path)
+            return index_path
+
+        logger.info("Job index cache miss", index_path=str(index_path))
+        write_atomic(index_path, lambda path: write_job_index(get_jobs(), path))
+        self.evict(keep=index_path)
+        return index_path
+
+    def evict(self, keep: Path | None = None) -> None:
+        """Delete least recently used entries until max_bytes is respected."""
+        entries = sorted(
+            (path.stat().st_mtime_ns, path.stat().st_size, path)
+            for path in self.directory.glob("*" + INDEX_SUFFIX)
+        )
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+
+            path.unlink(missing_ok=True)
+            total -= size
+            logger.info("Evicted job index from cache", index_path=str(path))
@@ -4,97 +4,419 @@ import csv
 from pathlib import Path
 from dataclasses import dataclass, field
 import structlog
-from typing import Iterator, Any
-from .models import Job, JobSeeker
+from operator import itemgetter
+from typing import Iterable, Iterator, Any, Sequence
+from .compression import open_file
+from .models import Job, JobDelta, JobMatch, JobSeeker, JobSeekerDelta, Skills
+from .vocabulary import SkillVocabulary
 from .constants import (
     JOB_CSV_SCHEMA,
+    JOB_DELTA_ADD,
+    JOB_DELTA_CSV_SCHEMA,
+    JOB_DELTA_DELETE,
+    JOB_DELTA_UPDATE,
+    JOB_MATCH_CSV_SCHEMA,
     JOBSEEKER_CSV_SCHEMA,
+    JOBSEEKER_DELTA_CSV_SCHEMA,
     JOB_ID,
-    JOB_REQUIRED_SKILLS,
-    JOB_TITLE,
     JOBSEEKER_ID,
-    JOBSEEKER_NAME,
-    JOBSEEKER_SKILLS,
+    SKILL_ALIAS_CSV_SCHEMA,
 )
 
-
 logger: structlog.stdlib.BoundLogger = structlog.get_logger()
 
 
-def convert_csv_row(
+def get_column_indexes(header: list[str], schema: dict[str, Any]) -> list[int]:
+    """Resolve the position of every schema column in the CSV header.
+
+    Raises:
+        KeyError: If the header has a column that is not in the schema, or is
+                  missing one of the schema columns.
+    """
+    positions = {column: position for position, column in enumerate(header)}
+    for column in header:
+        if column not in schema:
+            raise KeyError(column)
+
+    return [positions[column] for column in schema]
+
+
+def read_csv_rows(
+    filename: Path,
     schema: dict[str, Any],
-    csv_row: dict[str, str],
     encountered_ids: set[int],
-    id_field: str,
+    id_field: str | None,
     name: str,
-) -> dict[str, Any]:
-    try:
-        converted_row = {key: schema[key](value) for key, value in csv_row.items()}
-        if converted_row[id_field] not in encountered_ids:
-            encountered_ids.add(converted_row[id_field])
-        else:
-            raise ValueError("Duplicate row ID found")
-
-        return converted_row
-
-    except ValueError as e:
-        logger.error(
-            f"Error converting row for {name}",
-            error=str(e),
+) -> Iterator[list[Any]]:
+    """Yield the converted values of each CSV row, ordered like schema.
+
+    gzip and zstd files are decompressed as they are read.  See
+    convert_csv_rows.
+
+    Raises:
+        KeyError: If the header does not match the schema.
+        ValueError: If a row does not have as many fields as the header, a
+                    value cannot be converted or a row id is duplicated.
+    """
+    with open_file(filename, "r", newline="") as data:
+        reader = csv.reader(data)
+        header = next(reader, None)
+        if header is None:
+            return
+
+        yield from convert_csv_rows(
+            reader, header, schema, encountered_ids, id_field, name
         )
-        raise
+
+
+def convert_csv_rows(
+    rows: Iterable[list[str]],
+    header: list[str],
+    schema: dict[str, Any],
+    encountered_ids: set[int],
+    id_field: str | None,
+    name: str,
+) -> Iterator[list[Any]]:
+    """Yield the converted values of each row read under header, ordered like
+    schema.
+
+    Column positions are resolved once from the header, and rows are read as
+    plain lists, so no dict is built per row.  Only non str columns of the
+    schema are converted.  Ids are only checked for duplicates when id_field
+    is given.
+
+    Raises:
+        KeyError: If the header does not match the schema.
+        ValueError: If a row does not have as many fields as the header, a
+                    value cannot be converted or a row id is duplicated.
+    """
+    get_values = itemgetter(*get_column_indexes(header, schema))
+    conversions = [
+        (position, convert)
+        for position, convert in enumerate(schema.values())
+        if convert is not str
+    ]
+    id_position = None if id_field is None else list(schema).index(id_field)
+    field_count = len(header)
+
+    for row in rows:
+        if not row:
+            continue
+
+        try:
+            # itemgetter would silently drop extra fields, like the rest of
+            # a title holding an unquoted comma
+            if len(row) != field_count:
+                raise ValueError(f"Expected {field_count} fields, got {len(row)}")
+
+            values = list(get_values(row))
+            for position, convert in conversions:
+                values[position] = convert(values[position])
+
+            if id_position is not None:
+                if values[id_position] in encountered_ids:
+                    raise ValueError("Duplicate row ID found")
+                encountered_ids.add(values[id_position])
+
+        except (ValueError, IndexError) as e:
+            logger.error(
+                f"Error converting row for {name}",
+                error=str(e),
+            )
+            raise
+
+        yield values
+
+
+def get_delta_op(op: str, row_id: int) -> str:
+    """Normalize a delta operation, raising ValueError if it is unknown."""
+    op = op.strip().lower()
+    if op not in (JOB_DELTA_ADD, JOB_DELTA_UPDATE, JOB_DELTA_DELETE):
+        logger.error("Unknown delta operation", op=op, id=row_id)
+        raise ValueError(f"Unknown delta operation: {op}")
+
+    return op
+
+
+class SkillAliases(dict[str, str]):
+    """Lookup table from raw skill tokens to canonical skill names.
+
+    Seeded with an alias table, see compile_skill_aliases.  A token seen for
+    the first time is stripped and resolved through the aliases, and the
+    result is stored under the raw token, so stripping and resolving cost a
+    single dict lookup per token from then on.  The table grows with the
+    number of distinct tokens, so it is built once per pass over a file.
+    """
+
+    __slots__ = ()
+
+    def __missing__(self, token: str) -> str:
+        skill = token.strip()
+        skill = self.get(skill, skill)
+        self[token] = skill
+        return skill
+
+
+def normalize_skills(skills: str, aliases: SkillAliases | None = None) -> Iterator[str]:
+    """Normalized names of a comma separated list of skills, in list order."""
+    return map(
+        str.strip if aliases is None else aliases.__getitem__,
+        skills.upper().split(","),
+    )
+
+
+def parse_skills(
+    skills: str,
+    vocabulary: SkillVocabulary | None = None,
+    aliases: SkillAliases | None = None,
+) -> Skills:
+    """Split a comma separated list of skills and normalize each skill.
+
+    When aliases are given, skills are replaced by their canonical name.
+    When a vocabulary is given, skills are interned to their integer ids.
+    """
+    normalized = normalize_skills(skills, aliases)
+    if vocabulary is None:
+        return set(normalized)
+
+    return vocabulary.intern_all(normalized)
+
+
+def compile_skill_aliases(rows: Iterable[Sequence[str]]) -> dict[str, str]:
+    """Compile (skill, comma separated aliases) pairs into one lookup table.
+
+    Names are normalized like parse_skills, and the table maps every alias to
+    its canonical skill.  Canonical skills are never aliases themselves, so a
+    single lookup always resolves a skill.
+
+    Raises:
+        ValueError: If an alias has two canonical skills, or a canonical skill
+                    is also an alias.
+    """
+    aliases: dict[str, str] = {}
+    canonical_skills: set[str] = set()
+    for skill, skill_aliases in rows:
+        canonical = skill.strip().upper()
+        canonical_skills.add(canonical)
+        for alias in map(str.strip, skill_aliases.upper().split(",")):
+            if not alias or alias == canonical:
+                continue
+            if aliases.setdefault(alias, canonical) != canonical:
+                raise ValueError(
+                    f"Skill alias {alias} maps to both {aliases[alias]} and {canonical}"
+                )
+
+    chained = canonical_skills.intersection(aliases)
+    if chained:
+        raise ValueError(
+            f"Skills are both canonical and aliases: {', '.join(sorted(chained))}"
+        )
+
+    return aliases
+
+
+def read_skill_aliases(filename: Path) -> dict[str, str]:
+    """Read a skill,aliases CSV into an alias to canonical skill table.
+
+    Raises:
+        KeyError: If the header does not match SKILL_ALIAS_CSV_SCHEMA.
+        ValueError: If aliases conflict, see compile_skill_aliases.
+    """
+    rows = read_csv_rows(
+        filename=filename,
+        schema=SKILL_ALIAS_CSV_SCHEMA,
+        encountered_ids=set(),
+        id_field=None,
+        name="SkillAlias",
+    )
+    aliases = compile_skill_aliases(rows)
+    logger.info("Skill aliases loaded", filename=str(filename), aliases=len(aliases))
+    return aliases
 
 
 @dataclass
 class CSVJobInput:
     filename: Path
     ids_encountered: set[int] = field(default_factory=set)
+    vocabulary: SkillVocabulary | None = None
+    aliases: dict[str, str] | None = None
 
     def get_jobs(self) -> Iterator[Job]:
-        with open(self.filename, "r", encoding="utf-8") as data:
-            reader = csv.DictReader(data)
+        # ids are unique per pass, the file may be read more than once
+        self.ids_encountered = set()
+        rows = read_csv_rows(
+            filename=self.filename,
+            schema=JOB_CSV_SCHEMA,
+            encountered_ids=self.ids_encountered,
+            id_field=JOB_ID,
+            name=Job.__name__,
+        )
+        aliases = SkillAliases(self.aliases) if self.aliases else None
 
-            for row in reader:
-                converted_row = convert_csv_row(
-                    schema=JOB_CSV_SCHEMA,
-                    csv_row=row,
-                    encountered_ids=self.ids_encountered,
-                    id_field=JOB_ID,
-                    name=Job.__name__,
-                )
+        for job_id, title, required_skills in rows:
+            yield Job(
+                id=job_id,
+                title=title,
+                required_skills=parse_skills(required_skills, self.vocabulary, aliases),
+            )
 
-                yield Job(
-                    id=converted_row[JOB_ID],
-                    title=converted_row[JOB_TITLE],
-                    required_skills={
-                        skill.strip().upper()
-                        for skill in converted_row[JOB_REQUIRED_SKILLS].split(",")
-                    },
-                )
+
+@dataclass
+class CSVJobDeltaInput:
+    """Add, update and delete operations on jobs, one per row.
+
+    Columns are op, id, title and required_skills.  title and required_skills
+    may be left empty for deletes.  Each job id appears at most once per file.
+    """
+
+    filename: Path
+    ids_encountered: set[int] = field(default_factory=set)
+    vocabulary: SkillVocabulary | None = None
+    aliases: dict[str, str] | None = None
+
+    def get_job_deltas(self) -> Iterator[JobDelta]:
+        self.ids_encountered = set()
+        rows = read_csv_rows(
+            filename=self.filename,
+            schema=JOB_DELTA_CSV_SCHEMA,
+            encountered_ids=self.ids_encountered,
+            id_field=JOB_ID,
+            name=JobDelta.__name__,
+        )
+        aliases = SkillAliases(self.aliases) if self.aliases else None
+
+        for op, job_id, title, required_skills in rows:
+            op = get_delta_op(op, job_id)
+            yield JobDelta(
+                op=op,
+                job=Job(
+                    id=job_id,
+                    title=title,
+                    required_skills=(
+                        parse_skills(required_skills, self.vocabulary, aliases)
+                        if op != JOB_DELTA_DELETE
+                        else set()
+                    ),
+                ),
+            )
 
 
 @dataclass
 class CSVJobSeekerInput:
     filename: Path
     ids_encountered: set[int] = field(default_factory=set)
+    vocabulary: SkillVocabulary | None = None
+    aliases: dict[str, str] | None = None
 
     def get_job_seekers(self) -> Iterator[JobSeeker]:
-        with open(self.filename, "r", encoding="utf-8") as data:
-            reader = csv.DictReader(data)
+        # ids are unique per pass, the file may be read more than once
+        self.ids_encountered = set()
+        rows = read_csv_rows(
+            filename=self.filename,
+            schema=JOBSEEKER_CSV_SCHEMA,
+            encountered_ids=self.ids_encountered,
+            id_field=JOBSEEKER_ID,
+            name=JobSeeker.__name__,
+        )
+        aliases = SkillAliases(self.aliases) if self.aliases else None
+
+        for jobseeker_id, name, skills in rows:
+            yield JobSeeker(
+                id=jobseeker_id,
+                name=name,
+                skills=parse_skills(skills, self.vocabulary, aliases),
+            )
+
+
+@dataclass
+class CSVJobSeekerDeltaInput:
+    """Add, update and delete operations on jobseekers, one per row.
+
+    Columns are op, id, name and skills.  name and skills may be left empty
+    for deletes.  Each jobseeker id appears at most once per file.
+    """
+
+    filename: Path
+    ids_encountered: set[int] = field(default_factory=set)
+    vocabulary: SkillVocabulary | None = None
+    aliases: dict[str, str] | None = None
+
+    def get_job_seeker_deltas(self) -> Iterator[JobSeekerDelta]:
+        self.ids_encountered = set()
+        rows = read_csv_rows(
+            filename=self.filename,
+            schema=JOBSEEKER_DELTA_CSV_SCHEMA,
+            encountered_ids=self.ids_encountered,
+            id_field=JOBSEEKER_ID,
+            name=JobSeekerDelta.__name__,
+        )
+        aliases = SkillAliases(self.aliases) if self.aliases else None
+
+        for op, jobseeker_id, name, skills in rows:
+            op = get_delta_op(op, jobseeker_id)
+            yield JobSeekerDelta(
+                op=op,
+                jobseeker=JobSeeker(
+                    id=jobseeker_id,
+                    name=name,
+                    skills=(
+                        parse_skills(skills, self.vocabulary, aliases)
+                        if op != JOB_DELTA_DELETE
+                        else set()
+                    ),
+                ),
+            )
+
+
+@dataclass
+class CSVJobMatchInput:
+    """Matches written by csv_input, read back in the order they were written.
+
+    Only ids, names, titles and the matching counts are stored in the output,
+    so the rebuilt jobseekers and jobs have no skills.  Rows of a jobseeker
+    are consecutive, so one JobSeeker is shared by all of them, and one Job is
+    shared by all the rows of the same job.
+    """
+
+    filename: Path
+
+    def get_job_matches(self) -> Iterator[JobMatch]:
+        with open_file(self.filename, "r", newline="") as data:
+            reader = csv.reader(data)
+            header = next(reader, None)
+            if header is None:
+                return
+
+            get_values = itemgetter(*get_column_indexes(header, JOB_MATCH_CSV_SCHEMA))
+            jobseeker_key = jobseeker = None
+            jobs: dict[str, Job] = {}
+
             for row in reader:
-                converted_row = convert_csv_row(
-                    schema=JOBSEEKER_CSV_SCHEMA,
-                    csv_row=row,
-                    encountered_ids=self.ids_encountered,
-                    id_field=JOB_ID,
-                    name=JobSeeker.__name__,
-                )
+                if not row:
+                    continue
 
-                yield JobSeeker(
-                    id=converted_row[JOBSEEKER_ID],
-                    name=converted_row[JOBSEEKER_NAME],
-                    skills={
-                        skill.strip().upper()
-                        for skill in converted_row[JOBSEEKER_SKILLS].split(",")
-                    },
-                )
+                try:
+                    if len(row) != len(header):
+                        raise ValueError(
+                            f"Expected {len(header)} fields, got {len(row)}"
+                        )
+
+                    jobseeker_id, name, job_id, title, count, percent = get_values(row)
+                    if jobseeker_id != jobseeker_key:
+                        jobseeker_key = jobseeker_id
+                        jobseeker = JobSeeker(id=int(jobseeker_id), name=name)
+
+                    job = jobs.get(job_id)
+                    if job is None:
+                        job = jobs[job_id] = Job(id=int(job_id), title=title)
+
+                    # positional, keywords are noticeably slower per row
+                    job_match = JobMatch(jobseeker, job, int(count), int(percent))
+                except (ValueError, IndexError) as e:
+                    logger.error(
+                        f"Error converting row for {JobMatch.__name__}",
+                        error=str(e),
+                    )
+                    raise
+
+                yield job_match
@@ -1,20 +1,39 @@
 """Models"""
 
 from dataclasses import dataclass, field
+from operator import attrgetter
+
+# Normalized skill names, or their ids when interned with a SkillVocabulary
+Skill = str | int
+Skills = set[str] | frozenset[int]
 
 
 @dataclass(slots=True)
 class JobSeeker:
     id: int
     name: str
-    skills: set[str] = field(default_factory=set)
+    skills: Skills = field(default_factory=set)
 
 
 @dataclass(slots=True)
 class Job:
     id: int
     title: str
-    required_skills: set[str] = field(default_factory=set)
+    required_skills: Skills = field(default_factory=set)
+
+
+@dataclass(slots=True)
+class JobDelta:
+    # one of constants JOB_DELTA_ADD, JOB_DELTA_UPDATE or JOB_DELTA_DELETE
+    op: str
+    job: Job
+
+
+@dataclass(slots=True)
+class JobSeekerDelta:
+    # one of constants JOB_DELTA_ADD, JOB_DELTA_UPDATE or JOB_DELTA_DELETE
+    op: str
+    jobseeker: JobSeeker
 
 
 @dataclass(order=False, slots=True)
@@ -25,6 +44,17 @@ class JobMatch:
     matching_skill_count: int
     matching_skill_percent: int
 
+    # Same ordering as __lt__, computed once so large sorts can use
+    # key=match_sort_key and compare tuples in C instead of calling __lt__.
+    sort_key: tuple[int, int, int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.sort_key = (
+            self.jobseeker.id,
+            -self.matching_skill_percent,
+            self.job.id,
+        )
+
     def __lt__(self, other):
         # Sort by jobseeker.id asc, matching_skill_percent desc, job.id asc
         if self.jobseeker.id != other.jobseeker.id:
@@ -51,3 +81,6 @@ class JobMatch:
             and self.matching_skill_percent == other.matching_skill_percent
             and self.job.id == other.job.id
         )
+
+
+match_sort_key = attrgetter("sort_key")
@@ -0,0 +1,53 @@
+"""output
+
+Buffered writing of formatted result lines.
+
+Writing a line at a time costs a string concatenation and a write call per
+match, tens of millions of them for large runs.  Lines are instead gathered
+in batches of about flush_size characters, joined once, and written with a
+single large write.
+"""
+
+from itertools import batched, chain, islice
+from typing import Iterable, TextIO
+import structlog
+from .constants import NEW_LINE
+
+
+logger: structlog.stdlib.BoundLogger = structlog.get_logger()
+
+DEFAULT_FLUSH_SIZE = 64 * 1024
+
+# lines used to estimate how many lines make up flush_size
+SAMPLE_LINES = 1000
+
+
+def write_lines(
+    lines: Iterable[str], f: TextIO, flush_size: int = DEFAULT_FLUSH_SIZE
+) -> int:
+    """Write lines to f, each followed by NEW_LINE, in writes of about
+    flush_size characters.
+
+    The number of lines per write is estimated from the average length of the
+    first SAMPLE_LINES lines, so no length is computed per line after that.
+
+    Returns:
+        int: Number of lines written.
+    """
+    lines = iter(lines)
+    sample = list(islice(lines, SAMPLE_LINES))
+    if not sample:
+        return 0
+
+    line_size = sum(map(len, sample)) // len(sample) + len(NEW_LINE)
+    lines_per_write = max(1, flush_size // line_size)
+    logger.debug(
+        "Buffered write", flush_size=flush_size, lines_per_write=lines_per_write
+    )
+
+    count = 0
+    for batch in batched(chain(sample, lines), lines_per_write):
+        f.write(NEW_LINE.join(batch) + NEW_LINE)
+        count += len(batch)
+
+    return count
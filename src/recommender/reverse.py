@@ -0,0 +1,190 @@
+"""reverse
+
+Job centric matching: ranks the jobseekers that best fit each job.
+
+The jobseeker side is usually orders of magnitude larger than the job side,
+so it is not indexed like jobs are.  Each jobseeker gets a row number, and the
+inverted index maps every skill to an array('i') of row numbers, 4 bytes per
+posting instead of a set entry per jobseeker id.  Only ids and names are kept
+per row, jobseeker skills are not held at all once indexed.
+
+Jobs are then matched one at a time, in id order, and the candidates of each
+job are yielded as soon as they are ranked, so output is streamed.
+"""
+
+import heapq
+from array import array
+from collections import Counter
+from itertools import chain
+from operator import attrgetter
+from typing import Any, Iterable, Iterator
+import structlog
+from .constants import REVERSE_CSV_HEADERS
+from .logging_config import time_execution
+from .models import Job, JobMatch, JobSeeker, Skill
+from .services import (
+    JobInput,
+    JobSeekerInput,
+    ResultFormatter,
+    get_matching_percentage,
+    quote_csv_field,
+)
+
+logger: structlog.stdlib.BoundLogger = structlog.get_logger()
+
+
+def format_job_candidates_as_csv(job_matches: Iterable[JobMatch]) -> Iterator[str]:
+    yield ",".join(REVERSE_CSV_HEADERS)
+
+    # rows of a job are consecutive, names of jobseekers are not
+    job = title = None
+    for job_match in job_matches:
+        if job_match.job is not job:
+            job = job_match.job
+            title = quote_csv_field(job.title)
+
+        yield (
+            ",".join(
+                (
+                    str(job.id),
+                    title,
+                    str(job_match.jobseeker.id),
+                    quote_csv_field(job_match.jobseeker.name),
+                    str(job_match.matching_skill_count),
+                    str(job_match.matching_skill_percent),
+                )
+            )
+        )
+
+
+class SeekerIndex:
+    """Compact inverted index of jobseekers by skill.
+
+    Args:
+        jobseekers (Iterable[JobSeeker]): Indexed in a single pass.
+    """
+
+    __slots__ = ("ids", "names", "rows_by_skill")
+
+    def __init__(self, jobseekers: Iterable[JobSeeker]):
+        self.ids = array("q")
+        self.names: list[str] = []
+        self.rows_by_skill: dict[Skill, array] = {}
+
+        rows_by_skill = self.rows_by_skill
+        for row, jobseeker in enumerate(jobseekers):
+            self.ids.append(jobseeker.id)
+            self.names.append(jobseeker.name)
+            for skill in jobseeker.skills:
+                postings = rows_by_skill.get(skill)
+                if postings is None:
+                    postings = rows_by_skill[skill] = array("i")
+                postings.append(row)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def count_overlaps(self, skills: Iterable[Skill]) -> Counter:
+        """Number of the given skills held by each jobseeker row."""
+        rows_by_skill = self.rows_by_skill
+        return Counter(
+            chain.from_iterable(
+                rows_by_skill[skill] for skill in skills if skill in rows_by_skill
+            )
+        )
+
+
+class ReverseRecommenderService:
+    """Ranks the jobseekers of each job.
+
+    Candidates of a job are ranked by matching_skill_percent desc then
+    jobseeker id asc, with the same percent definition as the jobseeker
+    centric services.  Jobs are output in id order.
+
+    Args:
+        jobseekers (JobSeekerInput): Indexed once into a SeekerIndex.
+        jobs (JobInput): Held in memory, the small side.
+        formatter (ResultFormatter): Formats the stream of matches.
+        top_k (int | None): Only keep the best top_k candidates of each job.
+        min_percent (int | None): Drop candidates below this percent.
+        min_count (int | None): Drop candidates with fewer matching skills.
+    """
+
+    def __init__(
+        self,
+        jobseekers: JobSeekerInput,
+        jobs: JobInput,
+        formatter: ResultFormatter = format_job_candidates_as_csv,
+        top_k: int | None = None,
+        min_percent: int | None = None,
+        min_count: int | None = None,
+    ):
+        self.jobseekers = jobseekers
+        self.jobs = jobs
+        self.formatter = formatter
+        self.top_k = top_k
+        self.min_percent = min_percent
+        self.min_count = min_count
+
+    def _get_min_count(self, required_count: int) -> int:
+        """Smallest matching skill count that passes both thresholds."""
+        count = max(self.min_count or 1, 1)
+        if self.min_percent:
+            while (
+                count <= required_count
+                and get_matching_percentage(count, required_count) < self.min_percent
+            ):
+                count += 1
+
+        return count
+
+    def _get_candidates(self, job: Job, seekers: SeekerIndex) -> list[JobMatch]:
+        required_count = len(job.required_skills)
+        if not required_count:
+            return []
+
+        min_count = self._get_min_count(required_count)
+        # tuples sort like the ranking: percent desc then jobseeker id asc
+        candidates = [
+            (
+                -get_matching_percentage(count, required_count),
+                seekers.ids[row],
+                row,
+                count,
+            )
+            for row, count in seekers.count_overlaps(job.required_skills).items()
+            if count >= min_count
+        ]
+        if self.top_k is not None:
+            candidates = heapq.nsmallest(self.top_k, candidates)
+        else:
+            candidates.sort()
+
+        return [
+            JobMatch(
+                jobseeker=JobSeeker(id=jobseeker_id, name=seekers.names[row]),
+                job=job,
+                matching_skill_count=count,
+                matching_skill_percent=-percent,
+            )
+            for percent, jobseeker_id, row, count in candidates
+        ]
+
+    def _stream_job_candidates(self) -> Iterator[JobMatch]:
+        logger.debug("Building jobseeker index")
+        seekers = SeekerIndex(self.jobseekers.get_job_seekers())
+        logger.info(
+            "Built jobseeker index",
+            jobseekers=len(seekers),
+            skills=len(seekers.rows_by_skill),
+        )
+
+        for job in sorted(self.jobs.get_jobs(), key=attrgetter("id")):
+            yield from self._get_candidates(job, seekers)
+
+        logger.info("Done ranking jobseekers for all jobs")
+
+    @time_execution(logger)
+    def execute(self) -> Any:
+        logger.info("Execute function started")
+        return self.formatter(self._stream_job_candidates())
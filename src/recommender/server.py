@@ -0,0 +1,249 @@
+"""server
+
+Long running recommendation server that keeps the job index warm.
+
+Speaks a minimal subset of HTTP/1.1 over TCP or a Unix socket, with keep-alive
+so clients pay connection setup once:
+
+    POST /recommend        {"id": 1, "name": "Alice", "skills": ["Ruby", "SQL"]}
+                           skills may also be a comma separated string.
+                           Returns {"jobseeker_id": ..., "matches": [...]},
+                           ranked like InMemoryRecommenderService.
+    POST /recommend/batch  {"jobseekers": [<jobseeker>, ...]}
+                           Returns {"results": [<response>, ...]} in order.
+    GET  /health           Returns {"status": "ok", "jobs": <number of jobs>}.
+
+Matching a single jobseeker is CPU bound and short, so it runs inline on the
+event loop instead of in an executor.
+"""
+
+import asyncio
+from pathlib import Path
+from typing import Any
+import orjson
+import structlog
+from .models import JobMatch
+from .services import Recommender
+
+
+logger: structlog.stdlib.BoundLogger = structlog.get_logger()
+
+MAX_BODY_SIZE = 1024 * 1024
+MAX_HEADER_LINES = 100
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+}
+
+
+class BadRequest(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class RecommendationServer:
+    """Answers recommendation requests against a Recommender.
+
+    Args:
+        recommender (Recommender): Holds the job index, built once for the
+                                   lifetime of the server.
+    """
+
+    def __init__(self, recommender: Recommender):
+        self.recommender = recommender
+
+    def _get_row(self, payload: Any) -> tuple[int, str, list[str] | str]:
+        if not isinstance(payload, dict):
+            raise BadRequest(400, "Jobseeker must be a JSON object")
+
+        skills = payload.get("skills")
+        if not isinstance(skills, str) and not (
+            isinstance(skills, list) and all(isinstance(s, str) for s in skills)
+        ):
+            raise BadRequest(400, "skills must be a string or a list of strings")
+
+        jobseeker_id = payload.get("id", 0)
+        name = payload.get("name", "")
+        if not isinstance(jobseeker_id, int) or not isinstance(name, str):
+            raise BadRequest(400, "id must be an int and name a string")
+
+        return jobseeker_id, name, skills
+
+    def _to_response(self, jobseeker_id: int, job_matches: list[JobMatch]) -> dict:
+        return {
+            "jobseeker_id": jobseeker_id,
+            "matches": [
+                {
+                    "job_id": job_match.job.id,
+                    "job_title": job_match.job.title,
+                    "matching_skill_count": job_match.matching_skill_count,
+                    "matching_skill_percent": job_match.matching_skill_percent,
+                }
+                for job_match in job_matches
+            ],
+        }
+
+    def recommend(self, payload: Any) -> dict:
+        """Rank the jobs of the jobseeker described by a request payload.
+
+        Raises:
+            BadRequest: If the payload does not describe a jobseeker.
+        """
+        (jobseeker,) = self.recommender.get_job_seekers([self._get_row(payload)])
+        return self._to_response(jobseeker.id, self.recommender.recommend(jobseeker))
+
+    def recommend_batch(self, payload: Any) -> dict:
+        """Rank the jobs of every jobseeker of a batch request payload.
+
+        Raises:
+            BadRequest: If the payload does not hold a list of jobseekers.
+        """
+        if not isinstance(payload, dict) or not isinstance(
+            payload.get("jobseekers"), list
+        ):
+            raise BadRequest(400, "Request body must hold a jobseekers list")
+
+        jobseekers = self.recommender.get_job_seekers(
+            [self._get_row(item) for item in payload["jobseekers"]]
+        )
+        return {
+            "results": [
+                self._to_response(jobseeker.id, job_matches)
+                for jobseeker, job_matches in zip(
+                    jobseekers, self.recommender.recommend_many(jobseekers)
+                )
+            ]
+        }
+
+    def handle(self, method: str, path: str, body: bytes) -> tuple[int, Any]:
+        if path == "/health":
+            if method != "GET":
+                raise BadRequest(405, "Use GET")
+            return 200, {"status": "ok", "jobs": len(self.recommender.jobs_by_id)}
+
+        if path in ("/recommend", "/recommend/batch"):
+            if method != "POST":
+                raise BadRequest(405, "Use POST")
+            try:
+                payload = orjson.loads(body)
+            except orjson.JSONDecodeError:
+                raise BadRequest(400, "Request body is not valid JSON")
+
+            if path == "/recommend":
+                return 200, self.recommend(payload)
+            return 200, self.recommend_batch(payload)
+
+        raise BadRequest(404, f"Unknown path {path}")
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                keep_alive = True
+                try:
+                    method, path, headers = await self._read_head(reader, request_line)
+                    keep_alive = headers.get("connection", "").lower() != "close"
+                    body = await self._read_body(reader, headers)
+                    status, response = self.handle(method, path, body)
+                except BadRequest as e:
+                    status, response = e.status, {"error": str(e)}
+                    # the rest of a bad request cannot be trusted
+                    keep_alive = keep_alive and e.status in (404, 405)
+
+                self._write_response(writer, status, response, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_head(
+        self, reader: asyncio.StreamReader, request_line: bytes
+    ) -> tuple[str, str, dict[str, str]]:
+        try:
+            method, target, _ = request_line.decode("latin-1").split()
+        except ValueError:
+            raise BadRequest(400, "Malformed request line")
+
+        headers = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                return method, target.split("?", 1)[0], headers
+
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        raise BadRequest(400, "Too many headers")
+
+    async def _read_body(
+        self, reader: asyncio.StreamReader, headers: dict[str, str]
+    ) -> bytes:
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise BadRequest(400, "Invalid Content-Length")
+        if length > MAX_BODY_SIZE:
+            raise BadRequest(413, "Request body too large")
+
+        return await reader.readexactly(length) if length else b""
+
+    def _write_response(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        response: Any,
+        keep_alive: bool,
+    ) -> None:
+        body = orjson.dumps(response)
+        writer.write(
+            (
+                f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                "\r\n"
+            ).encode("latin-1")
+            + body
+        )
+
+    async def start(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        unix_socket: Path | None = None,
+    ) -> asyncio.Server:
+        if unix_socket is not None:
+            server = await asyncio.start_unix_server(
+                self.handle_connection, path=unix_socket
+            )
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+
+        logger.info(
+            "Recommendation server listening",
+            sockets=[str(sock.getsockname()) for sock in server.sockets],
+        )
+        return server
+
+    async def serve_forever(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        unix_socket: Path | None = None,
+    ) -> None:
+        server = await self.start(host, port, unix_socket)
+        async with server:
+            await server.serve_forever()
@@ -1,12 +1,23 @@
 """services"""
 
-from typing import Protocol, Iterator, Tuple
-from .models import JobSeeker, Job, JobMatch
+import heapq
+import multiprocessing
+from bisect import bisect_left, bisect_right
+from collections import Counter, deque
+from itertools import batched, chain, groupby, islice
+from operator import attrgetter
+from pathlib import Path
+from typing import Mapping, Protocol, Iterable, Iterator, Sequence, Tuple
+from typing import runtime_checkable
+from .models import JobSeeker, Job, JobMatch, Skill, Skills, match_sort_key
 from .constants import CSV_HEADERS
 from collections import defaultdict
+import orjson
 import structlog
 from typing import Callable, Any, TypeVar
 from .logging_config import time_execution
+from .sorting import DEFAULT_RUN_SIZE, ExternalMatchSorter
+from .vocabulary import SkillVocabulary
 
 
 logger: structlog.stdlib.BoundLogger = structlog.get_logger()
@@ -20,9 +31,30 @@ class JobSeekerInput(Protocol):
     def get_job_seekers(self) -> Iterator[JobSeeker]: ...
 
 
+class JobMatchInput(Protocol):
+    def get_job_matches(self) -> Iterator[JobMatch]: ...
+
+
+@runtime_checkable
+class JobIndexInput(Protocol):
+    """Job input that already holds (jobs_by_id, jobs_by_skills) indexes."""
+
+    def get_job_indexes(
+        self,
+    ) -> Tuple[Mapping[int, Job], Mapping[Skill, Sequence[int]]]: ...
+
+
 T = TypeVar("T")
 
-ResultFormatter = Callable[[list[JobMatch]], Any]
+DEFAULT_WORKER_CHUNK_SIZE = 1_000
+
+# (service, jobs_by_skills, jobs_by_id) used by worker processes.  Set in the
+# parent before forking so the job index is shared copy-on-write.
+_worker_state: tuple | None = None
+
+ResultFormatter = Callable[[Iterable[JobMatch]], Any]
+
+DEFAULT_OUTPUT_BATCH_SIZE = 65_536
 
 
 def get_matching_percentage(qualified_count: int, required_count: int) -> int:
@@ -30,19 +62,46 @@ def get_matching_percentage(qualified_count: int, required_count: int) -> int:
     return int(percentage * 100)
 
 
+def limit_matches_per_jobseeker(
+    job_matches: Iterable[JobMatch], top_k: int
+) -> Iterator[JobMatch]:
+    """First top_k matches of each jobseeker of matches sorted by match_sort_key."""
+    for _, seeker_matches in groupby(job_matches, key=attrgetter("jobseeker.id")):
+        yield from islice(seeker_matches, top_k)
+
+
+def quote_csv_field(value: str) -> str:
+    """Quote value if needed, like csv.writer does with QUOTE_MINIMAL."""
+    if "," in value or '"' in value or "\n" in value or "\r" in value:
+        return '"' + value.replace('"', '""') + '"'
+
+    return value
+
+
 def format_job_matches_as_csv(
-    job_matches: list[JobMatch],
+    job_matches: Iterable[JobMatch],
 ) -> Iterator[str]:
     yield ",".join(CSV_HEADERS)
 
+    # names and titles repeat over consecutive rows and over jobs, so each is
+    # only checked for quoting once
+    jobseeker = name = None
+    titles: dict[str, str] = {}
     for job_match in job_matches:
+        if job_match.jobseeker is not jobseeker:
+            jobseeker = job_match.jobseeker
+            name = quote_csv_field(jobseeker.name)
+        title = titles.get(job_match.job.title)
+        if title is None:
+            title = titles[job_match.job.title] = quote_csv_field(job_match.job.title)
+
         yield (
             ",".join(
                 (
-                    str(job_match.jobseeker.id),
-                    job_match.jobseeker.name,
+                    str(jobseeker.id),
+                    name,
                     str(job_match.job.id),
-                    job_match.job.title,
+                    title,
                     str(job_match.matching_skill_count),
                     str(job_match.matching_skill_percent),
                 )
@@ -50,66 +109,568 @@ def format_job_matches_as_csv(
         )
 
 
+def get_job_match_columns(
+    job_matches: Iterable[JobMatch], batch_size: int = DEFAULT_OUTPUT_BATCH_SIZE
+) -> Iterator[dict[str, tuple]]:
+    """Batches of job matches as columns keyed by CSV_HEADERS."""
+    for batch in batched(job_matches, batch_size):
+        rows = [
+            (
+                job_match.jobseeker.id,
+                job_match.jobseeker.name,
+                job_match.job.id,
+                job_match.job.title,
+                job_match.matching_skill_count,
+                job_match.matching_skill_percent,
+            )
+            for job_match in batch
+        ]
+        yield dict(zip(CSV_HEADERS, zip(*rows)))
+
+
+# a JSON object per match keyed by CSV_HEADERS, names and titles are filled in
+# already encoded by orjson
+NDJSON_TEMPLATE = (
+    b'{"jobseeker_id":%d,"jobseeker_name":%s,"job_id":%d,"job_title":%s,'
+    b'"matching_skill_count":%d,"matching_skill_percent":%d}\n'
+)
+
+
+def format_job_matches_as_ndjson(job_matches: Iterable[JobMatch]) -> Iterator[bytes]:
+    """One JSON object per match and per line, keyed by CSV_HEADERS.
+
+    Yields one chunk of lines per batch of columns.  Names and titles repeat
+    across the rows of a batch, so each distinct one is encoded once by
+    orjson, then rows are filled into NDJSON_TEMPLATE without building a
+    dict per row.
+    """
+    for columns in get_job_match_columns(job_matches):
+        ids, names, job_ids, titles, counts, percents = columns.values()
+        encoded = {string: orjson.dumps(string) for string in {*names, *titles}}
+        names = map(encoded.__getitem__, names)
+        titles = map(encoded.__getitem__, titles)
+
+        yield b"".join(
+            [
+                NDJSON_TEMPLATE % row
+                for row in zip(ids, names, job_ids, titles, counts, percents)
+            ]
+        )
+
+
 class InMemoryRecommenderService:
+    """Matches jobseekers against an in memory inverted index of jobs.
+
+    By default every match is collected and sorted globally before formatting.
+    Setting max_matches_in_memory puts an ExternalMatchSorter behind the global
+    sort, spilling sorted runs to tmp_dir once that many matches are buffered.
+
+    With workers > 1, chunks of jobseekers are matched in a process pool that
+    shares the job index built by the parent.  Results come back in input order.
+
+    With top_k set, only the top_k best matches of each jobseeker are kept,
+    ranked by matching_skill_percent desc then job id asc.  Selection uses a
+    bounded heap, so JobMatch objects are only built for the kept matches.
+
+    With min_percent or min_count set, weaker matches are dropped.  The default
+    engine prunes them while matching: overlaps are counted by walking posting
+    lists ordered by required skill count, and jobs whose required skill count
+    makes the thresholds unreachable for a jobseeker are skipped up front.
+
+    With job_chunk_size set, jobs are indexed job_chunk_size at a time and the
+    jobseekers are streamed once per chunk.  Partial results go through an
+    ExternalMatchSorter whose final merge restores the usual ordering, so the
+    job catalog never has to fit in memory at once.
+
+    With previous_matches set, only the matches that can have changed since
+    that result are recomputed.  jobseekers and jobs must be the current
+    inputs, changed_jobseeker_ids and changed_job_ids the ids added, updated or
+    deleted since.  Jobseekers that changed, or that share a skill with a
+    changed job, are matched again.  The other jobseekers keep their previous
+    rows, minus the ones of changed jobs.  Both are merged in output order.
+    With top_k set, a jobseeker that had a row of a changed job is matched
+    again too, as another job may take its place in the top k.
+
+    With streaming enabled, matches are sorted per jobseeker instead:
+
+    - presorted: jobseekers arrive in ascending id order, so each jobseeker's
+      matches are yielded right away.  Out of order ids raise a ValueError.
+    - otherwise: matches go through an ExternalMatchSorter, which spills sorted
+      runs to disk and merges them back, keeping memory bounded.
+    """
+
     def __init__(
         self,
         jobseekers: JobSeekerInput,
         jobs: JobInput,
         formatter: ResultFormatter = format_job_matches_as_csv,
+        streaming: bool = False,
+        presorted: bool = False,
+        max_matches_in_memory: int | None = None,
+        tmp_dir: Path | None = None,
+        workers: int = 1,
+        worker_chunk_size: int = DEFAULT_WORKER_CHUNK_SIZE,
+        job_chunk_size: int | None = None,
+        top_k: int | None = None,
+        min_percent: int | None = None,
+        min_count: int | None = None,
+        previous_matches: JobMatchInput | None = None,
+        changed_jobseeker_ids: Iterable[int] = (),
+        changed_job_ids: Iterable[int] = (),
     ):
         self.jobseekers = jobseekers
         self.jobs = jobs
         self.formatter = formatter
+        self.streaming = streaming
+        self.presorted = presorted
+        self.max_matches_in_memory = max_matches_in_memory
+        self.tmp_dir = tmp_dir
+        self.workers = workers
+        self.worker_chunk_size = worker_chunk_size
+        self.job_chunk_size = job_chunk_size
+        self.top_k = top_k
+        self.min_percent = min_percent
+        self.min_count = min_count
+        self.previous_matches = previous_matches
+        self.changed_jobseeker_ids = set(changed_jobseeker_ids)
+        self.changed_job_ids = set(changed_job_ids)
+        # skill -> (required skill counts, job ids), sorted by required count
+        self._length_index: dict[Skill, tuple[list[int], list[int]]] = {}
+
+    def _get_sorter(self) -> ExternalMatchSorter:
+        return ExternalMatchSorter(
+            run_size=self.max_matches_in_memory or DEFAULT_RUN_SIZE,
+            tmp_dir=self.tmp_dir,
+        )
 
     # @time_execution(logger)
-    def _get_job_indexes(self) -> Tuple[dict[int, Job], dict[str, set[int]]]:
-        job_by_id = {}
-        job_by_skills_index = defaultdict(set)
+    def _get_job_indexes(
+        self, jobs: Iterable[Job] | None = None
+    ) -> Tuple[dict[int, Job], dict[Skill, set[int]]]:
+        """Index the given jobs, or every job from the job input.
 
-        for job in self.jobs.get_jobs():
-            job_by_id[job.id] = job
+        Job inputs implementing JobIndexInput are used as is, without indexing.
+        """
+        if jobs is None and isinstance(self.jobs, JobIndexInput):
+            job_by_id, job_by_skills_index = self.jobs.get_job_indexes()
+        else:
+            job_by_id = {}
+            job_by_skills_index = defaultdict(set)
 
-            for skill in job.required_skills:
-                job_by_skills_index[skill].add(job.id)
+            if jobs is None:
+                jobs = self.jobs.get_jobs()
+
+            for job in jobs:
+                job_by_id[job.id] = job
+
+                for skill in job.required_skills:
+                    job_by_skills_index[skill].add(job.id)
+
+        if self.min_percent or self.min_count:
+            self._length_index = self._get_length_index(job_by_skills_index, job_by_id)
 
         return job_by_id, job_by_skills_index
 
-    # @time_execution(logger)
-    def _get_job_matches(
+    def _get_length_index(
+        self,
+        jobs_by_skills: dict[Skill, set[int]],
+        jobs_by_id: dict[int, Job],
+    ) -> dict[Skill, tuple[list[int], list[int]]]:
+        length_index = {}
+        for skill, job_ids in jobs_by_skills.items():
+            postings = sorted(
+                (len(jobs_by_id[job_id].required_skills), job_id) for job_id in job_ids
+            )
+            length_index[skill] = (
+                [length for length, _ in postings],
+                [job_id for _, job_id in postings],
+            )
+
+        return length_index
+
+    def _get_max_required_count(self, skill_count: int) -> int | None:
+        """Largest required skill count that can still reach min_percent.
+
+        Jobs requiring at most skill_count skills can always reach 100 percent.
+        Returns None when there is no upper bound.
+        """
+        if not self.min_percent:
+            return None
+
+        required_count = max(skill_count, skill_count * 100 // self.min_percent)
+        while (
+            get_matching_percentage(skill_count, required_count + 1) >= self.min_percent
+        ):
+            required_count += 1
+        while (
+            required_count > skill_count
+            and get_matching_percentage(skill_count, required_count) < self.min_percent
+        ):
+            required_count -= 1
+
+        return required_count
+
+    def _build_job_matches(
+        self,
+        jobseeker: JobSeeker,
+        candidates: Iterable[tuple[Job, int, int]],
+    ) -> list[JobMatch]:
+        """Build JobMatch objects from (job, matching count, percent) candidates.
+
+        Applies min_count, min_percent and top_k before any JobMatch is created.
+        """
+        if self.min_count:
+            candidates = [c for c in candidates if c[1] >= self.min_count]
+        if self.min_percent:
+            candidates = [c for c in candidates if c[2] >= self.min_percent]
+
+        if self.top_k is not None:
+            candidates = heapq.nsmallest(
+                self.top_k, candidates, key=lambda c: (-c[2], c[0].id)
+            )
+
+        return [
+            JobMatch(
+                jobseeker=jobseeker,
+                job=job,
+                matching_skill_count=count,
+                matching_skill_percent=percent,
+            )
+            for job, count, percent in candidates
+        ]
+
+    def _get_pruned_job_matches(
         self,
         jobseeker: JobSeeker,
-        jobs_by_skills: dict[str, set[int]],
         jobs_by_id: dict[int, Job],
     ) -> list[JobMatch]:
-        qualified_jobs = set()
+        min_count = self.min_count or 1
+        skill_count = len(jobseeker.skills)
+        if skill_count < min_count:
+            return []
+
+        max_required_count = self._get_max_required_count(skill_count)
 
+        postings = []
         for skill in jobseeker.skills:
-            qualified_jobs |= jobs_by_skills.get(skill, set())
+            length_postings = self._length_index.get(skill)
+            if length_postings is None:
+                continue
+
+            lengths, job_ids = length_postings
+            start = bisect_left(lengths, min_count)
+            if max_required_count is None:
+                end = len(lengths)
+            else:
+                end = bisect_right(lengths, max_required_count)
+
+            postings.append(job_ids[start:end])
+
+        counts = Counter(chain.from_iterable(postings))
+        return self._build_job_matches(
+            jobseeker, self._get_candidates(counts, jobs_by_id)
+        )
 
-        matches = []
-        for job_id in qualified_jobs:
-            job = jobs_by_id[job_id]
+    def _count_job_overlaps(
+        self, jobseeker: JobSeeker, jobs_by_skills: dict[Skill, set[int]]
+    ) -> Counter[int]:
+        """Count the skills each job shares with the jobseeker.
+
+        A job id shows up once in the posting list of every shared skill, so
+        one pass over the posting lists gives the matching skill count without
+        intersecting skill sets.
+        """
+        return Counter(
+            chain.from_iterable(
+                jobs_by_skills[skill]
+                for skill in jobseeker.skills
+                if skill in jobs_by_skills
+            )
+        )
 
-            total_required_skills = len(job.required_skills)
-            qualifications = jobseeker.skills & job.required_skills
-
-            matches.append(
-                JobMatch(
-                    jobseeker=jobseeker,
-                    job=job,
-                    matching_skill_count=len(qualifications),
-                    matching_skill_percent=get_matching_percentage(
-                        len(qualifications), total_required_skills
-                    ),
+    def _get_candidates(
+        self, counts: Counter[int], jobs_by_id: dict[int, Job]
+    ) -> list[tuple[Job, int, int]]:
+        """Turn matching skill counts per job id into match candidates."""
+        candidates = []
+        for job_id, count in counts.items():
+            job = jobs_by_id[job_id]
+            candidates.append(
+                (
+                    job,
+                    count,
+                    get_matching_percentage(count, len(job.required_skills)),
                 )
             )
 
-        return matches
+        return candidates
+
+    # @time_execution(logger)
+    def _get_job_matches(
+        self,
+        jobseeker: JobSeeker,
+        jobs_by_skills: dict[Skill, set[int]],
+        jobs_by_id: dict[int, Job],
+    ) -> list[JobMatch]:
+        if self.min_percent or self.min_count:
+            return self._get_pruned_job_matches(jobseeker, jobs_by_id)
+
+        counts = self._count_job_overlaps(jobseeker, jobs_by_skills)
+        return self._build_job_matches(
+            jobseeker, self._get_candidates(counts, jobs_by_id)
+        )
+
+    def _match_job_seekers(
+        self,
+        job_seekers: Iterable[JobSeeker],
+        jobs_by_skills: dict[Skill, set[int]],
+        jobs_by_id: dict[int, Job],
+    ) -> Iterator[tuple[JobSeeker, list[JobMatch]]]:
+        """Yield each jobseeker along with its unsorted job matches."""
+        for seeker in job_seekers:
+            logger.debug("Job matching in progress... ", seeker=seeker.id)
+            job_matches = self._get_job_matches(
+                jobseeker=seeker,
+                jobs_by_id=jobs_by_id,
+                jobs_by_skills=jobs_by_skills,
+            )
+            logger.debug("Job matching done... ", seeker=seeker.id)
+
+            yield seeker, job_matches
+
+    def _match_job_seekers_in_parallel(
+        self,
+        job_seekers: Iterable[JobSeeker],
+        jobs_by_skills: dict[Skill, set[int]],
+        jobs_by_id: dict[int, Job],
+    ) -> Iterator[tuple[JobSeeker, list[JobMatch]]]:
+        global _worker_state
+        state = (self, jobs_by_skills, jobs_by_id)
+
+        if "fork" in multiprocessing.get_all_start_methods():
+            _worker_state = state
+            pool = multiprocessing.get_context("fork").Pool(self.workers)
+        else:
+            pool = multiprocessing.Pool(
+                self.workers, initializer=_init_worker, initargs=(state,)
+            )
+
+        # keep a bounded number of chunks in flight, in submission order
+        max_pending = self.workers * 2
+        pending = deque()
+
+        def collect():
+            chunk, result = pending.popleft()
+            for seeker, rows in zip(chunk, result.get()):
+                yield seeker, [
+                    JobMatch(
+                        jobseeker=seeker,
+                        job=jobs_by_id[job_id],
+                        matching_skill_count=count,
+                        matching_skill_percent=percent,
+                    )
+                    for job_id, count, percent in rows
+                ]
+
+        try:
+            with pool:
+                for chunk in batched(job_seekers, self.worker_chunk_size):
+                    result = pool.apply_async(_match_job_seekers_in_worker, (chunk,))
+                    pending.append((chunk, result))
+                    if len(pending) >= max_pending:
+                        yield from collect()
+
+                while pending:
+                    yield from collect()
+        finally:
+            _worker_state = None
+
+    def _get_all_job_matches(
+        self,
+        job_seekers: Iterable[JobSeeker],
+        jobs_by_skills: dict[Skill, set[int]],
+        jobs_by_id: dict[int, Job],
+    ) -> Iterator[tuple[JobSeeker, list[JobMatch]]]:
+        if self.workers > 1:
+            logger.info("Matching jobseekers in parallel", workers=self.workers)
+            return self._match_job_seekers_in_parallel(
+                job_seekers, jobs_by_skills, jobs_by_id
+            )
+
+        return self._match_job_seekers(job_seekers, jobs_by_skills, jobs_by_id)
+
+    def _stream_job_matches(
+        self,
+        job_seekers: Iterator[JobSeeker],
+        jobs_by_skills: dict[Skill, set[int]],
+        jobs_by_id: dict[int, Job],
+    ) -> Iterator[JobMatch]:
+        if not self.presorted:
+            logger.info("Jobseekers not presorted, using external merge")
+            sorter = self._get_sorter()
+        else:
+            sorter = None
+
+        previous_id = None
+        for seeker, job_matches in self._get_all_job_matches(
+            job_seekers=job_seekers,
+            jobs_by_skills=jobs_by_skills,
+            jobs_by_id=jobs_by_id,
+        ):
+            if sorter is not None:
+                sorter.extend(job_matches)
+                continue
+
+            if previous_id is not None and seeker.id <= previous_id:
+                logger.error(
+                    "Jobseekers not sorted by id",
+                    seeker=seeker.id,
+                    previous=previous_id,
+                )
+                raise ValueError("Jobseekers are not sorted by id")
+            previous_id = seeker.id
+
+            yield from sorted(job_matches, key=match_sort_key)
+
+        if sorter is not None:
+            yield from sorter
+
+        logger.info("Done job matching for all jobseekers")
+
+    def _get_chunked_job_matches(self) -> Iterator[JobMatch]:
+        sorter = self._get_sorter()
+
+        for chunk_number, jobs in enumerate(
+            batched(self.jobs.get_jobs(), self.job_chunk_size)
+        ):
+            logger.info("Matching job chunk", chunk=chunk_number, jobs=len(jobs))
+            jobs_by_id, jobs_by_skills = self._get_job_indexes(jobs)
+            job_seekers = self.jobseekers.get_job_seekers()
+
+            if self.presorted:
+                # matches of a presorted pass are already a sorted run
+                sorter.add_run(
+                    self._stream_job_matches(job_seekers, jobs_by_skills, jobs_by_id)
+                )
+                continue
+
+            for _, job_matches in self._get_all_job_matches(
+                job_seekers=job_seekers,
+                jobs_by_skills=jobs_by_skills,
+                jobs_by_id=jobs_by_id,
+            ):
+                sorter.extend(job_matches)
+
+        logger.info("Done job matching for all job chunks")
+        # top_k was applied per chunk, the merged runs hold up to top_k
+        # matches per jobseeker and chunk
+        if self.top_k is not None:
+            yield from limit_matches_per_jobseeker(sorter, self.top_k)
+        else:
+            yield from sorter
+
+    def _get_incremental_job_matches(self) -> Iterator[JobMatch]:
+        jobs_by_id, jobs_by_skills = self._get_job_indexes()
+        changed_job_ids = self.changed_job_ids
+        changed_skills = {
+            skill
+            for job_id in changed_job_ids
+            if job_id in jobs_by_id
+            for skill in jobs_by_id[job_id].required_skills
+        }
+
+        recomputed_ids = set(self.changed_jobseeker_ids)
+        # with top_k, a dropped row of a changed job can let another job into
+        # the top k.  Which jobseekers had one is only known once their
+        # previous rows are read, so the others are kept to be matched then,
+        # and the previous matches are read once.
+        kept_job_seekers: dict[int, JobSeeker] | None = None
+        if self.top_k and changed_job_ids:
+            kept_job_seekers = {}
+
+        def get_affected_job_seekers() -> Iterator[JobSeeker]:
+            for seeker in self.jobseekers.get_job_seekers():
+                if seeker.id in recomputed_ids or not changed_skills.isdisjoint(
+                    seeker.skills
+                ):
+                    recomputed_ids.add(seeker.id)
+                    yield seeker
+                elif kept_job_seekers is not None:
+                    kept_job_seekers[seeker.id] = seeker
+
+        if self.max_matches_in_memory is not None:
+            results = self._get_sorter()
+        else:
+            results = []
+
+        for _, job_matches in self._get_all_job_matches(
+            job_seekers=get_affected_job_seekers(),
+            jobs_by_skills=jobs_by_skills,
+            jobs_by_id=jobs_by_id,
+        ):
+            results.extend(job_matches)
+        logger.info(
+            "Done job matching for affected jobseekers",
+            jobseekers=len(recomputed_ids),
+        )
+
+        if not isinstance(results, ExternalMatchSorter):
+            results.sort(key=match_sort_key)
+
+        # recomputed_ids is complete once every affected jobseeker was matched.
+        # Kept and recomputed jobseekers are disjoint, so the two sorted streams
+        # only need merging on jobseeker id, not on the full sort key.
+        results = iter(results)
+        pending = next(results, None)
+        next_id = pending.jobseeker.id if pending is not None else float("inf")
+
+        for jobseeker_id, previous_matches in groupby(
+            self.previous_matches.get_job_matches(), key=attrgetter("jobseeker.id")
+        ):
+            if jobseeker_id in recomputed_ids:
+                continue
+
+            while next_id < jobseeker_id:
+                yield pending
+                pending = next(results, None)
+                next_id = pending.jobseeker.id if pending is not None else float("inf")
+
+            if kept_job_seekers is None:
+                for job_match in previous_matches:
+                    if job_match.job.id not in changed_job_ids:
+                        yield job_match
+                continue
+
+            previous_matches = list(previous_matches)
+            if changed_job_ids.isdisjoint(
+                job_match.job.id for job_match in previous_matches
+            ):
+                yield from previous_matches
+                continue
+
+            seeker = kept_job_seekers.get(jobseeker_id)
+            if seeker is not None:
+                for _, job_matches in self._match_job_seekers(
+                    [seeker], jobs_by_skills, jobs_by_id
+                ):
+                    yield from sorted(job_matches, key=match_sort_key)
+
+        if pending is not None:
+            yield pending
+            yield from results
 
     @time_execution(logger)
     def execute(self) -> Any:
         logger.info("Execute function started")
 
+        if self.previous_matches is not None:
+            logger.debug("Matching jobseekers affected by changes only")
+            return self.formatter(self._get_incremental_job_matches())
+
+        if self.job_chunk_size is not None:
+            logger.debug("Matching jobseekers against chunks of jobs")
+            return self.formatter(self._get_chunked_job_matches())
+
         logger.debug("Getting job seekers")
         job_seekers = self.jobseekers.get_job_seekers()
 
@@ -117,17 +678,223 @@ class InMemoryRecommenderService:
         jobs_by_id, jobs_by_skills = self._get_job_indexes()
         logger.debug("Done building job indexes")
 
-        logger.debug("Starting job matching for each jobseeker")
-        results = []
-        for seeker in job_seekers:
-            logger.debug("Job matching in progress... ", seeker=seeker.id)
-            job_matches = self._get_job_matches(
-                jobseeker=seeker,
-                jobs_by_id=jobs_by_id,
-                jobs_by_skills=jobs_by_skills,
+        if self.streaming:
+            logger.debug("Streaming job matches for each jobseeker")
+            return self.formatter(
+                self._stream_job_matches(
+                    job_seekers=job_seekers,
+                    jobs_by_skills=jobs_by_skills,
+                    jobs_by_id=jobs_by_id,
+                )
             )
+
+        logger.debug("Starting job matching for each jobseeker")
+        if self.max_matches_in_memory is not None:
+            results = self._get_sorter()
+        else:
+            results = []
+
+        for _, job_matches in self._get_all_job_matches(
+            job_seekers=job_seekers,
+            jobs_by_skills=jobs_by_skills,
+            jobs_by_id=jobs_by_id,
+        ):
             results.extend(job_matches)
-            logger.debug("Job matching done... ", seeker=seeker.id)
         logger.info("Done job matching for all jobseekers")
 
-        return self.formatter(sorted(results))
+        if isinstance(results, ExternalMatchSorter):
+            return self.formatter(iter(results))
+
+        return self.formatter(sorted(results, key=match_sort_key))
+
+
+def _init_worker(state: tuple) -> None:
+    global _worker_state
+    _worker_state = state
+
+
+def _match_job_seekers_in_worker(
+    chunk: tuple[JobSeeker, ...],
+) -> list[list[tuple[int, int, int]]]:
+    """Match a chunk of jobseekers inside a worker process.
+
+    Only (job_id, matching_skill_count, matching_skill_percent) rows are sent
+    back, sorted per jobseeker, so the job objects are not pickled.
+    """
+    service, jobs_by_skills, jobs_by_id = _worker_state
+
+    return [
+        [
+            (m.job.id, m.matching_skill_count, m.matching_skill_percent)
+            for m in sorted(job_matches, key=match_sort_key)
+        ]
+        for _, job_matches in service._match_job_seekers(
+            chunk, jobs_by_skills, jobs_by_id
+        )
+    ]
+
+
+class BitsetRecommenderService(InMemoryRecommenderService):
+    """Matches using skill bitmasks instead of set intersections.
+
+    Every job's required skills are encoded once as an arbitrary precision int
+    with one bit per skill.  Candidate jobs still come from the inverted index,
+    but the matching count is a popcount of the AND of both masks.
+
+    Interned skills (see SkillVocabulary) are used as bit positions directly,
+    skill names are interned into a vocabulary owned by the service.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._vocabulary = SkillVocabulary()
+        self._job_masks: dict[int, int] = {}
+
+    def _get_skill_mask(self, skills: Skills) -> int:
+        mask = 0
+        for skill in skills:
+            if not isinstance(skill, int):
+                skill = self._vocabulary.intern(skill)
+            mask |= 1 << skill
+
+        return mask
+
+    def _get_job_indexes(
+        self, jobs: Iterable[Job] | None = None
+    ) -> Tuple[dict[int, Job], dict[Skill, set[int]]]:
+        jobs_by_id, jobs_by_skills = super()._get_job_indexes(jobs)
+
+        self._job_masks = {
+            job_id: self._get_skill_mask(job.required_skills)
+            for job_id, job in jobs_by_id.items()
+        }
+
+        return jobs_by_id, jobs_by_skills
+
+    def _get_job_matches(
+        self,
+        jobseeker: JobSeeker,
+        jobs_by_skills: dict[Skill, set[int]],
+        jobs_by_id: dict[int, Job],
+    ) -> list[JobMatch]:
+        postings = [jobs_by_skills[s] for s in jobseeker.skills if s in jobs_by_skills]
+        if not postings:
+            return []
+
+        seeker_mask = self._get_skill_mask(jobseeker.skills)
+        job_masks = self._job_masks
+
+        candidates = []
+        for job_id in set().union(*postings):
+            job_mask = job_masks[job_id]
+            matching_skill_count = (seeker_mask & job_mask).bit_count()
+
+            candidates.append(
+                (
+                    jobs_by_id[job_id],
+                    matching_skill_count,
+                    get_matching_percentage(matching_skill_count, job_mask.bit_count()),
+                )
+            )
+
+        return self._build_job_matches(jobseeker, candidates)
+
+
+class Recommender:
+    """Holds a built job index and ranks jobs for jobseekers on demand.
+
+    Separates the lifetime of the job index from the lifetime of a request:
+    the index is built once, from the job input of service, then any number
+    of recommend and recommend_many calls reuse it.  Matching, ranking and
+    the top_k/min_percent/min_count settings are the ones of service, so
+    results are the same as the rows of each jobseeker from execute().
+
+    Args:
+        service (InMemoryRecommenderService): Service of any engine.  Its
+                                              jobseeker input is not used.
+        vocabulary (SkillVocabulary | None): Vocabulary the job input interns
+                                             skills with, if any.
+        aliases (dict[str, str] | None): Skill alias table the job input was
+                                         read with, if any.
+    """
+
+    def __init__(
+        self,
+        service: InMemoryRecommenderService,
+        vocabulary: SkillVocabulary | None = None,
+        aliases: dict[str, str] | None = None,
+    ):
+        self.service = service
+        self.vocabulary = vocabulary
+        self.aliases = aliases or {}
+        self.jobs_by_id, self.jobs_by_skills = service._get_job_indexes()
+        logger.info("Recommender job index built", jobs=len(self.jobs_by_id))
+
+    def get_job_seekers(
+        self, rows: Iterable[tuple[int, str, Iterable[str] | str]]
+    ) -> list[JobSeeker]:
+        """Build jobseekers from (id, name, skills) rows of raw skill names.
+
+        skills may be a comma separated string or an iterable of names.  Names
+        are normalized, resolved through aliases and interned once per batch,
+        however many jobseekers share them.  Skills that no job requires are
+        dropped, they cannot change any match and are never added to the
+        vocabulary.
+        """
+        vocabulary = self.vocabulary
+        aliases = self.aliases
+        jobs_by_skills = self.jobs_by_skills
+        known: dict[str, Skill | None] = {}
+
+        def lookup(name: str) -> Skill | None:
+            skill = name.strip().upper()
+            skill = aliases.get(skill, skill)
+            if vocabulary is not None:
+                skill = vocabulary.get(skill)
+            return skill if skill in jobs_by_skills else None
+
+        job_seekers = []
+        for jobseeker_id, name, skill_names in rows:
+            if isinstance(skill_names, str):
+                skill_names = skill_names.split(",")
+
+            skills = []
+            for skill_name in skill_names:
+                if skill_name not in known:
+                    known[skill_name] = lookup(skill_name)
+                skill = known[skill_name]
+                if skill is not None:
+                    skills.append(skill)
+
+            job_seekers.append(
+                JobSeeker(
+                    id=jobseeker_id,
+                    name=name,
+                    skills=set(skills) if vocabulary is None else frozenset(skills),
+                )
+            )
+
+        return job_seekers
+
+    def recommend(self, jobseeker: JobSeeker) -> list[JobMatch]:
+        """Matches of one jobseeker, best first."""
+        job_matches = self.service._get_job_matches(
+            jobseeker, self.jobs_by_skills, self.jobs_by_id
+        )
+        job_matches.sort(key=match_sort_key)
+        return job_matches
+
+    def recommend_many(self, jobseekers: Iterable[JobSeeker]) -> list[list[JobMatch]]:
+        """Matches of each jobseeker, best first, in the order given.
+
+        Goes through the engine's batch path, e.g. one sparse matrix product
+        per chunk with the sparse engine.
+        """
+        results = []
+        for _, job_matches in self.service._match_job_seekers(
+            jobseekers, self.jobs_by_skills, self.jobs_by_id
+        ):
+            job_matches.sort(key=match_sort_key)
+            results.append(job_matches)
+
+        return results
@@ -0,0 +1,183 @@
+"""sorting
+
+Helpers for ordering job matches without holding every match in memory.
+
+Matches are flattened into plain tuples (rows) whose natural tuple ordering is
+the same as the ordering defined on JobMatch.  Rows are buffered in memory up to
+a limit, sorted, and spilled to temporary files as sorted runs.  The runs are
+then lazily merged back with a k-way heap merge.  When there are more runs than
+MAX_MERGE_FAN_IN, groups of runs are merged into bigger runs first so the number
+of open files stays bounded.
+"""
+
+import heapq
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Iterable, Iterator
+import structlog
+from .models import Job, JobMatch, JobSeeker
+
+
+logger: structlog.stdlib.BoundLogger = structlog.get_logger()
+
+# (jobseeker_id, -matching_skill_percent, job_id, matching_skill_count,
+#  jobseeker_name, job_title)
+MatchRow = tuple[int, int, int, int, str, str]
+
+DEFAULT_RUN_SIZE = 1_000_000
+MAX_MERGE_FAN_IN = 64
+PICKLE_BATCH_SIZE = 10_000
+
+
+def match_to_row(job_match: JobMatch) -> MatchRow:
+    return job_match.sort_key + (
+        job_match.matching_skill_count,
+        job_match.jobseeker.name,
+        job_match.job.title,
+    )
+
+
+def row_to_match(row: MatchRow) -> JobMatch:
+    """Rebuild a JobMatch from a row.
+
+    Only the fields needed for output are restored, skills are left empty.
+    """
+    jobseeker_id, percent, job_id, count, jobseeker_name, job_title = row
+    return JobMatch(
+        jobseeker=JobSeeker(id=jobseeker_id, name=jobseeker_name),
+        job=Job(id=job_id, title=job_title),
+        matching_skill_count=count,
+        matching_skill_percent=-percent,
+    )
+
+
+def write_run(rows: Iterable[MatchRow], directory: Path) -> Path:
+    """Write already sorted rows to a new run file inside directory."""
+    with tempfile.NamedTemporaryFile(
+        dir=directory, prefix="run-", suffix=".pkl", delete=False
+    ) as f:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= PICKLE_BATCH_SIZE:
+                pickle.dump(batch, f, protocol=pickle.HIGHEST_PROTOCOL)
+                batch = []
+        if batch:
+            pickle.dump(batch, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        return Path(f.name)
+
+
+def read_run(path: Path) -> Iterator[MatchRow]:
+    with open(path, "rb") as f:
+        while True:
+            try:
+                batch = pickle.load(f)
+            except EOFError:
+                return
+            yield from batch
+
+
+def merge_runs(
+    runs: list[Path], directory: Path, fan_in: int, max_runs: int
+) -> list[Path]:
+    """Merge runs in groups of fan_in until at most max_runs runs are left."""
+    runs = list(runs)
+    while len(runs) > max_runs:
+        group, runs = runs[:fan_in], runs[fan_in:]
+        merged = write_run(heapq.merge(*(read_run(run) for run in group)), directory)
+        for run in group:
+            run.unlink()
+        runs.append(merged)
+        logger.debug("Merged intermediate runs", merged=len(group), left=len(runs))
+
+    return runs
+
+
+class ExternalMatchSorter:
+    """Sorts job matches using a bounded amount of memory.
+
+    Matches are added one at a time.  Once run_size rows are buffered, the buffer
+    is sorted and written to a temporary run file.  Iterating the sorter merges
+    the runs (and whatever is still buffered) back in JobMatch order.
+
+    Args:
+        run_size (int): Max number of matches held in memory before spilling.
+        fan_in (int): Max number of runs merged at the same time.
+        tmp_dir (Path | None): Where run files are created.  Defaults to the
+                               system temporary directory.
+    """
+
+    def __init__(
+        self,
+        run_size: int = DEFAULT_RUN_SIZE,
+        fan_in: int = MAX_MERGE_FAN_IN,
+        tmp_dir: Path | None = None,
+    ):
+        if run_size < 1:
+            raise ValueError("run_size must be at least 1")
+        if fan_in < 2:
+            raise ValueError("fan_in must be at least 2")
+
+        self.run_size = run_size
+        self.fan_in = fan_in
+        self.tmp_dir = tmp_dir
+        self._buffer: list[MatchRow] = []
+        self._runs: list[Path] = []
+        self._tmp_dir: tempfile.TemporaryDirectory | None = None
+
+    def add(self, job_match: JobMatch) -> None:
+        self._buffer.append(match_to_row(job_match))
+        if len(self._buffer) >= self.run_size:
+            self._spill()
+
+    def extend(self, job_matches: Iterable[JobMatch]) -> None:
+        for job_match in job_matches:
+            self.add(job_match)
+
+    def add_run(self, job_matches: Iterable[JobMatch]) -> None:
+        """Write matches that are already in JobMatch order as their own run."""
+        rows = (match_to_row(job_match) for job_match in job_matches)
+        self._runs.append(write_run(rows, self._get_run_dir()))
+
+    def _get_run_dir(self) -> Path:
+        if self._tmp_dir is None:
+            self._tmp_dir = tempfile.TemporaryDirectory(
+                prefix="recommender-", dir=self.tmp_dir
+            )
+
+        return Path(self._tmp_dir.name)
+
+    def _spill(self) -> None:
+        self._buffer.sort()
+        self._runs.append(write_run(self._buffer, self._get_run_dir()))
+        logger.debug("Spilled sorted run to disk", rows=len(self._buffer))
+        self._buffer = []
+
+    def __iter__(self) -> Iterator[JobMatch]:
+        self._buffer.sort()
+        if self._tmp_dir is not None:
+            # leave a slot for the in memory buffer
+            self._runs = merge_runs(
+                self._runs,
+                Path(self._tmp_dir.name),
+                fan_in=self.fan_in,
+                max_runs=self.fan_in - 1,
+            )
+
+        streams = [read_run(run) for run in self._runs]
+        streams.append(iter(self._buffer))
+
+        try:
+            for row in heapq.merge(*streams):
+                yield row_to_match(row)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self._buffer = []
+        self._runs = []
+        if self._tmp_dir is not None:
+            self._tmp_dir.cleanup()
+            self._tmp_dir = None
@@ -0,0 +1,124 @@
+"""sparse
+
+Vectorized matching engine built on NumPy and SciPy sparse matrices.
+
+Requires the optional sparse dependencies: pip install recommender[sparse]
+
+Jobs are encoded once as a CSR skill incidence matrix J (jobs x skills).  Job
+seekers are encoded in chunks as S (seekers x skills), and the matching skill
+counts for a whole chunk come out of a single sparse product S @ J.T.
+"""
+
+from itertools import batched
+from typing import Iterable, Iterator, Sequence, Tuple
+import numpy as np
+from scipy import sparse
+import structlog
+from .models import Job, JobMatch, JobSeeker, Skill
+from .services import InMemoryRecommenderService
+
+
+logger: structlog.stdlib.BoundLogger = structlog.get_logger()
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+class SparseRecommenderService(InMemoryRecommenderService):
+    """Matches chunks of jobseekers with a sparse matrix product.
+
+    Args:
+        chunk_size (int): Number of jobseekers encoded per matrix product.
+
+    Other arguments are passed through to InMemoryRecommenderService.
+    """
+
+    def __init__(self, *args, chunk_size: int = DEFAULT_CHUNK_SIZE, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.chunk_size = chunk_size
+        self._skill_columns: dict[Skill, int] = {}
+        self._jobs: list[Job] = []
+        self._skills_by_job = sparse.csr_array((0, 0), dtype=np.int32)
+        self._required_counts = np.zeros(0, dtype=np.float64)
+
+    def _get_job_indexes(
+        self, jobs: Iterable[Job] | None = None
+    ) -> Tuple[dict[int, Job], dict[Skill, set[int]]]:
+        jobs_by_id, jobs_by_skills = super()._get_job_indexes(jobs)
+
+        self._skill_columns = {skill: col for col, skill in enumerate(jobs_by_skills)}
+        self._jobs = list(jobs_by_id.values())
+
+        job_skills = self._encode([job.required_skills for job in self._jobs])
+        # skills x jobs, so a chunk of seekers can be multiplied directly
+        self._skills_by_job = job_skills.T.tocsr()
+        self._required_counts = np.diff(job_skills.indptr).astype(np.float64)
+        logger.debug("Built job skill matrix", shape=job_skills.shape)
+
+        return jobs_by_id, jobs_by_skills
+
+    def _encode(self, skill_sets: Sequence[Iterable[Skill]]) -> sparse.csr_array:
+        """Encode skill sets as rows of a CSR incidence matrix.
+
+        Skills that no job requires have no column and are dropped.
+        """
+        columns = self._skill_columns
+        indptr = [0]
+        indices = []
+        for skills in skill_sets:
+            indices.extend(columns[skill] for skill in skills if skill in columns)
+            indptr.append(len(indices))
+
+        return sparse.csr_array(
+            (
+                np.ones(len(indices), dtype=np.int32),
+                np.array(indices, dtype=np.int32),
+                np.array(indptr, dtype=np.int64),
+            ),
+            shape=(len(skill_sets), len(columns)),
+        )
+
+    def _match_chunk(
+        self, chunk: Sequence[JobSeeker]
+    ) -> Iterator[tuple[JobSeeker, list[JobMatch]]]:
+        seeker_skills = self._encode([s.skills for s in chunk])
+        overlaps = (seeker_skills @ self._skills_by_job).tocsr()
+
+        # same float arithmetic as get_matching_percentage
+        percents = np.trunc(
+            overlaps.data / self._required_counts[overlaps.indices] * 100
+        ).astype(np.int64)
+
+        jobs = self._jobs
+        indptr = overlaps.indptr.tolist()
+        job_rows = overlaps.indices.tolist()
+        counts = overlaps.data.tolist()
+        percents = percents.tolist()
+
+        for i, seeker in enumerate(chunk):
+            start, end = indptr[i], indptr[i + 1]
+            yield seeker, self._build_job_matches(
+                seeker,
+                [
+                    (jobs[job_rows[k]], counts[k], percents[k])
+                    for k in range(start, end)
+                ],
+            )
+
+    def _get_job_matches(
+        self,
+        jobseeker: JobSeeker,
+        jobs_by_skills: dict[Skill, set[int]],
+        jobs_by_id: dict[int, Job],
+    ) -> list[JobMatch]:
+        _, job_matches = next(self._match_chunk([jobseeker]))
+        return job_matches
+
+    def _match_job_seekers(
+        self,
+        job_seekers: Iterable[JobSeeker],
+        jobs_by_skills: dict[Skill, set[int]],
+        jobs_by_id: dict[int, Job],
+    ) -> Iterator[tuple[JobSeeker, list[JobMatch]]]:
+        for chunk in batched(job_seekers, self.chunk_size):
+            logger.debug("Matching chunk of jobseekers", size=len(chunk))
+            yield from self._match_chunk(chunk)
@@ -0,0 +1,54 @@
+"""vocabulary
+
+Interning of normalized skill names to small integer ids.
+
+Sharing one SkillVocabulary between the job and jobseeker inputs means each
+distinct skill string is stored once, and models hold frozensets of ints that
+are cheaper to hash and intersect than sets of strings.
+"""
+
+from typing import Iterable
+
+
+class SkillVocabulary:
+    """Two way mapping between normalized skill names and integer ids.
+
+    Ids are assigned in order of first appearance, starting from 0.
+    """
+
+    __slots__ = ("_ids", "_skills")
+
+    def __init__(self, skills: Iterable[str] = ()):
+        self._ids: dict[str, int] = {}
+        self._skills: list[str] = []
+        for skill in skills:
+            self.intern(skill)
+
+    def __len__(self) -> int:
+        return len(self._skills)
+
+    def __contains__(self, skill: str) -> bool:
+        return skill in self._ids
+
+    def intern(self, skill: str) -> int:
+        skill_id = self._ids.get(skill)
+        if skill_id is None:
+            skill_id = len(self._skills)
+            self._ids[skill] = skill_id
+            self._skills.append(skill)
+
+        return skill_id
+
+    def intern_all(self, skills: Iterable[str]) -> frozenset[int]:
+        ids = self._ids
+        intern = self.intern
+        return frozenset([ids[s] if s in ids else intern(s) for s in skills])
+
+    def get(self, skill: str) -> int | None:
+        return self._ids.get(skill)
+
+    def skill(self, skill_id: int) -> str:
+        return self._skills[skill_id]
+
+    def skills(self, skill_ids: Iterable[int]) -> set[str]:
+        return {self._skills[skill_id] for skill_id in skill_ids}
@@ -0,0 +1,6 @@
+import os
+
+# pyarrow, imported when test_columnar is collected, otherwise starts a
+# jemalloc thread, and every test forking worker processes would then fork a
+# multi-threaded process
+os.environ.setdefault("JE_ARROW_MALLOC_CONF", "background_thread:false")
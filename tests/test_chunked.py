@@ -0,0 +1,169 @@
+import csv
+import pytest
+from io import BytesIO, StringIO
+from recommender.chunked import (
+    ParallelCSVJobSeekerInput,
+    find_last_record_end,
+    parse_job_seekers_chunk,
+    split_records,
+)
+from recommender.compression import open_file
+from recommender.input import CSVJobSeekerInput
+from recommender.vocabulary import SkillVocabulary
+
+
+def write_job_seekers(path, rows=200):
+    """Names and skills with quotes, commas and new lines, written by csv."""
+    spellings = ['Ann "The Dev"\nJr', "Bob, Applicant", "Carl\r\nSeeker", "Dee"]
+    skills = ["Ruby", " sql", 'C "Sharp"', "Node\njs", "Go"]
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "skills"])
+        for i in range(rows):
+            row_skills = [skills[(i + j) % len(skills)] for j in range(i % 4 + 1)]
+            writer.writerow([i, f"{spellings[i % 4]} {i}", ", ".join(row_skills)])
+    return path
+
+
+@pytest.fixture
+def job_seekers_path(tmp_path):
+    return write_job_seekers(tmp_path / "jobseekers.csv")
+
+
+@pytest.mark.parametrize(
+    "data, end",
+    [
+        (b"", 0),
+        (b"1,Ann", 0),
+        (b"1,Ann\n2,Bob", 6),
+        (b'1,"Ann\n2,Bob', 0),
+        (b'1,"Ann\nJr"\n2,"Bob\n', 11),
+        (b'1,"Ann ""The Dev""\nJr"\n', 23),
+        (b"1,Ann\r\n", 7),
+    ],
+)
+def test_find_last_record_end(data, end):
+    assert find_last_record_end(data) == end
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 64, 1024 * 1024])
+def test_split_records(job_seekers_path, chunk_size):
+    data = job_seekers_path.read_bytes()
+
+    chunks = list(split_records(BytesIO(data), chunk_size))
+
+    assert b"".join(chunks) == data
+    expected_rows = list(csv.reader(StringIO(data.decode(), newline="")))
+    rows = [
+        row
+        for chunk in chunks
+        for row in csv.reader(StringIO(chunk.decode(), newline=""))
+    ]
+    assert rows == expected_rows
+
+
+def test_parse_job_seekers_chunk():
+    chunk = b'2,Bob,"Ruby, sql"\n1,"Ann\nJr","SQL,Go"\n'
+
+    ids, names, skill_names, skill_rows = parse_job_seekers_chunk(
+        chunk, ["id", "name", "skills"]
+    )
+
+    assert (ids, names) == ([2, 1], ["Bob", "Ann\nJr"])
+    assert skill_names == ["RUBY", "SQL", "GO"]
+    assert skill_rows == [(0, 1), (1, 2)]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("chunk_size", [1, 100, 1024 * 1024])
+def test_parallel_job_seeker_input(job_seekers_path, workers, chunk_size):
+    aliases = {"GO": "GOLANG"}
+    expected = list(
+        CSVJobSeekerInput(job_seekers_path, aliases=aliases).get_job_seekers()
+    )
+
+    seeker_input = ParallelCSVJobSeekerInput(
+        job_seekers_path, aliases=aliases, workers=workers, chunk_size=chunk_size
+    )
+
+    assert list(seeker_input.get_job_seekers()) == expected
+    # ids are unique per pass, the file may be read more than once
+    assert list(seeker_input.get_job_seekers()) == expected
+
+
+def test_parallel_job_seeker_input_interned(job_seekers_path):
+    vocabulary = SkillVocabulary()
+    expected = list(
+        CSVJobSeekerInput(job_seekers_path, vocabulary=vocabulary).get_job_seekers()
+    )
+    parallel_vocabulary = SkillVocabulary()
+
+    job_seekers = list(
+        ParallelCSVJobSeekerInput(
+            job_seekers_path, vocabulary=parallel_vocabulary, workers=2, chunk_size=100
+        ).get_job_seekers()
+    )
+
+    # skills are interned in the same order, so they get the same ids
+    assert job_seekers == expected
+    assert isinstance(job_seekers[0].skills, frozenset)
+    assert [parallel_vocabulary.skill(i) for i in range(len(parallel_vocabulary))] == [
+        vocabulary.skill(i) for i in range(len(vocabulary))
+    ]
+
+
+def test_parallel_job_seeker_input_batches(job_seekers_path):
+    batches = list(
+        ParallelCSVJobSeekerInput(
+            job_seekers_path, workers=2, chunk_size=1000
+        ).get_job_seeker_batches()
+    )
+
+    assert len(batches) > 1
+    assert [seeker.id for batch in batches for seeker in batch] == list(range(200))
+
+
+def test_parallel_job_seeker_input_compressed(tmp_path, job_seekers_path):
+    compressed_path = tmp_path / "jobseekers.csv.gz"
+    with open_file(compressed_path, "wb") as f:
+        f.write(job_seekers_path.read_bytes())
+
+    assert list(
+        ParallelCSVJobSeekerInput(compressed_path, workers=2).get_job_seekers()
+    ) == list(CSVJobSeekerInput(job_seekers_path).get_job_seekers())
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        # duplicated across chunks
+        "id,name,skills\n1,Ann,Ruby\n2,Bob,Ruby\n1,Carl,Ruby\n",
+        # duplicated within a chunk
+        "id,name,skills\n1,Ann,Ruby\n1,Bob,Ruby\n",
+        "id,name,skills\n1,Ann,Ruby\nA,Bob,Ruby\n",
+    ],
+)
+def test_parallel_job_seeker_input_invalid_rows(tmp_path, data):
+    path = tmp_path / "jobseekers.csv"
+    path.write_text(data)
+
+    with pytest.raises(ValueError):
+        list(
+            ParallelCSVJobSeekerInput(path, workers=2, chunk_size=16).get_job_seekers()
+        )
+
+
+def test_parallel_job_seeker_input_invalid_header(tmp_path):
+    path = tmp_path / "jobseekers.csv"
+    path.write_text("id,title,skills\n1,Ann,Ruby\n")
+
+    with pytest.raises(KeyError):
+        list(ParallelCSVJobSeekerInput(path, workers=2).get_job_seekers())
+
+
+@pytest.mark.parametrize("data", ["", "id,name,skills", "id,name,skills\n\n"])
+def test_parallel_job_seeker_input_empty(tmp_path, data):
+    path = tmp_path / "jobseekers.csv"
+    path.write_text(data)
+
+    assert list(ParallelCSVJobSeekerInput(path, workers=2).get_job_seekers()) == []
@@ -0,0 +1,282 @@
+import csv
+import subprocess
+import sys
+import orjson
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+import pyarrow.feather  # noqa: E402
+import pyarrow.parquet as pq  # noqa: E402
+from click.testing import CliRunner  # noqa: E402
+from recommender import commands  # noqa: E402
+from recommender.columnar import (  # noqa: E402
+    JOB_MATCH_SCHEMA,
+    ArrowJobInput,
+    ArrowJobSeekerInput,
+    format_job_matches_as_record_batches,
+    write_record_batches,
+)
+from recommender.vocabulary import SkillVocabulary  # noqa: E402
+from recommender.services import InMemoryRecommenderService  # noqa: E402
+from .test_commands import EXPECTED_CSV_OUTPUT  # noqa: E402
+from .test_services import (  # noqa: E402
+    MockJobInput,
+    MockJobSeekerInput,
+    job_seekers,
+    jobs,
+)
+
+JOBS_TABLE = {
+    "id": [1, 2, 3],
+    "title": ["Ruby Developer", "Frontend Developer", "Backend Developer"],
+    "required_skills": [
+        ["Ruby", "SQL", "Problem Solving"],
+        ["JavaScript", "HTML/CSS", "React", "Teamwork"],
+        ["Java", "SQL", "Node.js", "Problem Solving"],
+    ],
+}
+
+JOBS_CSV = (
+    "id,title,required_skills\n"
+    '1,Ruby Developer,"Ruby, SQL, Problem Solving"\n'
+    '2,Frontend Developer,"JavaScript, HTML/CSS, React, Teamwork"\n'
+    '3,Backend Developer,"Java, SQL, Node.js, Problem Solving"\n'
+)
+
+JOBSEEKERS_TABLE = {
+    "id": [2, 1],
+    "name": ["Bob Applicant", "Alice Seeker"],
+    "skills": [
+        ["JavaScript", "HTML/CSS", "Teamwork"],
+        [" ruby", "SQL ", "Problem Solving"],
+    ],
+    "email": ["bob@example.com", "alice@example.com"],
+}
+
+
+def write_table(path, columns, batch_size=None):
+    table = pa.table(columns)
+    if path.suffix == ".parquet":
+        pq.write_table(table, path, row_group_size=batch_size)
+    else:
+        pyarrow.feather.write_feather(
+            table, path, compression="uncompressed", chunksize=batch_size
+        )
+    return path
+
+
+@pytest.fixture(params=[".parquet", ".arrow"])
+def suffix(request):
+    return request.param
+
+
+def to_columns(rows, *fields):
+    id_field, name_field, skills_field = fields
+    return {
+        id_field: [row.id for row in rows],
+        name_field: [getattr(row, name_field) for row in rows],
+        skills_field: [sorted(getattr(row, skills_field)) for row in rows],
+    }
+
+
+def test_arrow_job_input(tmp_path, suffix):
+    path = write_table(
+        tmp_path / f"jobs{suffix}",
+        to_columns(jobs, "id", "title", "required_skills"),
+        3,
+    )
+
+    assert list(ArrowJobInput(path, batch_size=3).get_jobs()) == jobs
+
+
+def test_arrow_job_seeker_input(tmp_path, suffix):
+    path = write_table(
+        tmp_path / f"jobseekers{suffix}",
+        to_columns(job_seekers, "id", "name", "skills"),
+        4,
+    )
+    seeker_input = ArrowJobSeekerInput(path, batch_size=4)
+
+    assert list(seeker_input.get_job_seekers()) == job_seekers
+    # ids are unique per pass, the file may be read more than once
+    assert list(seeker_input.get_job_seekers()) == job_seekers
+
+
+def test_arrow_job_seeker_input_interned(tmp_path, suffix):
+    path = write_table(tmp_path / f"jobseekers{suffix}", JOBSEEKERS_TABLE)
+    vocabulary = SkillVocabulary()
+
+    bob, alice = ArrowJobSeekerInput(path, vocabulary=vocabulary).get_job_seekers()
+
+    assert vocabulary.skills(alice.skills) == {"RUBY", "SQL", "PROBLEM SOLVING"}
+    assert isinstance(bob.skills, frozenset)
+
+
+def test_arrow_job_seeker_input_aliases_and_nulls(tmp_path, suffix):
+    path = write_table(
+        tmp_path / f"jobseekers{suffix}",
+        {"id": [1, 2], "name": ["Alice", None], "skills": [["js", None], None]},
+    )
+
+    alice, nameless = ArrowJobSeekerInput(
+        path, aliases={"JS": "JAVASCRIPT"}
+    ).get_job_seekers()
+
+    assert alice.skills == {"JAVASCRIPT", ""}
+    assert (nameless.name, nameless.skills) == ("", set())
+
+
+def test_arrow_job_seeker_input_duplicate_across_batches(tmp_path, suffix):
+    path = write_table(
+        tmp_path / f"jobseekers{suffix}",
+        {"id": [1, 2, 1], "name": ["A", "B", "C"], "skills": [["X"], ["Y"], ["Z"]]},
+        batch_size=2,
+    )
+
+    with pytest.raises(ValueError):
+        list(ArrowJobSeekerInput(path, batch_size=2).get_job_seekers())
+
+
+@pytest.mark.parametrize(
+    "columns, error",
+    [
+        ({"id": [1], "name": ["A"]}, KeyError),
+        ({"id": [1], "name": ["A"], "skills": ["Ruby, SQL"]}, TypeError),
+        ({"id": ["1"], "name": ["A"], "skills": [["Ruby"]]}, TypeError),
+        ({"id": [1, None], "name": ["A", "B"], "skills": [["Ruby"], []]}, ValueError),
+    ],
+)
+def test_arrow_job_seeker_input_invalid(tmp_path, suffix, columns, error):
+    path = write_table(tmp_path / f"jobseekers{suffix}", columns)
+
+    with pytest.raises(error):
+        list(ArrowJobSeekerInput(path).get_job_seekers())
+
+
+def test_arrow_input_unsupported_suffix(tmp_path):
+    with pytest.raises(ValueError):
+        list(ArrowJobInput(tmp_path / "jobs.csv").get_jobs())
+
+
+@pytest.mark.parametrize("jobs_suffix", [".parquet", ".csv"])
+def test_columnar_input(tmp_path, suffix, jobs_suffix):
+    jobseekers_path = write_table(tmp_path / f"jobseekers{suffix}", JOBSEEKERS_TABLE)
+    jobs_path = tmp_path / f"jobs{jobs_suffix}"
+    if jobs_suffix == ".csv":
+        jobs_path.write_text(JOBS_CSV)
+    else:
+        write_table(jobs_path, JOBS_TABLE)
+    output_path = tmp_path / "output.csv"
+
+    runner = CliRunner()
+    result = runner.invoke(
+        commands.columnar_input,
+        [str(jobseekers_path), str(jobs_path), "--output", str(output_path)],
+        catch_exceptions=False,
+    )
+
+    assert result.exit_code == 0
+    assert output_path.read_text() == EXPECTED_CSV_OUTPUT
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "arrow"])
+def test_write_record_batches(tmp_path, file_format):
+    service = InMemoryRecommenderService(
+        jobseekers=MockJobSeekerInput(job_seekers), jobs=MockJobInput(jobs)
+    )
+    service.formatter = list
+    matches = service.execute()
+    path = tmp_path / f"output.{file_format}"
+
+    write_record_batches(
+        format_job_matches_as_record_batches(matches), path, file_format
+    )
+
+    table = (
+        pq.read_table(path)
+        if file_format == "parquet"
+        else pyarrow.feather.read_table(path)
+    )
+    assert table.schema == JOB_MATCH_SCHEMA
+    assert table.to_pylist()[0] == {
+        "jobseeker_id": matches[0].jobseeker.id,
+        "jobseeker_name": matches[0].jobseeker.name,
+        "job_id": matches[0].job.id,
+        "job_title": matches[0].job.title,
+        "matching_skill_count": matches[0].matching_skill_count,
+        "matching_skill_percent": matches[0].matching_skill_percent,
+    }
+    assert table.column("job_id").to_pylist() == [match.job.id for match in matches]
+
+
+def test_write_record_batches_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        write_record_batches([], tmp_path / "output.orc", "orc")
+
+
+@pytest.mark.parametrize("output_format", ["parquet", "arrow", "ndjson"])
+def test_csv_input_binary_formats(tmp_path, output_format):
+    jobseekers_path = tmp_path / "jobseekers.csv"
+    jobseekers_path.write_text(
+        "id,name,skills\n"
+        '2,Bob Applicant,"JavaScript, HTML/CSS, Teamwork"\n'
+        '1,Alice Seeker,"Ruby, SQL, Problem Solving"\n'
+    )
+    jobs_path = tmp_path / "jobs.csv"
+    jobs_path.write_text(JOBS_CSV)
+    output_path = tmp_path / f"output.{output_format}"
+
+    runner = CliRunner()
+    result = runner.invoke(
+        commands.csv_input,
+        [str(jobseekers_path), str(jobs_path), "--output", str(output_path)]
+        + ["--format", output_format],
+        catch_exceptions=False,
+    )
+
+    assert result.exit_code == 0
+    if output_format == "ndjson":
+        rows = [orjson.loads(line) for line in output_path.read_bytes().splitlines()]
+    elif output_format == "parquet":
+        rows = pq.read_table(output_path).to_pylist()
+    else:
+        rows = pyarrow.feather.read_table(output_path).to_pylist()
+    expected = list(csv.DictReader(EXPECTED_CSV_OUTPUT.splitlines()))
+    assert [{k: str(v) for k, v in row.items()} for row in rows] == expected
+
+
+@pytest.mark.parametrize("output_format", ["parquet", "arrow"])
+def test_csv_input_columnar_format_with_workers(tmp_path, output_format):
+    """pyarrow starts a thread when imported, so it must not be imported before
+    --workers forks.  Run in a new process, free of the threads of other tests.
+    os.fork drops its warning when warnings are errors, so they are printed.
+    """
+    jobseekers_path = tmp_path / "jobseekers.csv"
+    jobseekers_path.write_text(
+        "id,name,skills\n"
+        '2,Bob Applicant,"JavaScript, HTML/CSS, Teamwork"\n'
+        '1,Alice Seeker,"Ruby, SQL, Problem Solving"\n'
+    )
+    jobs_path = tmp_path / "jobs.csv"
+    jobs_path.write_text(JOBS_CSV)
+    output_path = tmp_path / f"output.{output_format}"
+
+    result = subprocess.run(
+        [sys.executable, "-W", "always::DeprecationWarning", "-m", "recommender"]
+        + ["csv-input", str(jobseekers_path), str(jobs_path)]
+        + ["--output", str(output_path), "--format", output_format]
+        + ["--workers", "2"],
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert "DeprecationWarning" not in result.stderr
+    if output_format == "parquet":
+        rows = pq.read_table(output_path).to_pylist()
+    else:
+        rows = pyarrow.feather.read_table(output_path).to_pylist()
+    expected = list(csv.DictReader(EXPECTED_CSV_OUTPUT.splitlines()))
+    assert [{k: str(v) for k, v in row.items()} for row in rows] == expected
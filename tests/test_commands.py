@@ -1,8 +1,10 @@
+import orjson
 import pytest
 from click.testing import CliRunner
-from unittest.mock import MagicMock, patch, call
+from unittest.mock import MagicMock, patch
 from recommender import commands
 from recommender import logging_config
+from recommender.compression import open_file
 
 # from io import StringIO
 from pathlib import Path
@@ -127,9 +129,409 @@ def test_csv_input_file_output(mock_path_convert):
     # Check that the command executed successfully
     assert result.exit_code == 0
 
-    header_call = call(
+    # rows are gathered and written at once
+    mock_output_file.assert_called_once_with(
         "jobseeker_id,jobseeker_name,job_id,job_title,matching_skill_count,matching_skill_percent\n"
+        "1,Alice Seeker,1,Ruby Developer,3,100\n"
+    )
+
+
+@pytest.fixture
+def csv_files(tmp_path):
+    jobseekers_path = tmp_path / "jobseekers.csv"
+    jobseekers_path.write_text(
+        "id,name,skills\n"
+        '2,Bob Applicant,"JavaScript, HTML/CSS, Teamwork"\n'
+        '1,Alice Seeker,"Ruby, SQL, Problem Solving"\n'
+    )
+    jobs_path = tmp_path / "jobs.csv"
+    jobs_path.write_text(
+        "id,title,required_skills\n"
+        '1,Ruby Developer,"Ruby, SQL, Problem Solving"\n'
+        '2,Frontend Developer,"JavaScript, HTML/CSS, React, Teamwork"\n'
+        '3,Backend Developer,"Java, SQL, Node.js, Problem Solving"\n'
+    )
+    return jobseekers_path, jobs_path
+
+
+EXPECTED_CSV_OUTPUT = (
+    "jobseeker_id,jobseeker_name,job_id,job_title,matching_skill_count,matching_skill_percent\n"
+    "1,Alice Seeker,1,Ruby Developer,3,100\n"
+    "1,Alice Seeker,3,Backend Developer,2,50\n"
+    "2,Bob Applicant,2,Frontend Developer,3,75\n"
+)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        [],
+        ["--streaming"],
+        ["--max-matches-in-memory", "1"],
+        ["--engine", "bitset"],
+        ["--workers", "2"],
+        ["--parse-workers", "2"],
+        ["--job-chunk-size", "1"],
+    ],
+)
+def test_csv_input_file_output_options(csv_files, tmp_path, options):
+    """Every option gives the same output on this small input."""
+    jobseekers_path, jobs_path = csv_files
+    output_path = tmp_path / "output.csv"
+
+    runner = CliRunner()
+    result = runner.invoke(
+        commands.csv_input,
+        [str(jobseekers_path), str(jobs_path), "--output", str(output_path)] + options,
+        catch_exceptions=False,
+    )
+
+    assert result.exit_code == 0
+    assert output_path.read_text() == EXPECTED_CSV_OUTPUT
+
+
+def test_csv_input_parse_workers_with_workers(csv_files):
+    jobseekers_path, jobs_path = csv_files
+
+    runner = CliRunner()
+    result = runner.invoke(
+        commands.csv_input,
+        [str(jobseekers_path), str(jobs_path), "--workers", "2"]
+        + ["--parse-workers", "2"],
+    )
+
+    assert result.exit_code == 2
+    assert "--parse-workers cannot be combined with --workers" in result.output
+
+
+def test_csv_input_top_k(csv_files, tmp_path):
+    jobseekers_path, jobs_path = csv_files
+    output_path = tmp_path / "output.csv"
+
+    runner = CliRunner()
+    result = runner.invoke(
+        commands.csv_input,
+        [
+            str(jobseekers_path),
+            str(jobs_path),
+            "--output",
+            str(output_path),
+            "--top-k",
+            "1",
+        ],
+        catch_exceptions=False,
+    )
+
+    assert result.exit_code == 0
+    assert output_path.read_text() == (
+        "jobseeker_id,jobseeker_name,job_id,job_title,matching_skill_count,matching_skill_percent\n"
+        "1,Alice Seeker,1,Ruby Developer,3,100\n"
+        "2,Bob Applicant,2,Frontend Developer,3,75\n"
+    )
+
+
+@pytest.mark.parametrize("options", [[], ["--engine", "bitset"], ["--workers", "2"]])
+def test_build_index_then_csv_input(csv_files, tmp_path, options):
+    jobseekers_path, jobs_path = csv_files
+    index_path = tmp_path / "jobs.idx"
+    output_path = tmp_path / "output.csv"
+
+    runner = CliRunner()
+    result = runner.invoke(
+        commands.build_index,
+        [str(jobs_path), str(index_path)],
+        catch_exceptions=False,
+    )
+    assert result.exit_code == 0
+
+    result = runner.invoke(
+        commands.csv_input,
+        [str(jobseekers_path), str(index_path), "--output", str(output_path)] + options,
+        catch_exceptions=False,
+    )
+
+    assert result.exit_code == 0
+    assert output_path.read_text() == EXPECTED_CSV_OUTPUT
+
+
+def test_csv_input_index_cache(csv_files, tmp_path):
+    jobseekers_path, jobs_path = csv_files
+    cache_path = tmp_path / "cache"
+
+    runner = CliRunner()
+    for run in range(2):
+        output_path = tmp_path / f"output{run}.csv"
+        result = runner.invoke(
+            commands.csv_input,
+            [
+                str(jobseekers_path),
+                str(jobs_path),
+                "--output",
+                str(output_path),
+                "--index-cache",
+                str(cache_path),
+            ],
+            catch_exceptions=False,
+        )
+
+        assert result.exit_code == 0
+        assert output_path.read_text() == EXPECTED_CSV_OUTPUT
+        assert len(list(cache_path.glob("*.idx"))) == 1
+
+
+def test_update_index_then_csv_input(csv_files, tmp_path):
+    jobseekers_path, jobs_path = csv_files
+    index_path = tmp_path / "jobs.idx"
+    deltas_path = tmp_path / "deltas.csv"
+    deltas_path.write_text(
+        "op,id,title,required_skills\n"
+        "delete,1,,\n"
+        'update,2,Frontend Developer,"JavaScript, HTML/CSS"\n'
+    )
+    output_path = tmp_path / "output.csv"
+
+    runner = CliRunner()
+    for command, args in [
+        (commands.build_index, [str(jobs_path), str(index_path)]),
+        (commands.update_index, [str(index_path), str(deltas_path)]),
+        (
+            commands.csv_input,
+            [str(jobseekers_path), str(index_path), "--output", str(output_path)],
+        ),
+    ]:
+        result = runner.invoke(command, args, catch_exceptions=False)
+        assert result.exit_code == 0
+
+    assert output_path.read_text() == (
+        "jobseeker_id,jobseeker_name,job_id,job_title,matching_skill_count,matching_skill_percent\n"
+        "1,Alice Seeker,3,Backend Developer,2,50\n"
+        "2,Bob Applicant,2,Frontend Developer,2,100\n"
+    )
+
+
+def test_csv_input_incremental(csv_files, tmp_path):
+    jobseekers_path, jobs_path = csv_files
+    previous_path = tmp_path / "previous.csv"
+    output_path = tmp_path / "output.csv"
+    expected_path = tmp_path / "expected.csv"
+
+    runner = CliRunner()
+    result = runner.invoke(
+        commands.csv_input,
+        [str(jobseekers_path), str(jobs_path), "--output", str(previous_path)],
+        catch_exceptions=False,
+    )
+    assert result.exit_code == 0
+
+    jobseekers_path.write_text(
+        "id,name,skills\n"
+        '2,Bob Applicant,"JavaScript, HTML/CSS, Teamwork"\n'
+        '1,Alice Seeker,"Java, SQL"\n'
+    )
+    jobs_path.write_text(
+        "id,title,required_skills\n"
+        '1,Ruby Developer,"Ruby, SQL, Problem Solving"\n'
+        '2,Frontend Developer,"JavaScript, HTML/CSS, React, Teamwork"\n'
+        '4,Web Developer,"JavaScript, HTML/CSS"\n'
+    )
+    jobseeker_deltas_path = tmp_path / "jobseeker_deltas.csv"
+    jobseeker_deltas_path.write_text(
+        "op,id,name,skills\n" 'update,1,Alice,"Java, SQL"\n'
+    )
+    job_deltas_path = tmp_path / "job_deltas.csv"
+    job_deltas_path.write_text(
+        "op,id,title,required_skills\n"
+        "delete,3,,\n"
+        'add,4,Web Developer,"JavaScript, HTML/CSS"\n'
+    )
+
+    for path, options in [
+        (expected_path, []),
+        (
+            output_path,
+            [
+                "--previous-output",
+                str(previous_path),
+                "--jobseeker-deltas",
+                str(jobseeker_deltas_path),
+                "--job-deltas",
+                str(job_deltas_path),
+            ],
+        ),
+    ]:
+        result = runner.invoke(
+            commands.csv_input,
+            [str(jobseekers_path), str(jobs_path), "--output", str(path)] + options,
+            catch_exceptions=False,
+        )
+        assert result.exit_code == 0
+
+    assert output_path.read_text() == expected_path.read_text()
+    assert "Web Developer" in output_path.read_text()
+
+
+def test_csv_input_incremental_requires_previous_output(csv_files, tmp_path):
+    jobseekers_path, jobs_path = csv_files
+    deltas_path = tmp_path / "job_deltas.csv"
+    deltas_path.write_text("op,id,title,required_skills\n" "delete,3,,\n")
+
+    runner = CliRunner()
+    result = runner.invoke(
+        commands.csv_input,
+        [str(jobseekers_path), str(jobs_path), "--job-deltas", str(deltas_path)],
+    )
+
+    assert result.exit_code != 0
+    assert "--previous-output" in result.output
+
+
+@pytest.mark.parametrize("build", [False, True])
+def test_rank_candidates(csv_files, tmp_path, build):
+    jobseekers_path, jobs_path = csv_files
+    output_path = tmp_path / "output.csv"
+
+    runner = CliRunner()
+    if build:
+        index_path = tmp_path / "jobs.idx"
+        runner.invoke(commands.build_index, [str(jobs_path), str(index_path)])
+        jobs_path = index_path
+
+    result = runner.invoke(
+        commands.rank_candidates,
+        [str(jobseekers_path), str(jobs_path), "--output", str(output_path)],
+        catch_exceptions=False,
+    )
+
+    assert result.exit_code == 0
+    assert output_path.read_text() == (
+        "job_id,job_title,jobseeker_id,jobseeker_name,matching_skill_count,matching_skill_percent\n"
+        "1,Ruby Developer,1,Alice Seeker,3,100\n"
+        "2,Frontend Developer,2,Bob Applicant,3,75\n"
+        "3,Backend Developer,1,Alice Seeker,2,50\n"
+    )
+
+
+def test_skill_aliases(tmp_path):
+    jobseekers_path = tmp_path / "jobseekers.csv"
+    jobseekers_path.write_text("id,name,skills\n" '1,Alice,"JS, Py"\n')
+    jobs_path = tmp_path / "jobs.csv"
+    jobs_path.write_text(
+        "id,title,required_skills\n" '1,Frontend Developer,"JavaScript, HTML"\n'
+    )
+    aliases_path = tmp_path / "aliases.csv"
+    aliases_path.write_text("skill,aliases\n" 'JavaScript,"JS, Javascript"\n')
+    output_path = tmp_path / "output.csv"
+
+    runner = CliRunner()
+    for args in (
+        [str(jobseekers_path), str(jobs_path)],
+        [
+            str(jobseekers_path),
+            str(jobs_path),
+            "--index-cache",
+            str(tmp_path / "cache"),
+        ],
+    ):
+        result = runner.invoke(
+            commands.csv_input,
+            args + ["--output", str(output_path), "--skill-aliases", str(aliases_path)],
+            catch_exceptions=False,
+        )
+
+        assert result.exit_code == 0
+        assert output_path.read_text().splitlines()[1:] == [
+            "1,Alice,1,Frontend Developer,1,50"
+        ]
+
+
+def test_csv_input_format_requires_output(csv_files):
+    jobseekers_path, jobs_path = csv_files
+
+    runner = CliRunner()
+    result = runner.invoke(
+        commands.csv_input,
+        [str(jobseekers_path), str(jobs_path), "--format", "ndjson"],
+    )
+
+    assert result.exit_code == 2
+    assert "--format ndjson requires --output" in result.output
+
+
+@pytest.mark.parametrize("suffix", [".gz", ".zst"])
+@pytest.mark.parametrize("output_format", ["csv", "ndjson"])
+def test_csv_input_compressed(csv_files, tmp_path, suffix, output_format):
+    if suffix == ".zst":
+        pytest.importorskip("zstandard")
+    jobseekers_path, jobs_path = csv_files
+    compressed_path = tmp_path / f"jobseekers.csv{suffix}"
+    with open_file(compressed_path, "w") as f:
+        f.write(jobseekers_path.read_text())
+    output_path = tmp_path / f"output.{output_format}{suffix}"
+
+    runner = CliRunner()
+    result = runner.invoke(
+        commands.csv_input,
+        [str(compressed_path), str(jobs_path), "--output", str(output_path)]
+        + ["--format", output_format],
+        catch_exceptions=False,
+    )
+
+    assert result.exit_code == 0
+    with open_file(output_path, "r") as f:
+        output = f.read()
+    if output_format == "csv":
+        assert output == EXPECTED_CSV_OUTPUT
+    else:
+        assert len(output.splitlines()) == len(EXPECTED_CSV_OUTPUT.splitlines()) - 1
+
+
+def test_csv_input_columnar_format_compressed_output(csv_files, tmp_path):
+    jobseekers_path, jobs_path = csv_files
+
+    runner = CliRunner()
+    result = runner.invoke(
+        commands.csv_input,
+        [str(jobseekers_path), str(jobs_path), "--format", "parquet"]
+        + ["--output", str(tmp_path / "output.parquet.gz")],
+    )
+
+    assert result.exit_code == 2
+    assert "compressed by its own codec" in result.output
+    assert not (tmp_path / "output.parquet.gz").exists()
+
+
+def test_csv_input_ndjson_to_stdout(csv_files, tmp_path, monkeypatch):
+    jobseekers_path, jobs_path = csv_files
+    monkeypatch.chdir(tmp_path)
+
+    runner = CliRunner()
+    result = runner.invoke(
+        commands.csv_input,
+        [str(jobseekers_path), str(jobs_path), "--format", "ndjson"]
+        + ["--output", "-"],
+        catch_exceptions=False,
+    )
+
+    assert not (tmp_path / "<stdout>").exists()
+    assert result.exit_code == 0
+    rows = [orjson.loads(line) for line in result.stdout_bytes.splitlines()]
+    assert [row["jobseeker_id"] for row in rows] == [1, 1, 2]
+
+
+@pytest.mark.parametrize("output_format", ["parquet", "arrow"])
+def test_csv_input_columnar_format_to_stdout(
+    csv_files, tmp_path, monkeypatch, output_format
+):
+    jobseekers_path, jobs_path = csv_files
+    monkeypatch.chdir(tmp_path)
+
+    runner = CliRunner()
+    result = runner.invoke(
+        commands.csv_input,
+        [str(jobseekers_path), str(jobs_path), "--format", output_format]
+        + ["--output", "-"],
     )
-    row_call = call("1,Alice Seeker,1,Ruby Developer,3,100\n")
 
-    mock_output_file.assert_has_calls([header_call, row_call])
+    assert not (tmp_path / "<stdout>").exists()
+    assert result.exit_code == 2
+    assert "cannot be written to stdout" in result.output
@@ -0,0 +1,85 @@
+import gzip
+import pytest
+from io import BytesIO
+from recommender.compression import ThreadedWriter, get_compression, open_file
+
+CSV_TEXT = 'id,name,skills\n1,"Alice\nSeeker","Ruby, SQL"\n'
+
+
+@pytest.fixture(params=["", ".gz", ".zst"])
+def suffix(request):
+    if request.param == ".zst":
+        pytest.importorskip("zstandard")
+    return request.param
+
+
+@pytest.mark.parametrize(
+    "filename, compression",
+    [
+        ("jobseekers.csv", None),
+        ("jobseekers.csv.gz", "gzip"),
+        ("jobseekers.csv.GZ", "gzip"),
+        ("output.ndjson.zst", "zstd"),
+    ],
+)
+def test_get_compression(filename, compression):
+    assert get_compression(filename) == compression
+
+
+def test_open_file_round_trip(tmp_path, suffix):
+    path = tmp_path / f"jobseekers.csv{suffix}"
+
+    with open_file(path, "w") as f:
+        f.write(CSV_TEXT)
+
+    with open_file(path, "r", newline="") as f:
+        assert f.read() == CSV_TEXT
+    with open_file(path, "rb") as f:
+        assert f.read() == CSV_TEXT.encode()
+
+
+def test_open_file_compresses(tmp_path):
+    path = tmp_path / "output.csv.gz"
+
+    with open_file(path, "w") as f:
+        for _ in range(1000):
+            f.write(CSV_TEXT)
+
+    assert gzip.decompress(path.read_bytes()) == CSV_TEXT.encode() * 1000
+    assert path.stat().st_size < len(CSV_TEXT) * 1000 // 10
+
+
+def test_open_file_reads_multiple_zstd_frames(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    path = tmp_path / "jobseekers.csv.zst"
+    compressor = zstandard.ZstdCompressor()
+    path.write_bytes(compressor.compress(b"id,name\n") + compressor.compress(b"1,A\n"))
+
+    with open_file(path, "r") as f:
+        assert f.read() == "id,name\n1,A\n"
+
+
+class FailingFile(BytesIO):
+    def write(self, data):
+        raise OSError("No space left on device")
+
+
+def test_threaded_writer():
+    raw = BytesIO()
+    raw.close = lambda: None
+    writer = ThreadedWriter(raw, max_pending=2)
+
+    for i in range(100):
+        writer.write(b"%d\n" % i)
+    writer.close()
+
+    assert raw.getvalue() == b"".join(b"%d\n" % i for i in range(100))
+
+
+def test_threaded_writer_raises_write_errors():
+    writer = ThreadedWriter(FailingFile(), max_pending=1)
+
+    with pytest.raises(OSError):
+        for _ in range(100):
+            writer.write(b"row\n")
+        writer.close()
@@ -0,0 +1,239 @@
+import os
+import pytest
+from recommender.index import (
+    JobIndex,
+    JobIndexCache,
+    MappedJobIndex,
+    write_job_index,
+)
+from recommender.models import Job, JobDelta
+from recommender.services import (
+    BitsetRecommenderService,
+    InMemoryRecommenderService,
+    JobIndexInput,
+)
+from recommender.vocabulary import SkillVocabulary
+from .test_services import MockJobInput, MockJobSeekerInput, job_seekers, jobs
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    path = tmp_path / "jobs.idx"
+    write_job_index(reversed(jobs), path)
+    return path
+
+
+def test_mapped_job_index_round_trip(index_path):
+    index = MappedJobIndex(index_path)
+
+    assert isinstance(index, JobIndexInput)
+    assert list(index.get_jobs()) == sorted(jobs, key=lambda job: job.id)
+
+    jobs_by_id, jobs_by_skills = index.get_job_indexes()
+    assert list(jobs_by_id) == [job.id for job in sorted(jobs, key=lambda j: j.id)]
+    assert jobs_by_id[3] == next(job for job in jobs if job.id == 3)
+    assert 3 in jobs_by_id
+    assert 100 not in jobs_by_id
+    with pytest.raises(KeyError):
+        jobs_by_id[100]
+
+    expected = {}
+    for job in jobs:
+        for skill in job.required_skills:
+            expected.setdefault(skill, []).append(job.id)
+    assert {skill: list(ids) for skill, ids in jobs_by_skills.items()} == {
+        skill: sorted(ids) for skill, ids in expected.items()
+    }
+    assert "COBOL" not in jobs_by_skills
+
+    index.close()
+
+
+def test_mapped_job_index_vocabulary(index_path):
+    vocabulary = SkillVocabulary()
+    index = MappedJobIndex(index_path, vocabulary=vocabulary)
+
+    job = index.jobs_by_id[1]
+    assert isinstance(job.required_skills, frozenset)
+    assert vocabulary.skills(job.required_skills) == {"RUBY", "SQL", "PROBLEM SOLVING"}
+    assert set(index.jobs_by_skills) == set(range(len(vocabulary)))
+
+    index.close()
+
+
+@pytest.mark.parametrize(
+    "service_class", [InMemoryRecommenderService, BitsetRecommenderService]
+)
+@pytest.mark.parametrize(
+    "options",
+    [{}, {"streaming": True}, {"job_chunk_size": 3}, {"min_percent": 50}],
+)
+def test_execute_with_mapped_job_index(index_path, service_class, options):
+    expected = InMemoryRecommenderService(
+        jobseekers=MockJobSeekerInput(job_seekers), jobs=MockJobInput(jobs), **options
+    ).execute()
+
+    index = MappedJobIndex(index_path)
+    results = service_class(
+        jobseekers=MockJobSeekerInput(job_seekers), jobs=index, **options
+    ).execute()
+
+    assert list(results) == list(expected)
+
+
+def test_write_job_index_rejects_large_ids(tmp_path):
+    with pytest.raises(ValueError):
+        write_job_index(
+            [Job(id=2**31, title="Too Big", required_skills={"SQL"})],
+            tmp_path / "jobs.idx",
+        )
+
+
+def test_mapped_job_index_rejects_other_files(tmp_path):
+    path = tmp_path / "jobs.idx"
+    path.write_bytes(b"id,title,required_skills\n" + b"\0" * 64)
+
+    with pytest.raises(ValueError):
+        MappedJobIndex(path)
+
+
+def make_get_jobs(calls):
+    def get_jobs():
+        calls.append(1)
+        return iter(jobs)
+
+    return get_jobs
+
+
+def test_job_index_cache_rebuilds_on_content_change(tmp_path):
+    jobs_path = tmp_path / "jobs.csv"
+    jobs_path.write_text("first")
+    cache = JobIndexCache(tmp_path / "cache")
+    calls = []
+
+    first = cache.get_index_path(jobs_path, make_get_jobs(calls))
+    assert cache.get_index_path(jobs_path, make_get_jobs(calls)) == first
+    assert len(calls) == 1
+    assert list(MappedJobIndex(first).jobs_by_id) == sorted(job.id for job in jobs)
+
+    # touching the file without changing it rehashes but reuses the entry
+    os.utime(jobs_path, ns=(0, 0))
+    assert cache.get_index_path(jobs_path, make_get_jobs(calls)) == first
+    assert len(calls) == 1
+
+    jobs_path.write_text("second")
+    second = cache.get_index_path(jobs_path, make_get_jobs(calls))
+    assert second != first
+    assert len(calls) == 2
+
+
+def test_job_index_cache_variants(tmp_path):
+    jobs_path = tmp_path / "jobs.csv"
+    jobs_path.write_text("first")
+    cache = JobIndexCache(tmp_path / "cache")
+    calls = []
+
+    plain = cache.get_index_path(jobs_path, make_get_jobs(calls))
+    aliased = cache.get_index_path(jobs_path, make_get_jobs(calls), "aliases")
+
+    assert aliased != plain
+    assert cache.get_index_path(jobs_path, make_get_jobs(calls), "aliases") == aliased
+    assert len(calls) == 2
+
+
+def test_job_index_cache_skips_hash_when_unchanged(tmp_path, monkeypatch):
+    jobs_path = tmp_path / "jobs.csv"
+    jobs_path.write_text("first")
+    cache = JobIndexCache(tmp_path / "cache")
+    digest = cache.get_digest(jobs_path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("jobs file was hashed again")
+
+    monkeypatch.setattr("hashlib.file_digest", fail)
+    assert cache.get_digest(jobs_path) == digest
+
+
+def test_job_index_cache_evicts_least_recently_used(tmp_path):
+    cache = JobIndexCache(tmp_path / "cache")
+    paths = []
+    for i in range(3):
+        jobs_path = tmp_path / f"jobs{i}.csv"
+        jobs_path.write_text(str(i))
+        paths.append(cache.get_index_path(jobs_path, lambda: iter(jobs)))
+        os.utime(paths[-1], ns=(i, i))
+
+    # use the oldest entry again so the middle one is evicted
+    os.utime(paths[0])
+    cache.max_bytes = 2 * paths[0].stat().st_size
+    cache.evict()
+
+    assert [path.exists() for path in paths] == [True, False, True]
+
+    # the entry just used is kept even when it alone exceeds the cap
+    cache.max_bytes = 1
+    cache.evict(keep=paths[0])
+    assert [path.exists() for path in paths] == [True, False, False]
+
+
+def rebuilt_indexes(jobs_by_id):
+    jobs_by_skills = {}
+    for job in jobs_by_id.values():
+        for skill in job.required_skills:
+            jobs_by_skills.setdefault(skill, set()).add(job.id)
+    return jobs_by_skills
+
+
+def test_job_index_apply_deltas():
+    job_index = JobIndex(jobs)
+    counts = job_index.apply_deltas(
+        [
+            JobDelta("add", Job(id=20, title="Go Developer", required_skills={"GO"})),
+            JobDelta("update", Job(id=1, title="Ruby Lead", required_skills={"RUBY"})),
+            JobDelta("delete", Job(id=2, title="")),
+        ]
+    )
+
+    assert counts == {"add": 1, "update": 1, "delete": 1}
+    jobs_by_id, jobs_by_skills = job_index.get_job_indexes()
+    assert jobs_by_id[20].title == "Go Developer"
+    assert jobs_by_id[1].required_skills == {"RUBY"}
+    assert 2 not in jobs_by_id
+    # also checks that emptied postings are dropped
+    assert jobs_by_skills == rebuilt_indexes(jobs_by_id)
+
+
+def test_job_index_rejects_invalid_deltas():
+    job_index = JobIndex(jobs)
+
+    with pytest.raises(ValueError):
+        job_index.add(Job(id=1, title="Duplicate"))
+    with pytest.raises(KeyError):
+        job_index.update(Job(id=100, title="Missing"))
+    with pytest.raises(KeyError):
+        job_index.delete(100)
+
+
+def test_job_index_write_and_execute(index_path, tmp_path):
+    mapped = MappedJobIndex(index_path)
+    job_index = JobIndex(mapped.get_jobs())
+    mapped.close()
+
+    delta = JobDelta("update", Job(id=5, title="ML Engineer", required_skills={"SQL"}))
+    job_index.apply_deltas([delta])
+    job_index.write(index_path)
+
+    updated_jobs = [delta.job if job.id == 5 else job for job in jobs]
+    expected = list(
+        InMemoryRecommenderService(
+            jobseekers=MockJobSeekerInput(job_seekers), jobs=MockJobInput(updated_jobs)
+        ).execute()
+    )
+
+    for job_input in (job_index, MappedJobIndex(index_path)):
+        results = InMemoryRecommenderService(
+            jobseekers=MockJobSeekerInput(job_seekers), jobs=job_input
+        ).execute()
+        assert list(results) == expected
+
+    assert [path.name for path in tmp_path.iterdir()] == ["jobs.idx"]
@@ -1,7 +1,20 @@
 import pytest
 from io import StringIO
 from unittest.mock import mock_open, patch
-from recommender.input import CSVJobInput, CSVJobSeekerInput
+from recommender.input import (
+    CSVJobDeltaInput,
+    CSVJobInput,
+    CSVJobMatchInput,
+    CSVJobSeekerDeltaInput,
+    CSVJobSeekerInput,
+    compile_skill_aliases,
+    parse_skills,
+    read_skill_aliases,
+    SkillAliases,
+)
+from recommender.compression import open_file
+from recommender.models import Job, JobDelta, JobSeeker, JobSeekerDelta
+from recommender.vocabulary import SkillVocabulary
 
 
 @pytest.fixture
@@ -221,3 +234,234 @@ def test_job_seekers_creation(mock_job_seekers_csv):
     assert job_seekers[1].id == 2
     assert job_seekers[1].name == "Bob"
     assert job_seekers[1].skills == {"PYTHON", "DATA ANALYSIS"}
+
+
+def test_job_and_job_seekers_share_vocabulary(mock_jobs_csv):
+    vocabulary = SkillVocabulary()
+    jobs = list(CSVJobInput("mock_jobs.csv", vocabulary=vocabulary).get_jobs())
+
+    assert jobs[0].required_skills == frozenset(
+        {vocabulary.get("PYTHON"), vocabulary.get("JAVA")}
+    )
+    assert vocabulary.skills(jobs[1].required_skills) == {
+        "PYTHON",
+        "MACHINE LEARNING",
+    }
+
+    seeker = JobSeeker(id=1, name="Alice", skills=vocabulary.intern_all(["JAVA"]))
+    assert seeker.skills & jobs[0].required_skills == {vocabulary.get("JAVA")}
+
+
+def test_job_seekers_read_twice(mock_job_seekers_csv):
+    seeker_input = CSVJobSeekerInput("mock_job_seekers.csv")
+
+    first = list(seeker_input.get_job_seekers())
+    second = list(seeker_input.get_job_seekers())
+
+    assert first == second
+
+
+def test_job_creation_column_order_and_blank_lines():
+    mock_data = (
+        "required_skills,id,title\n"
+        '"Python, Java",1,Software Engineer\n'
+        "\n"
+        '"Python",2,Data Scientist\n'
+    )
+
+    with patch("builtins.open", mock_open(read_data=mock_data)):
+        jobs = list(CSVJobInput("mock_jobs.csv").get_jobs())
+
+    assert [(job.id, job.title) for job in jobs] == [
+        (1, "Software Engineer"),
+        (2, "Data Scientist"),
+    ]
+    assert jobs[0].required_skills == {"PYTHON", "JAVA"}
+
+
+def test_job_creation_empty_file():
+    with patch("builtins.open", mock_open(read_data="")):
+        assert list(CSVJobInput("mock_jobs.csv").get_jobs()) == []
+
+
+def test_job_seekers_creation_missing_column():
+    mock_data = "id,name\n" "1,Alice\n"
+
+    with patch("builtins.open", mock_open(read_data=mock_data)):
+        with pytest.raises(KeyError):
+            list(CSVJobSeekerInput("mock_job_seekers.csv").get_job_seekers())
+
+
+@pytest.mark.parametrize(
+    "row",
+    [
+        # a title holding an unquoted comma
+        '1,Engineer, Senior,"Python"\n',
+        "1,Engineer\n",
+    ],
+)
+def test_job_creation_wrong_field_count(row):
+    mock_data = "id,title,required_skills\n" + row
+
+    with patch("builtins.open", mock_open(read_data=mock_data)):
+        with pytest.raises(ValueError):
+            list(CSVJobInput("mock_jobs.csv").get_jobs())
+
+
+def test_job_matches_creation_wrong_field_count():
+    mock_data = (
+        "jobseeker_id,jobseeker_name,job_id,job_title,"
+        "matching_skill_count,matching_skill_percent\n"
+        "1,Alice Seeker,1,Developer, Ruby,3,100\n"
+    )
+
+    with patch("builtins.open", mock_open(read_data=mock_data)):
+        with pytest.raises(ValueError):
+            list(CSVJobMatchInput("mock_output.csv").get_job_matches())
+
+
+def test_job_deltas_creation():
+    mock_data = (
+        "op,id,title,required_skills\n"
+        'add,10,Go Developer,"Go, SQL"\n'
+        'Update,1,Ruby Developer,"Ruby"\n'
+        "delete,2,,\n"
+    )
+
+    with patch("builtins.open", mock_open(read_data=mock_data)):
+        deltas = list(CSVJobDeltaInput("mock_deltas.csv").get_job_deltas())
+
+    assert deltas == [
+        JobDelta(
+            op="add",
+            job=Job(id=10, title="Go Developer", required_skills={"GO", "SQL"}),
+        ),
+        JobDelta(
+            op="update", job=Job(id=1, title="Ruby Developer", required_skills={"RUBY"})
+        ),
+        JobDelta(op="delete", job=Job(id=2, title="", required_skills=set())),
+    ]
+
+
+def test_job_deltas_creation_unknown_op():
+    mock_data = "op,id,title,required_skills\n" 'upsert,10,Go Developer,"Go"\n'
+
+    with patch("builtins.open", mock_open(read_data=mock_data)):
+        with pytest.raises(ValueError):
+            list(CSVJobDeltaInput("mock_deltas.csv").get_job_deltas())
+
+
+def test_job_seeker_deltas_creation():
+    mock_data = "op,id,name,skills\n" 'add,11,Kim Newcomer,"Go, SQL"\n' "delete,2,,\n"
+
+    with patch("builtins.open", mock_open(read_data=mock_data)):
+        deltas = list(CSVJobSeekerDeltaInput("mock_deltas.csv").get_job_seeker_deltas())
+
+    assert deltas == [
+        JobSeekerDelta(
+            op="add",
+            jobseeker=JobSeeker(id=11, name="Kim Newcomer", skills={"GO", "SQL"}),
+        ),
+        JobSeekerDelta(op="delete", jobseeker=JobSeeker(id=2, name="", skills=set())),
+    ]
+
+
+def test_job_matches_creation():
+    mock_data = (
+        "jobseeker_id,jobseeker_name,job_id,job_title,"
+        "matching_skill_count,matching_skill_percent\n"
+        "1,Alice Seeker,1,Ruby Developer,3,100\n"
+        "1,Alice Seeker,3,Backend Developer,2,50\n"
+    )
+
+    with patch("builtins.open", mock_open(read_data=mock_data)):
+        job_matches = list(CSVJobMatchInput("mock_output.csv").get_job_matches())
+
+    assert [
+        (m.jobseeker.id, m.jobseeker.name, m.job.id, m.job.title)
+        + (m.matching_skill_count, m.matching_skill_percent)
+        for m in job_matches
+    ] == [
+        (1, "Alice Seeker", 1, "Ruby Developer", 3, 100),
+        (1, "Alice Seeker", 3, "Backend Developer", 2, 50),
+    ]
+
+
+SKILL_ALIASES_CSV = (
+    "skill,aliases\n"
+    'JavaScript,"JS, Javascript, ECMAScript"\n'
+    'Python,"py, Python3"\n'
+)
+
+
+def test_read_skill_aliases():
+    with patch("builtins.open", mock_open(read_data=SKILL_ALIASES_CSV)):
+        aliases = read_skill_aliases("mock_aliases.csv")
+
+    assert aliases == {
+        "JS": "JAVASCRIPT",
+        "ECMASCRIPT": "JAVASCRIPT",
+        "PY": "PYTHON",
+        "PYTHON3": "PYTHON",
+    }
+
+
+@pytest.mark.parametrize(
+    "rows",
+    [
+        [("JavaScript", "JS"), ("Java", "js")],
+        [("JavaScript", "JS"), ("JS", "Javascript")],
+    ],
+)
+def test_compile_skill_aliases_conflicts(rows):
+    with pytest.raises(ValueError):
+        compile_skill_aliases(rows)
+
+
+def test_parse_skills_aliases():
+    aliases = SkillAliases({"JS": "JAVASCRIPT", "PY": "PYTHON"})
+
+    assert parse_skills("js, JavaScript, Py, SQL", aliases=aliases) == {
+        "JAVASCRIPT",
+        "PYTHON",
+        "SQL",
+    }
+
+    vocabulary = SkillVocabulary()
+    assert parse_skills("JS, Java", vocabulary, aliases) == frozenset(
+        {vocabulary.get("JAVASCRIPT"), vocabulary.get("JAVA")}
+    )
+    assert "JS" not in vocabulary
+    assert aliases[" JS"] == "JAVASCRIPT"
+
+
+def test_job_and_job_seekers_aliases():
+    aliases = {"JS": "JAVASCRIPT"}
+    jobs_data = "id,title,required_skills\n" '1,Frontend,"JavaScript, CSS"\n'
+    seekers_data = "id,name,skills\n" '1,Alice,"js, css"\n'
+
+    with patch("builtins.open", mock_open(read_data=jobs_data)):
+        (job,) = CSVJobInput("mock_jobs.csv", aliases=aliases).get_jobs()
+    with patch("builtins.open", mock_open(read_data=seekers_data)):
+        (seeker,) = CSVJobSeekerInput(
+            "mock_job_seekers.csv", aliases=aliases
+        ).get_job_seekers()
+
+    assert seeker.skills == job.required_skills == {"JAVASCRIPT", "CSS"}
+
+
+@pytest.mark.parametrize("suffix", [".gz", ".zst"])
+def test_job_seekers_creation_compressed(tmp_path, suffix):
+    if suffix == ".zst":
+        pytest.importorskip("zstandard")
+    path = tmp_path / f"jobseekers.csv{suffix}"
+    with open_file(path, "w") as f:
+        f.write('id,name,skills\n1,"Alice\nSeeker","Python, Java"\n2,Bob,Python\n')
+
+    job_seekers = list(CSVJobSeekerInput(path).get_job_seekers())
+
+    assert [(seeker.id, seeker.name) for seeker in job_seekers] == [
+        (1, "Alice\nSeeker"),
+        (2, "Bob"),
+    ]
+    assert job_seekers[0].skills == {"PYTHON", "JAVA"}
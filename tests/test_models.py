@@ -1,7 +1,7 @@
 import pytest
 from io import StringIO
 from unittest.mock import mock_open, patch, MagicMock
-from recommender.models import JobMatch, JobSeeker, Job
+from recommender.models import JobMatch, JobSeeker, Job, match_sort_key
 from recommender.input import CSVJobSeekerInput, CSVJobInput
 
 
@@ -288,3 +288,10 @@ def test_job_match_equality(mock_Alice, mock_pythondev):
     )
 
     assert match_a == match_b
+
+
+def test_job_match_sort_key(job_match_cases):
+    job_matches = list(job_match_cases.values())
+
+    assert job_match_cases["a_pc50_ji2"].sort_key == (1, -50, 2)
+    assert sorted(job_matches, key=match_sort_key) == sorted(job_matches)
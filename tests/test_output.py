@@ -0,0 +1,29 @@
+import pytest
+from io import StringIO
+from unittest.mock import MagicMock
+from recommender.output import SAMPLE_LINES, write_lines
+
+
+@pytest.mark.parametrize("flush_size", [1, 10, 64, 1024 * 1024])
+def test_write_lines(flush_size):
+    lines = [f"{i},row {i}" for i in range(SAMPLE_LINES * 3)]
+    f = StringIO()
+
+    assert write_lines(iter(lines), f, flush_size) == len(lines)
+    assert f.getvalue() == "".join(line + "\n" for line in lines)
+
+
+def test_write_lines_batches_writes():
+    lines = ["x" * 9] * 100  # 10 characters per line with the new line
+    f = MagicMock()
+
+    write_lines(lines, f, flush_size=250)
+
+    assert [len(c.args[0]) for c in f.write.call_args_list] == [250] * 4
+
+
+def test_write_lines_empty():
+    f = MagicMock()
+
+    assert write_lines([], f) == 0
+    f.write.assert_not_called()
@@ -0,0 +1,132 @@
+import csv
+import pytest
+from io import StringIO
+from recommender.constants import REVERSE_CSV_HEADERS
+from recommender.models import Job, JobSeeker
+from recommender.reverse import (
+    ReverseRecommenderService,
+    SeekerIndex,
+    format_job_candidates_as_csv,
+)
+from recommender.services import InMemoryRecommenderService
+from recommender.vocabulary import SkillVocabulary
+from .test_services import (
+    MockJobInput,
+    MockJobSeekerInput,
+    intern_jobs_and_seekers_with,
+    job_seekers,
+    jobs,
+)
+
+
+def expected_candidates(min_percent=None, min_count=None, top_k=None):
+    """Forward matches flipped to job centric rows and ranked per job."""
+    forward = InMemoryRecommenderService(
+        jobseekers=MockJobSeekerInput(job_seekers),
+        jobs=MockJobInput(jobs),
+        min_percent=min_percent,
+        min_count=min_count,
+        formatter=iter,
+    )
+    matches = sorted(
+        forward.execute(),
+        key=lambda m: (m.job.id, -m.matching_skill_percent, m.jobseeker.id),
+    )
+
+    rows = [",".join(REVERSE_CSV_HEADERS)]
+    per_job = {}
+    for m in matches:
+        per_job[m.job.id] = per_job.get(m.job.id, 0) + 1
+        if top_k is None or per_job[m.job.id] <= top_k:
+            rows.append(
+                f"{m.job.id},{m.job.title},{m.jobseeker.id},{m.jobseeker.name},"
+                f"{m.matching_skill_count},{m.matching_skill_percent}"
+            )
+
+    return rows
+
+
+def test_seeker_index():
+    seekers = SeekerIndex(job_seekers)
+
+    assert len(seekers) == len(job_seekers)
+    assert list(seekers.ids) == [seeker.id for seeker in job_seekers]
+    assert list(seekers.rows_by_skill["PYTHON"]) == [3, 5, 7]
+    assert seekers.count_overlaps({"PYTHON", "SQL", "UNKNOWN"}) == {
+        0: 1,
+        2: 1,
+        3: 1,
+        5: 2,
+        7: 1,
+    }
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"top_k": 1},
+        {"top_k": 3},
+        {"min_percent": 50},
+        {"min_count": 2},
+        {"min_percent": 34, "min_count": 2, "top_k": 2},
+    ],
+)
+def test_execute_matches_flipped_forward(options):
+    service = ReverseRecommenderService(
+        jobseekers=MockJobSeekerInput(job_seekers),
+        jobs=MockJobInput(list(reversed(jobs))),
+        **options,
+    )
+
+    assert list(service.execute()) == expected_candidates(**options)
+
+
+def test_execute_interned_skills():
+    interned_jobs, interned_seekers = intern_jobs_and_seekers_with(SkillVocabulary())
+    service = ReverseRecommenderService(
+        jobseekers=MockJobSeekerInput(interned_seekers),
+        jobs=MockJobInput(interned_jobs),
+    )
+
+    assert list(service.execute()) == expected_candidates()
+
+
+def test_execute_streams_per_job():
+    service = ReverseRecommenderService(
+        jobseekers=MockJobSeekerInput(job_seekers),
+        jobs=MockJobInput(jobs + [Job(11, "No Skills")]),
+        formatter=iter,
+    )
+    results = service.execute()
+
+    first = next(results)
+    assert first.job.id == 1
+    assert (first.jobseeker.id, first.matching_skill_percent) == (1, 100)
+    assert all(match.job.id != 11 for match in results)
+
+
+def test_format_job_candidates_as_csv():
+    service = ReverseRecommenderService(
+        jobseekers=MockJobSeekerInput(job_seekers[:1]),
+        jobs=MockJobInput(jobs[:1]),
+        formatter=list,
+    )
+
+    assert list(format_job_candidates_as_csv(service.execute())) == [
+        "job_id,job_title,jobseeker_id,jobseeker_name,"
+        "matching_skill_count,matching_skill_percent",
+        "1,Ruby Developer,1,Alice Seeker,3,100",
+    ]
+
+
+def test_format_job_candidates_as_csv_quotes_fields():
+    service = ReverseRecommenderService(
+        jobseekers=MockJobSeekerInput([JobSeeker(1, 'Ann "The Dev", Jr', {"RUBY"})]),
+        jobs=MockJobInput([Job(2, "Dev\nOps, Ruby", {"RUBY"})]),
+        formatter=format_job_candidates_as_csv,
+    )
+
+    rows = list(csv.reader(StringIO("\n".join(service.execute()))))
+
+    assert rows[1] == ["2", "Dev\nOps, Ruby", "1", 'Ann "The Dev", Jr', "1", "100"]
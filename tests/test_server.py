@@ -0,0 +1,173 @@
+import asyncio
+import orjson
+import pytest
+from recommender.index import MappedJobIndex, write_job_index
+from recommender.models import JobSeeker
+from recommender.server import BadRequest, RecommendationServer
+from recommender.services import (
+    BitsetRecommenderService,
+    InMemoryRecommenderService,
+    Recommender,
+)
+from recommender.vocabulary import SkillVocabulary
+from .test_services import MockJobInput, MockJobSeekerInput, job_seekers, jobs
+
+
+def get_server(service_class=InMemoryRecommenderService, **options):
+    return RecommendationServer(
+        Recommender(service_class(jobseekers=None, jobs=MockJobInput(jobs), **options))
+    )
+
+
+def expected_matches(seeker, **options):
+    """Rows of one jobseeker from a full run over the same jobs."""
+    return [
+        {
+            "job_id": m.job.id,
+            "job_title": m.job.title,
+            "matching_skill_count": m.matching_skill_count,
+            "matching_skill_percent": m.matching_skill_percent,
+        }
+        for m in InMemoryRecommenderService(
+            jobseekers=MockJobSeekerInput([seeker]),
+            jobs=MockJobInput(jobs),
+            formatter=list,
+            **options,
+        ).execute()
+    ]
+
+
+@pytest.mark.parametrize(
+    "service_class", [InMemoryRecommenderService, BitsetRecommenderService]
+)
+@pytest.mark.parametrize("options", [{}, {"top_k": 2}, {"min_percent": 50}])
+def test_recommend_matches_service_ranking(service_class, options):
+    server = get_server(service_class, **options)
+
+    for seeker in job_seekers:
+        response = server.recommend(
+            {"id": seeker.id, "name": seeker.name, "skills": sorted(seeker.skills)}
+        )
+        assert response == {
+            "jobseeker_id": seeker.id,
+            "matches": expected_matches(seeker, **options),
+        }
+
+
+def test_recommend_with_vocabulary(tmp_path):
+    index_path = tmp_path / "jobs.idx"
+    write_job_index(jobs, index_path)
+    vocabulary = SkillVocabulary()
+    server = RecommendationServer(
+        Recommender(
+            InMemoryRecommenderService(
+                jobseekers=None, jobs=MappedJobIndex(index_path, vocabulary=vocabulary)
+            ),
+            vocabulary=vocabulary,
+        )
+    )
+    skill_count = len(vocabulary)
+
+    response = server.recommend(
+        {"id": 1, "skills": "ruby, sql, problem solving, cobol"}
+    )
+
+    seeker = JobSeeker(1, "", {"RUBY", "SQL", "PROBLEM SOLVING"})
+    assert response["matches"] == expected_matches(seeker)
+    # unknown skills are dropped instead of interned
+    assert len(vocabulary) == skill_count
+
+
+def test_recommend_batch():
+    server = get_server(top_k=2)
+
+    response = server.recommend_batch(
+        {
+            "jobseekers": [
+                {"id": seeker.id, "name": seeker.name, "skills": list(seeker.skills)}
+                for seeker in job_seekers
+            ]
+        }
+    )
+
+    assert response == {
+        "results": [
+            {"jobseeker_id": seeker.id, "matches": expected_matches(seeker, top_k=2)}
+            for seeker in job_seekers
+        ]
+    }
+
+
+@pytest.mark.parametrize("payload", [[], {}, {"jobseekers": [{"skills": 1}]}])
+def test_recommend_batch_bad_payload(payload):
+    with pytest.raises(BadRequest):
+        get_server().recommend_batch(payload)
+
+
+@pytest.mark.parametrize(
+    "payload", [[], {"skills": 1}, {"skills": ["SQL", 1]}, {"skills": "SQL", "id": "1"}]
+)
+def test_recommend_bad_payload(payload):
+    with pytest.raises(BadRequest):
+        get_server().recommend(payload)
+
+
+async def request(reader, writer, method, path, body=b"", headers=""):
+    head = f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n{headers}\r\n"
+    writer.write(head.encode() + body)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) != b"\r\n":
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+
+    return status, orjson.loads(await reader.readexactly(length))
+
+
+@pytest.mark.parametrize("unix", [False, True], ids=["tcp", "unix"])
+def test_server_over_socket(tmp_path, unix):
+    server = get_server()
+    seeker = job_seekers[0]
+
+    async def run():
+        if unix:
+            socket_path = tmp_path / "recommender.sock"
+            listener = await server.start(unix_socket=socket_path)
+            reader, writer = await asyncio.open_unix_connection(socket_path)
+        else:
+            listener = await server.start(port=0)
+            port = listener.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+        async with listener:
+            body = orjson.dumps({"id": seeker.id, "skills": list(seeker.skills)})
+            # several requests over the same kept alive connection
+            for _ in range(3):
+                assert await request(reader, writer, "POST", "/recommend", body) == (
+                    200,
+                    {"jobseeker_id": seeker.id, "matches": expected_matches(seeker)},
+                )
+
+            batch = orjson.dumps({"jobseekers": [{"skills": list(seeker.skills)}]})
+            assert await request(reader, writer, "POST", "/recommend/batch", batch) == (
+                200,
+                {"results": [{"jobseeker_id": 0, "matches": expected_matches(seeker)}]},
+            )
+            assert await request(reader, writer, "GET", "/health") == (
+                200,
+                {"status": "ok", "jobs": len(jobs)},
+            )
+            assert (await request(reader, writer, "GET", "/recommend"))[0] == 405
+            assert (await request(reader, writer, "GET", "/missing"))[0] == 404
+
+            status, response = await request(
+                reader, writer, "POST", "/recommend", b"{", "Connection: close\r\n"
+            )
+            assert status == 400
+            assert await reader.read() == b""
+            writer.close()
+
+    asyncio.run(run())
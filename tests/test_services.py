@@ -1,11 +1,19 @@
 import pytest
 from recommender.services import (
+    BitsetRecommenderService,
     InMemoryRecommenderService,
+    Recommender,
     format_job_matches_as_csv,
+    format_job_matches_as_ndjson,
+    get_job_match_columns,
+    get_matching_percentage,
 )
 import csv
+import orjson
+from recommender.constants import CSV_HEADERS
 from io import StringIO
 from recommender.models import Job, JobSeeker
+from recommender.vocabulary import SkillVocabulary
 
 
 # Sample data
@@ -198,3 +206,520 @@ def test_execute(in_memory_recommender_service):
         prev_job_seeker = int(fields[JOB_SEEKER_ID_FIELD])
         prev_percent = int(fields[MATCHING_SKILL_PERCENT_FIELD])
         prev_job_id = int(fields[JOB_ID_FIELD])
+
+
+def test_execute_streaming_presorted(in_memory_recommender_service):
+    expected = list(in_memory_recommender_service.execute())
+
+    streaming_service = InMemoryRecommenderService(
+        jobseekers=MockJobSeekerInput(job_seekers),
+        jobs=MockJobInput(jobs),
+        streaming=True,
+        presorted=True,
+    )
+
+    assert list(streaming_service.execute()) == expected
+
+
+def test_execute_streaming_unsorted_falls_back(in_memory_recommender_service):
+    expected = list(in_memory_recommender_service.execute())
+
+    streaming_service = InMemoryRecommenderService(
+        jobseekers=MockJobSeekerInput(list(reversed(job_seekers))),
+        jobs=MockJobInput(jobs),
+        streaming=True,
+    )
+
+    assert list(streaming_service.execute()) == expected
+
+
+def test_execute_streaming_presorted_out_of_order():
+    streaming_service = InMemoryRecommenderService(
+        jobseekers=MockJobSeekerInput(list(reversed(job_seekers))),
+        jobs=MockJobInput(jobs),
+        streaming=True,
+        presorted=True,
+    )
+
+    with pytest.raises(ValueError) as excinfo:
+        list(streaming_service.execute())
+
+    assert "Jobseekers are not sorted by id" == str(excinfo.value)
+
+
+def test_execute_external_sort(in_memory_recommender_service, tmp_path):
+    expected = list(in_memory_recommender_service.execute())
+
+    external_service = InMemoryRecommenderService(
+        jobseekers=MockJobSeekerInput(list(reversed(job_seekers))),
+        jobs=MockJobInput(jobs),
+        max_matches_in_memory=5,
+        tmp_dir=tmp_path,
+    )
+
+    assert list(external_service.execute()) == expected
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_execute_interned_skills(in_memory_recommender_service):
+    expected = list(in_memory_recommender_service.execute())
+
+    interned_jobs, interned_seekers = intern_jobs_and_seekers()
+    interned_service = InMemoryRecommenderService(
+        jobseekers=MockJobSeekerInput(interned_seekers),
+        jobs=MockJobInput(interned_jobs),
+    )
+
+    assert list(interned_service.execute()) == expected
+
+
+def intern_jobs_and_seekers():
+    return intern_jobs_and_seekers_with(SkillVocabulary())
+
+
+def intern_jobs_and_seekers_with(vocabulary):
+    interned_jobs = [
+        Job(j.id, j.title, vocabulary.intern_all(j.required_skills)) for j in jobs
+    ]
+    interned_seekers = [
+        JobSeeker(s.id, s.name, vocabulary.intern_all(s.skills)) for s in job_seekers
+    ]
+    return interned_jobs, interned_seekers
+
+
+def as_match_tuples(matches):
+    return sorted(
+        (m.jobseeker.id, m.job.id, m.matching_skill_count, m.matching_skill_percent)
+        for m in matches
+    )
+
+
+@pytest.mark.parametrize("interned", [False, True], ids=["names", "interned"])
+def test_bitset_job_matches_equivalent(in_memory_recommender_service, interned):
+    bitset_jobs, bitset_seekers = (
+        intern_jobs_and_seekers() if interned else (jobs, job_seekers)
+    )
+    bitset_service = BitsetRecommenderService(
+        jobseekers=MockJobSeekerInput(bitset_seekers), jobs=MockJobInput(bitset_jobs)
+    )
+
+    jobs_by_id, jobs_by_skills = in_memory_recommender_service._get_job_indexes()
+    bitset_jobs_by_id, bitset_jobs_by_skills = bitset_service._get_job_indexes()
+
+    for seeker, bitset_seeker in zip(job_seekers, bitset_seekers):
+        expected = in_memory_recommender_service._get_job_matches(
+            seeker, jobs_by_skills, jobs_by_id
+        )
+        result = bitset_service._get_job_matches(
+            bitset_seeker, bitset_jobs_by_skills, bitset_jobs_by_id
+        )
+
+        assert as_match_tuples(result) == as_match_tuples(expected)
+
+
+def test_bitset_execute(in_memory_recommender_service):
+    bitset_service = BitsetRecommenderService(
+        jobseekers=MockJobSeekerInput(job_seekers), jobs=MockJobInput(jobs)
+    )
+
+    assert list(bitset_service.execute()) == list(
+        in_memory_recommender_service.execute()
+    )
+
+
+@pytest.mark.parametrize(
+    "service_class", [InMemoryRecommenderService, BitsetRecommenderService]
+)
+@pytest.mark.parametrize("streaming", [False, True])
+def test_execute_parallel(in_memory_recommender_service, service_class, streaming):
+    parallel_service = service_class(
+        jobseekers=MockJobSeekerInput(job_seekers),
+        jobs=MockJobInput(jobs),
+        streaming=streaming,
+        presorted=streaming,
+        workers=2,
+        worker_chunk_size=3,
+    )
+
+    assert list(parallel_service.execute()) == list(
+        in_memory_recommender_service.execute()
+    )
+
+
+@pytest.mark.parametrize(
+    "service_class", [InMemoryRecommenderService, BitsetRecommenderService]
+)
+@pytest.mark.parametrize("presorted", [False, True])
+@pytest.mark.parametrize("top_k", [None, 1, 2])
+def test_execute_job_chunks(
+    in_memory_recommender_service, service_class, presorted, top_k, tmp_path
+):
+    chunked_service = service_class(
+        jobseekers=MockJobSeekerInput(job_seekers),
+        jobs=MockJobInput(jobs),
+        presorted=presorted,
+        max_matches_in_memory=7,
+        tmp_dir=tmp_path,
+        job_chunk_size=3,
+        top_k=top_k,
+    )
+
+    expected = list(in_memory_recommender_service.execute())
+    if top_k is not None:
+        expected = expected_top_k(expected, top_k)
+    assert list(chunked_service.execute()) == expected
+    assert list(tmp_path.iterdir()) == []
+
+
+def expected_top_k(rows, k):
+    kept = []
+    per_seeker = {}
+    for row in rows[1:]:
+        seeker_id = row.split(",")[0]
+        per_seeker[seeker_id] = per_seeker.get(seeker_id, 0) + 1
+        if per_seeker[seeker_id] <= k:
+            kept.append(row)
+
+    return rows[:1] + kept
+
+
+@pytest.mark.parametrize(
+    "service_class", [InMemoryRecommenderService, BitsetRecommenderService]
+)
+@pytest.mark.parametrize("top_k", [1, 2, 5])
+def test_execute_top_k(in_memory_recommender_service, service_class, top_k):
+    top_k_service = service_class(
+        jobseekers=MockJobSeekerInput(job_seekers),
+        jobs=MockJobInput(jobs),
+        top_k=top_k,
+    )
+
+    expected = expected_top_k(list(in_memory_recommender_service.execute()), top_k)
+    assert list(top_k_service.execute()) == expected
+
+
+def expected_thresholds(rows, min_percent, min_count):
+    COUNT_FIELD = 4
+    PERCENT_FIELD = 5
+
+    return rows[:1] + [
+        row
+        for row in rows[1:]
+        if int(row.split(",")[PERCENT_FIELD]) >= (min_percent or 0)
+        and int(row.split(",")[COUNT_FIELD]) >= (min_count or 0)
+    ]
+
+
+@pytest.mark.parametrize(
+    "service_class", [InMemoryRecommenderService, BitsetRecommenderService]
+)
+@pytest.mark.parametrize(
+    "min_percent, min_count",
+    [(50, None), (None, 2), (33, 2), (100, None), (26, 3)],
+)
+def test_execute_thresholds(
+    in_memory_recommender_service, service_class, min_percent, min_count
+):
+    threshold_service = service_class(
+        jobseekers=MockJobSeekerInput(job_seekers),
+        jobs=MockJobInput(jobs),
+        min_percent=min_percent,
+        min_count=min_count,
+    )
+
+    expected = expected_thresholds(
+        list(in_memory_recommender_service.execute()), min_percent, min_count
+    )
+    assert list(threshold_service.execute()) == expected
+
+
+@pytest.mark.parametrize("min_percent", [1, 10, 25, 29, 33, 34, 50, 66, 67, 99, 100])
+def test_get_max_required_count(min_percent):
+    service = InMemoryRecommenderService(
+        jobseekers=MockJobSeekerInput([]),
+        jobs=MockJobInput([]),
+        min_percent=min_percent,
+    )
+
+    for skill_count in range(1, 30):
+        reachable = [
+            required_count
+            for required_count in range(1, 3000)
+            if get_matching_percentage(min(skill_count, required_count), required_count)
+            >= min_percent
+        ]
+
+        assert service._get_max_required_count(skill_count) == max(reachable)
+
+
+class MockJobMatchInput:
+    def __init__(self, job_matches):
+        self._job_matches = job_matches
+
+    def get_job_matches(self):
+        return iter(self._job_matches)
+
+
+def changed_jobs_and_seekers():
+    new_jobs = [
+        Job(1, "Ruby Developer", {"RUBY", "GO"}) if job.id == 1 else job
+        for job in jobs
+        if job.id != 7
+    ] + [Job(11, "Go Developer", {"GO"})]
+    new_job_seekers = [
+        JobSeeker(3, "Charlie Jobhunter", {"PYTHON"}) if seeker.id == 3 else seeker
+        for seeker in job_seekers
+        if seeker.id != 5
+    ] + [JobSeeker(11, "Kim Newcomer", {"GO", "SQL"})]
+
+    return new_jobs, new_job_seekers
+
+
+@pytest.mark.parametrize(
+    "service_class", [InMemoryRecommenderService, BitsetRecommenderService]
+)
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"top_k": 1},
+        {"top_k": 2},
+        {"min_percent": 50},
+        {"max_matches_in_memory": 2},
+    ],
+)
+def test_execute_incremental(service_class, options):
+    previous = service_class(
+        jobseekers=MockJobSeekerInput(job_seekers),
+        jobs=MockJobInput(jobs),
+        formatter=list,
+        **options,
+    ).execute()
+    new_jobs, new_job_seekers = changed_jobs_and_seekers()
+
+    expected = service_class(
+        jobseekers=MockJobSeekerInput(new_job_seekers),
+        jobs=MockJobInput(new_jobs),
+        **options,
+    ).execute()
+    incremental = service_class(
+        jobseekers=MockJobSeekerInput(new_job_seekers),
+        jobs=MockJobInput(new_jobs),
+        previous_matches=MockJobMatchInput(previous),
+        changed_jobseeker_ids=[3, 5, 11],
+        changed_job_ids=[1, 7, 11],
+        **options,
+    ).execute()
+
+    assert list(incremental) == list(expected)
+
+
+class CountingJobMatchInput(MockJobMatchInput):
+    reads = 0
+
+    def get_job_matches(self):
+        self.reads += 1
+        return super().get_job_matches()
+
+
+def test_execute_incremental_reads_previous_matches_once():
+    previous = InMemoryRecommenderService(
+        jobseekers=MockJobSeekerInput(job_seekers),
+        jobs=MockJobInput(jobs),
+        formatter=list,
+        top_k=1,
+    ).execute()
+    previous_matches = CountingJobMatchInput(previous)
+    new_jobs, new_job_seekers = changed_jobs_and_seekers()
+
+    incremental = InMemoryRecommenderService(
+        jobseekers=MockJobSeekerInput(new_job_seekers),
+        jobs=MockJobInput(new_jobs),
+        previous_matches=previous_matches,
+        changed_jobseeker_ids=[3, 5, 11],
+        changed_job_ids=[1, 7, 11],
+        formatter=list,
+        top_k=1,
+    ).execute()
+
+    assert (
+        incremental
+        == InMemoryRecommenderService(
+            jobseekers=MockJobSeekerInput(new_job_seekers),
+            jobs=MockJobInput(new_jobs),
+            formatter=list,
+            top_k=1,
+        ).execute()
+    )
+    assert previous_matches.reads == 1
+
+
+def test_execute_incremental_only_matches_affected(monkeypatch):
+    previous = InMemoryRecommenderService(
+        jobseekers=MockJobSeekerInput(job_seekers),
+        jobs=MockJobInput(jobs),
+        formatter=list,
+    ).execute()
+    matched = []
+    match_job_seekers = InMemoryRecommenderService._match_job_seekers
+
+    def spy(self, job_seekers, *args):
+        for seeker, job_matches in match_job_seekers(self, job_seekers, *args):
+            matched.append(seeker.id)
+            yield seeker, job_matches
+
+    monkeypatch.setattr(InMemoryRecommenderService, "_match_job_seekers", spy)
+    new_jobs = [Job(11, "Go Developer", {"GO", "CLOUD COMPUTING"})] + jobs
+    results = InMemoryRecommenderService(
+        jobseekers=MockJobSeekerInput(job_seekers),
+        jobs=MockJobInput(new_jobs),
+        previous_matches=MockJobMatchInput(previous),
+        changed_job_ids=[11],
+        formatter=list,
+    ).execute()
+
+    # only Eddie has Cloud Computing
+    assert matched == [5]
+    assert as_match_tuples(results) == sorted(
+        as_match_tuples(previous) + [(5, 11, 1, 50)]
+    )
+
+
+@pytest.mark.parametrize(
+    "service_class", [InMemoryRecommenderService, BitsetRecommenderService]
+)
+@pytest.mark.parametrize("options", [{}, {"top_k": 2}, {"min_percent": 50}])
+def test_recommender_matches_execute(service_class, options):
+    expected = {}
+    for job_match in InMemoryRecommenderService(
+        jobseekers=MockJobSeekerInput(job_seekers),
+        jobs=MockJobInput(jobs),
+        formatter=list,
+        **options,
+    ).execute():
+        expected.setdefault(job_match.jobseeker.id, []).append(job_match)
+
+    recommender = Recommender(
+        service_class(jobseekers=None, jobs=MockJobInput(jobs), **options)
+    )
+
+    for seeker in job_seekers:
+        assert recommender.recommend(seeker) == expected.get(seeker.id, [])
+    assert recommender.recommend_many(job_seekers) == [
+        expected.get(seeker.id, []) for seeker in job_seekers
+    ]
+
+
+@pytest.mark.parametrize("interned", [False, True], ids=["names", "interned"])
+def test_recommender_get_job_seekers(interned):
+    if interned:
+        vocabulary = SkillVocabulary()
+        recommender_jobs, _ = intern_jobs_and_seekers_with(vocabulary)
+    else:
+        vocabulary = None
+        recommender_jobs = jobs
+    recommender = Recommender(
+        InMemoryRecommenderService(
+            jobseekers=None, jobs=MockJobInput(recommender_jobs)
+        ),
+        vocabulary=vocabulary,
+    )
+    skill_count = vocabulary and len(vocabulary)
+
+    alice, bob = recommender.get_job_seekers(
+        [
+            (1, "Alice", " ruby,SQL , Cobol"),
+            (2, "Bob", ["Ruby", "Underwater Basket Weaving"]),
+        ]
+    )
+
+    expected = {"RUBY", "SQL"}
+    if interned:
+        assert vocabulary.skills(alice.skills) == expected
+        assert vocabulary.skills(bob.skills) == {"RUBY"}
+        assert len(vocabulary) == skill_count
+    else:
+        assert alice.skills == expected
+        assert bob.skills == {"RUBY"}
+    assert (alice.id, alice.name, bob.id, bob.name) == (1, "Alice", 2, "Bob")
+    assert recommender.recommend(alice) == recommender.recommend(
+        JobSeeker(1, "Alice", alice.skills | {"NOT A JOB SKILL"})
+    )
+
+
+def test_recommender_get_job_seekers_aliases():
+    recommender = Recommender(
+        InMemoryRecommenderService(jobseekers=None, jobs=MockJobInput(jobs)),
+        aliases={"RB": "RUBY", "JS": "JAVASCRIPT"},
+    )
+
+    (alice,) = recommender.get_job_seekers([(1, "Alice", "rb, js, Cobol")])
+
+    assert alice.skills == {"RUBY", "JAVASCRIPT"}
+
+
+def test_get_job_match_columns(in_memory_recommender_service):
+    in_memory_recommender_service.formatter = list
+    matches = in_memory_recommender_service.execute()
+    batches = list(get_job_match_columns(matches, batch_size=20))
+
+    assert [len(batch["job_id"]) for batch in batches] == [20, 20, 9]
+    assert list(batches[0]) == CSV_HEADERS
+    assert batches[0]["jobseeker_name"][0] == matches[0].jobseeker.name
+    assert sum((batch["job_id"] for batch in batches), ()) == tuple(
+        match.job.id for match in matches
+    )
+
+
+def test_format_job_matches_as_ndjson(in_memory_recommender_service):
+    in_memory_recommender_service.formatter = format_job_matches_as_ndjson
+    lines = b"".join(in_memory_recommender_service.execute()).splitlines()
+
+    in_memory_recommender_service.formatter = format_job_matches_as_csv
+    rows = list(csv.reader(in_memory_recommender_service.execute()))
+
+    assert [list(map(str, orjson.loads(line).values())) for line in lines] == rows[1:]
+    assert list(orjson.loads(lines[0])) == CSV_HEADERS
+
+
+def test_format_job_matches_as_ndjson_escapes_strings():
+    seeker = JobSeeker(1, 'Ann "The Dev", \\ Jr', {"RUBY"})
+    job = Job(2, "Dev\nOps, Ruby", {"RUBY"})
+    service = InMemoryRecommenderService(
+        jobseekers=MockJobSeekerInput([seeker]),
+        jobs=MockJobInput([job]),
+        formatter=format_job_matches_as_ndjson,
+    )
+
+    (chunk,) = service.execute()
+
+    assert chunk.count(b"\n") == 1
+    assert orjson.loads(chunk) == {
+        "jobseeker_id": 1,
+        "jobseeker_name": seeker.name,
+        "job_id": 2,
+        "job_title": job.title,
+        "matching_skill_count": 1,
+        "matching_skill_percent": 100,
+    }
+
+
+def test_format_job_matches_as_csv_quotes_fields():
+    seekers = [
+        JobSeeker(1, 'Ann "The Dev", Jr', {"RUBY", "SQL"}),
+        JobSeeker(2, "Bob Applicant", {"RUBY"}),
+    ]
+    jobs_ = [Job(2, "Dev\nOps, Ruby", {"RUBY"}), Job(3, "SQL Developer", {"SQL"})]
+    service = InMemoryRecommenderService(
+        jobseekers=MockJobSeekerInput(seekers),
+        jobs=MockJobInput(jobs_),
+        formatter=format_job_matches_as_csv,
+    )
+
+    rows = list(csv.reader(StringIO("\n".join(service.execute()))))
+
+    assert rows[1:] == [
+        ["1", seekers[0].name, "2", jobs_[0].title, "1", "100"],
+        ["1", seekers[0].name, "3", "SQL Developer", "1", "100"],
+        ["2", "Bob Applicant", "2", jobs_[0].title, "1", "100"],
+    ]
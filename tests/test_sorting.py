@@ -0,0 +1,83 @@
+import pytest
+import random
+from recommender.models import Job, JobMatch, JobSeeker
+from recommender.sorting import ExternalMatchSorter, match_to_row, row_to_match
+
+
+def make_job_matches(count):
+    rng = random.Random(42)
+    return [
+        JobMatch(
+            jobseeker=JobSeeker(id=rng.randint(1, 50), name="Seeker"),
+            job=Job(id=job_id, title="Job"),
+            matching_skill_count=rng.randint(1, 5),
+            matching_skill_percent=rng.choice([25, 33, 50, 66, 75, 100]),
+        )
+        for job_id in range(count)
+    ]
+
+
+def test_row_round_trip():
+    job_match = JobMatch(
+        jobseeker=JobSeeker(id=1, name="Alice Seeker"),
+        job=Job(id=3, title="Backend Developer"),
+        matching_skill_count=2,
+        matching_skill_percent=50,
+    )
+
+    restored = row_to_match(match_to_row(job_match))
+
+    assert restored == job_match
+    assert restored.jobseeker.name == "Alice Seeker"
+    assert restored.job.title == "Backend Developer"
+    assert restored.matching_skill_count == 2
+
+
+def test_external_sorter_in_memory():
+    job_matches = make_job_matches(100)
+
+    sorter = ExternalMatchSorter()
+    sorter.extend(job_matches)
+
+    assert list(sorter) == sorted(job_matches)
+    assert sorter._runs == []
+
+
+def test_external_sorter_spills_runs():
+    job_matches = make_job_matches(1000)
+
+    sorter = ExternalMatchSorter(run_size=64)
+    sorter.extend(job_matches)
+
+    assert len(sorter._runs) == 1000 // 64
+    assert list(sorter) == sorted(job_matches)
+    assert sorter._tmp_dir is None
+
+
+def test_external_sorter_bounded_fan_in():
+    job_matches = make_job_matches(1000)
+
+    sorter = ExternalMatchSorter(run_size=10, fan_in=4)
+    sorter.extend(job_matches)
+    assert len(sorter._runs) == 100
+
+    assert list(sorter) == sorted(job_matches)
+
+
+def test_external_sorter_invalid_settings():
+    with pytest.raises(ValueError):
+        ExternalMatchSorter(run_size=0)
+
+    with pytest.raises(ValueError):
+        ExternalMatchSorter(fan_in=1)
+
+
+def test_external_sorter_add_run():
+    job_matches = make_job_matches(300)
+
+    sorter = ExternalMatchSorter(run_size=50)
+    sorter.add_run(sorted(job_matches[:100]))
+    sorter.add_run(sorted(job_matches[100:200]))
+    sorter.extend(job_matches[200:])
+
+    assert list(sorter) == sorted(job_matches)
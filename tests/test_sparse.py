@@ -0,0 +1,118 @@
+import pytest
+
+pytest.importorskip("scipy")
+
+from recommender.services import InMemoryRecommenderService, Recommender  # noqa: E402
+from recommender.sparse import SparseRecommenderService  # noqa: E402
+from .test_services import (  # noqa: E402
+    MockJobInput,
+    MockJobSeekerInput,
+    as_match_tuples,
+    intern_jobs_and_seekers,
+    job_seekers,
+    jobs,
+)
+
+
+@pytest.fixture
+def in_memory_recommender_service():
+    return InMemoryRecommenderService(
+        jobseekers=MockJobSeekerInput(job_seekers), jobs=MockJobInput(jobs)
+    )
+
+
+@pytest.mark.parametrize("interned", [False, True], ids=["names", "interned"])
+def test_sparse_job_matches_equivalent(in_memory_recommender_service, interned):
+    sparse_jobs, sparse_seekers = (
+        intern_jobs_and_seekers() if interned else (jobs, job_seekers)
+    )
+    sparse_service = SparseRecommenderService(
+        jobseekers=MockJobSeekerInput(sparse_seekers),
+        jobs=MockJobInput(sparse_jobs),
+        chunk_size=3,
+    )
+
+    jobs_by_id, jobs_by_skills = in_memory_recommender_service._get_job_indexes()
+    sparse_jobs_by_id, sparse_jobs_by_skills = sparse_service._get_job_indexes()
+
+    results = {
+        seeker.id: job_matches
+        for seeker, job_matches in sparse_service._match_job_seekers(
+            sparse_seekers, sparse_jobs_by_skills, sparse_jobs_by_id
+        )
+    }
+    assert len(results) == len(job_seekers)
+
+    for seeker, sparse_seeker in zip(job_seekers, sparse_seekers):
+        expected = in_memory_recommender_service._get_job_matches(
+            seeker, jobs_by_skills, jobs_by_id
+        )
+        single = sparse_service._get_job_matches(
+            sparse_seeker, sparse_jobs_by_skills, sparse_jobs_by_id
+        )
+
+        assert as_match_tuples(results[seeker.id]) == as_match_tuples(expected)
+        assert as_match_tuples(single) == as_match_tuples(expected)
+
+
+def test_sparse_execute(in_memory_recommender_service):
+    sparse_service = SparseRecommenderService(
+        jobseekers=MockJobSeekerInput(job_seekers),
+        jobs=MockJobInput(jobs),
+        chunk_size=4,
+    )
+
+    assert list(sparse_service.execute()) == list(
+        in_memory_recommender_service.execute()
+    )
+
+
+def test_sparse_execute_parallel(in_memory_recommender_service):
+    sparse_service = SparseRecommenderService(
+        jobseekers=MockJobSeekerInput(job_seekers),
+        jobs=MockJobInput(jobs),
+        chunk_size=2,
+        workers=2,
+        worker_chunk_size=4,
+    )
+
+    assert list(sparse_service.execute()) == list(
+        in_memory_recommender_service.execute()
+    )
+
+
+def test_sparse_execute_job_chunks(in_memory_recommender_service):
+    sparse_service = SparseRecommenderService(
+        jobseekers=MockJobSeekerInput(job_seekers),
+        jobs=MockJobInput(jobs),
+        chunk_size=4,
+        job_chunk_size=3,
+    )
+
+    assert list(sparse_service.execute()) == list(
+        in_memory_recommender_service.execute()
+    )
+
+
+def test_sparse_execute_top_k(in_memory_recommender_service):
+    sparse_service = SparseRecommenderService(
+        jobseekers=MockJobSeekerInput(job_seekers), jobs=MockJobInput(jobs), top_k=2
+    )
+    top_k_service = InMemoryRecommenderService(
+        jobseekers=MockJobSeekerInput(job_seekers), jobs=MockJobInput(jobs), top_k=2
+    )
+
+    assert list(sparse_service.execute()) == list(top_k_service.execute())
+
+
+def test_sparse_recommender_batches(in_memory_recommender_service):
+    expected = Recommender(in_memory_recommender_service)
+    recommender = Recommender(
+        SparseRecommenderService(
+            jobseekers=None, jobs=MockJobInput(jobs), chunk_size=3, top_k=2
+        )
+    )
+
+    assert recommender.recommend_many(job_seekers) == [
+        expected.recommend(seeker)[:2] for seeker in job_seekers
+    ]
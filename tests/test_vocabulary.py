@@ -0,0 +1,30 @@
+from recommender.vocabulary import SkillVocabulary
+
+
+def test_intern_assigns_stable_ids():
+    vocabulary = SkillVocabulary()
+
+    assert vocabulary.intern("PYTHON") == 0
+    assert vocabulary.intern("JAVA") == 1
+    assert vocabulary.intern("PYTHON") == 0
+
+    assert len(vocabulary) == 2
+    assert "JAVA" in vocabulary
+    assert "RUBY" not in vocabulary
+
+
+def test_intern_all():
+    vocabulary = SkillVocabulary(["PYTHON"])
+
+    skill_ids = vocabulary.intern_all(["JAVA", "PYTHON", "JAVA"])
+
+    assert skill_ids == frozenset({0, 1})
+    assert vocabulary.skills(skill_ids) == {"PYTHON", "JAVA"}
+
+
+def test_lookup():
+    vocabulary = SkillVocabulary(["PYTHON", "JAVA"])
+
+    assert vocabulary.get("JAVA") == 1
+    assert vocabulary.get("RUBY") is None
+    assert vocabulary.skill(0) == "PYTHON"